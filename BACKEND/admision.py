@@ -0,0 +1,125 @@
+"""
+Control de admisión para las generaciones de informes
+Limita cuántas generaciones pesadas corren a la vez en el proceso y cuántas
+pueden esperar en cola; el resto se rechaza con Retry-After en lugar de
+llevar la máquina a swap
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Saturado(Exception):
+    """El servicio no puede admitir más generaciones por ahora"""
+
+    def __init__(self, mensaje, codigo, retry_after):
+        super().__init__(mensaje)
+        self.codigo = codigo
+        self.retry_after = retry_after
+
+
+class ControlAdmision:
+    """
+    Semáforo con cola acotada y métricas
+
+    - Hasta max_concurrentes generaciones se ejecutan en paralelo
+    - Hasta max_cola peticiones esperan turno; si la cola está llena -> 429
+    - Si una petición espera más de espera_max segundos -> 503
+    """
+
+    def __init__(self, max_concurrentes, max_cola, espera_max=30.0):
+        self.max_concurrentes = max(1, max_concurrentes)
+        self.max_cola = max(0, max_cola)
+        self.espera_max = espera_max
+
+        self._condicion = threading.Condition()
+        self._en_curso = 0
+        self._en_cola = 0
+
+        # Métricas acumuladas
+        self._admitidas = 0
+        self._rechazadas_cola_llena = 0
+        self._rechazadas_espera = 0
+        self._espera_total = 0.0
+        self._espera_max_observada = 0.0
+        self._servicio_total = 0.0
+        self._completadas = 0
+
+    def _retry_after(self):
+        """Estima en segundos cuándo habrá un hueco libre"""
+        if self._completadas:
+            servicio_medio = self._servicio_total / self._completadas
+        else:
+            servicio_medio = 5.0
+        turnos = (self._en_cola + 1) / self.max_concurrentes
+        return max(1, math.ceil(servicio_medio * turnos))
+
+    @contextmanager
+    def admitir(self):
+        """
+        Context manager que reserva un hueco de generación
+
+        Raises:
+            Saturado: Si la cola está llena o la espera supera espera_max
+        """
+        llegada = time.monotonic()
+
+        with self._condicion:
+            if self._en_curso >= self.max_concurrentes:
+                if self._en_cola >= self.max_cola:
+                    self._rechazadas_cola_llena += 1
+                    raise Saturado('Demasiadas generaciones en curso, intente más tarde',
+                                   429, self._retry_after())
+
+                self._en_cola += 1
+                try:
+                    limite = llegada + self.espera_max
+                    while self._en_curso >= self.max_concurrentes:
+                        restante = limite - time.monotonic()
+                        if restante <= 0:
+                            self._rechazadas_espera += 1
+                            raise Saturado('Tiempo de espera agotado en la cola de generación',
+                                           503, self._retry_after())
+                        self._condicion.wait(restante)
+                finally:
+                    self._en_cola -= 1
+
+            espera = time.monotonic() - llegada
+            self._en_curso += 1
+            self._admitidas += 1
+            self._espera_total += espera
+            self._espera_max_observada = max(self._espera_max_observada, espera)
+
+        inicio = time.monotonic()
+        try:
+            yield espera
+        finally:
+            with self._condicion:
+                self._en_curso -= 1
+                self._completadas += 1
+                self._servicio_total += time.monotonic() - inicio
+                self._condicion.notify()
+
+    def metricas(self):
+        """
+        Devuelve una instantánea de las métricas de admisión
+
+        Returns:
+            dict: Ocupación actual, límites, contadores y tiempos de espera/servicio
+        """
+        with self._condicion:
+            return {
+                'en_curso': self._en_curso,
+                'en_cola': self._en_cola,
+                'max_concurrentes': self.max_concurrentes,
+                'max_cola': self.max_cola,
+                'admitidas': self._admitidas,
+                'completadas': self._completadas,
+                'rechazadas_cola_llena': self._rechazadas_cola_llena,
+                'rechazadas_espera': self._rechazadas_espera,
+                'espera_media_s': round(self._espera_total / self._admitidas, 4) if self._admitidas else 0.0,
+                'espera_max_s': round(self._espera_max_observada, 4),
+                'servicio_medio_s': round(self._servicio_total / self._completadas, 4) if self._completadas else 0.0
+            }
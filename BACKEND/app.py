@@ -4,19 +4,39 @@ Backend RESTful para la aplicación web
 Adaptado para Vercel Serverless
 """
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 import os
 import tempfile
+import time
 from datetime import datetime
 import sys
 
 # Agregar el directorio del generador al path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'generador'))
 
-from generador import generar_informe_word
+# Caché de fuentes precalculada en el build (antes de que se importe matplotlib)
+from generador.artefactos import configurar_matplotlib
+configurar_matplotlib()
+
+from generador import generar_informe_word, generar_informe_desde_conteos
+from generador.conteos import ErrorConteos, validar_conteos
+from generador.graficas import MOTORES_GRAFICAS
+from generador.escritor_docx import MOTORES_DOCUMENTO
+from generador.utils import PERIODOS_TENDENCIA
+from generador.marca import cargar_perfil, perfiles_disponibles, precargar_perfiles
+from generador.lectura import leer_excel, leer_encabezado
+from generador.segmentos import ErrorSegmento
+from generador.cache_datos import CacheDatos
+from generador.memoria import ErrorPerfilMemoria
 from generador.utils import extraer_nombre_uds, generar_nombre_salida
+from cargas import AlmacenCargas, ErrorCarga
+from admision import ControlAdmision, Saturado
+from perfilado import AlmacenPerfiles, ErrorPerfilado, token_valido
+from coalescencia import VueloUnico, clave_generacion
+from progreso import CanalesProgreso, ErrorProgreso
+from archivo_informes import ArchivoInformes, ErrorArchivo, validar_periodo
 
 app = Flask(__name__)
 CORS(app)  # Habilitar CORS para permitir peticiones del frontend
@@ -26,15 +46,186 @@ app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16 MB max
 ALLOWED_EXTENSIONS = {'xlsx', 'xls'}
 ALLOWED_IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg'}
 
+# Entrada agregada (/api/generate-from-counts): el JSON de conteos es pequeño
+app.config['COUNTS_MAX_BYTES'] = int(os.environ.get('COUNTS_MAX_BYTES', 1024 * 1024))
+
 # Usar /tmp en Vercel (único directorio escribible)
 TEMP_DIR = '/tmp' if os.path.exists('/tmp') else tempfile.gettempdir()
 
+# Cargas por partes para archivos que superan MAX_CONTENT_LENGTH
+app.config['UPLOAD_SPOOL_MAX_MEMORY'] = int(os.environ.get('UPLOAD_SPOOL_MAX_MEMORY', 1024 * 1024))
+app.config['UPLOAD_CHUNK_MAX_SIZE'] = int(os.environ.get('UPLOAD_CHUNK_MAX_SIZE', 8 * 1024 * 1024))
+app.config['UPLOAD_MAX_TOTAL_SIZE'] = int(os.environ.get('UPLOAD_MAX_TOTAL_SIZE', 512 * 1024 * 1024))
+app.config['UPLOAD_EXPIRATION_SECONDS'] = int(os.environ.get('UPLOAD_EXPIRATION_SECONDS', 24 * 3600))
+
+almacen_cargas = AlmacenCargas(
+    os.path.join(TEMP_DIR, 'cargas'),
+    umbral_memoria=app.config['UPLOAD_SPOOL_MAX_MEMORY'],
+    tamano_parte_max=app.config['UPLOAD_CHUNK_MAX_SIZE'],
+    tamano_total_max=app.config['UPLOAD_MAX_TOTAL_SIZE'],
+    expiracion_segundos=app.config['UPLOAD_EXPIRATION_SECONDS']
+)
+
+# Control de admisión: generaciones simultáneas y cola de espera por proceso
+app.config['GENERATION_MAX_CONCURRENCY'] = int(os.environ.get('GENERATION_MAX_CONCURRENCY', os.cpu_count() or 1))
+app.config['GENERATION_MAX_QUEUE'] = int(os.environ.get('GENERATION_MAX_QUEUE', 2 * app.config['GENERATION_MAX_CONCURRENCY']))
+app.config['GENERATION_QUEUE_TIMEOUT'] = float(os.environ.get('GENERATION_QUEUE_TIMEOUT', 30))
+
+# Memoria: perfil con tracemalloc (modo diagnóstico) y presupuesto del proceso
+app.config['MEMORY_PROFILING'] = os.environ.get('MEMORY_PROFILING', '0') == '1'
+app.config['MEMORY_BUDGET_MB'] = int(os.environ.get('MEMORY_BUDGET_MB', 0)) or None
+
+# Caché de libros ya leídos, compartida entre workers a través del disco
+app.config['DATA_CACHE_ENABLED'] = os.environ.get('DATA_CACHE_ENABLED', '1') == '1'
+app.config['DATA_CACHE_DIR'] = os.environ.get('DATA_CACHE_DIR', os.path.join(TEMP_DIR, 'cache_datos'))
+app.config['DATA_CACHE_MAX_MB'] = int(os.environ.get('DATA_CACHE_MAX_MB', 256))
+
+cache_datos = None
+if app.config['DATA_CACHE_ENABLED']:
+    try:
+        cache_datos = CacheDatos(
+            app.config['DATA_CACHE_DIR'],
+            tamano_max_mb=app.config['DATA_CACHE_MAX_MB']
+        )
+    except PermissionError as e:
+        print(f"⚠️  {e}: la caché de datos queda desactivada")
+
+# Perfilado bajo demanda (?profile=1): habilitado para todos o solo con X-Admin-Token
+app.config['PROFILING_ENABLED'] = os.environ.get('PROFILING_ENABLED', '0') == '1'
+app.config['PROFILING_ADMIN_TOKEN'] = os.environ.get('PROFILING_ADMIN_TOKEN', '')
+app.config['PROFILING_DIR'] = os.environ.get('PROFILING_DIR', os.path.join(TEMP_DIR, 'perfiles'))
+app.config['PROFILING_MAX_PROFILES'] = int(os.environ.get('PROFILING_MAX_PROFILES', 50))
+
+almacen_perfiles = AlmacenPerfiles(
+    app.config['PROFILING_DIR'],
+    max_perfiles=app.config['PROFILING_MAX_PROFILES']
+) if app.config['PROFILING_ENABLED'] or app.config['PROFILING_ADMIN_TOKEN'] else None
+
+# Coalescencia: las peticiones idénticas simultáneas comparten una sola generación
+app.config['GENERATION_COALESCE'] = os.environ.get('GENERATION_COALESCE', '1') == '1'
+app.config['GENERATION_COALESCE_CROSS_PROCESS'] = os.environ.get('GENERATION_COALESCE_CROSS_PROCESS', '0') == '1'
+app.config['GENERATION_COALESCE_DIR'] = os.environ.get('GENERATION_COALESCE_DIR', os.path.join(TEMP_DIR, 'vuelos'))
+app.config['GENERATION_COALESCE_TIMEOUT'] = float(os.environ.get('GENERATION_COALESCE_TIMEOUT', 300))
+
+vuelo_unico = VueloUnico(
+    app.config['GENERATION_COALESCE_DIR'],
+    entre_procesos=app.config['GENERATION_COALESCE_CROSS_PROCESS'],
+    espera_max=app.config['GENERATION_COALESCE_TIMEOUT']
+) if app.config['GENERATION_COALESCE'] else None
+
+# Progreso de las generaciones por Server-Sent Events (/api/progress/<id>)
+app.config['PROGRESS_DIR'] = os.environ.get('PROGRESS_DIR', os.path.join(TEMP_DIR, 'progreso'))
+app.config['PROGRESS_STREAM_TIMEOUT'] = int(os.environ.get('PROGRESS_STREAM_TIMEOUT', 600))
+app.config['PROGRESS_START_TIMEOUT'] = int(os.environ.get('PROGRESS_START_TIMEOUT', 120))
+
+canales_progreso = CanalesProgreso(
+    app.config['PROGRESS_DIR'],
+    espera_inicio=app.config['PROGRESS_START_TIMEOUT'],
+    espera_max=app.config['PROGRESS_STREAM_TIMEOUT']
+)
+
+# Archivo persistente de informes (no tiene sentido en el /tmp efímero de Vercel).
+# Guarda datos de los encuestados: sin REPORT_ARCHIVE_TOKEN queda desactivado
+app.config['REPORT_ARCHIVE'] = os.environ.get('REPORT_ARCHIVE', '0' if os.environ.get('VERCEL') else '1') == '1'
+app.config['REPORT_ARCHIVE_DIR'] = os.environ.get(
+    'REPORT_ARCHIVE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'archivo_informes')
+)
+app.config['REPORT_ARCHIVE_TOKEN'] = os.environ.get('REPORT_ARCHIVE_TOKEN', '')
+if app.config['REPORT_ARCHIVE'] and not app.config['REPORT_ARCHIVE_TOKEN']:
+    if 'REPORT_ARCHIVE' in os.environ:
+        print("⚠️  REPORT_ARCHIVE=1 sin REPORT_ARCHIVE_TOKEN: el archivo de informes queda desactivado")
+    app.config['REPORT_ARCHIVE'] = False
+archivo_informes = ArchivoInformes(app.config['REPORT_ARCHIVE_DIR']) if app.config['REPORT_ARCHIVE'] else None
+
+# Perfiles de marca: imágenes y plantilla de cada uno en memoria desde el arranque
+app.config['BRANDING_PRELOAD'] = os.environ.get('BRANDING_PRELOAD', '1') == '1'
+if app.config['BRANDING_PRELOAD']:
+    precargar_perfiles()
+
+control_admision = ControlAdmision(
+    app.config['GENERATION_MAX_CONCURRENCY'],
+    app.config['GENERATION_MAX_QUEUE'],
+    espera_max=app.config['GENERATION_QUEUE_TIMEOUT']
+)
+
 
 def allowed_file(filename, allowed_extensions):
     """Verifica si el archivo tiene una extensión permitida"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in allowed_extensions
 
 
+def verificar_perfilado():
+    """
+    Comprueba que la petición puede usar el perfilado
+
+    Raises:
+        ErrorPerfilado: 404 si está deshabilitado, 403 si falta el token de administración
+    """
+    if almacen_perfiles is None:
+        raise ErrorPerfilado('El perfilado no está habilitado en este servidor', 404)
+    if app.config['PROFILING_ENABLED']:
+        return
+    if not token_valido(request.headers.get('X-Admin-Token', ''), app.config['PROFILING_ADMIN_TOKEN']):
+        raise ErrorPerfilado('Token de administración no válido', 403)
+
+
+def verificar_archivo():
+    """
+    Comprueba que la petición puede consultar el archivo de informes
+    
+    Raises:
+        ErrorArchivo: 404 si está deshabilitado, 403 si falta el token de administración
+    """
+    if archivo_informes is None:
+        raise ErrorArchivo('El archivo de informes no está habilitado en este servidor', 404)
+    if not token_valido(request.headers.get('X-Admin-Token', ''), app.config['REPORT_ARCHIVE_TOKEN']):
+        raise ErrorArchivo('Token de administración no válido', 403)
+
+
+def archivar_informe(ruta_docx, resultado, hash_entrada, nombre_archivo, periodo, tiempos, opciones):
+    """
+    Guarda el informe en el archivo; un fallo aquí no debe afectar a la respuesta
+    
+    Returns:
+        int: id del informe archivado, o None
+    """
+    if archivo_informes is None:
+        return None
+    try:
+        return archivo_informes.guardar(
+            ruta_docx, resultado, hash_entrada,
+            nombre_archivo=nombre_archivo,
+            periodo=periodo,
+            segundos_generacion=tiempos.get('generacion'),
+            segundos_total=round(time.perf_counter() - tiempos['inicio'], 3),
+            opciones=opciones
+        )['id']
+    except Exception as e:
+        print(f"⚠️  No se pudo archivar el informe: {e}")
+        return None
+
+
+def transmitir_y_limpiar(ruta_archivo, directorio, tamano_bloque=64 * 1024):
+    """
+    Genera el contenido de un archivo por bloques y elimina su directorio al terminar
+    
+    Args:
+        ruta_archivo: Archivo a transmitir
+        directorio: Directorio temporal a eliminar cuando se cierre la respuesta
+        tamano_bloque: Bytes por bloque
+    """
+    import shutil
+    try:
+        with open(ruta_archivo, 'rb') as f:
+            while True:
+                bloque = f.read(tamano_bloque)
+                if not bloque:
+                    break
+                yield bloque
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
 @app.route('/')
 def index():
     """Endpoint de bienvenida"""
@@ -43,7 +234,16 @@ def index():
         'version': '1.0.0',
         'endpoints': {
             'health': '/api/health',
-            'generate': '/api/generate (POST)'
+            'metrics': '/api/metrics',
+            'generate': '/api/generate (POST)',
+            'generate_from_counts': '/api/generate-from-counts (POST, JSON)',
+            'progress': '/api/progress/<progreso_id> (GET, text/event-stream)',
+            'branding': '/api/branding-profiles (GET)',
+            'profiles': '/api/profiles/<id> (GET), /api/profiles/<id>/pstats (GET)',
+            'reports': '/api/reports (GET), /api/reports/<id> (GET), /api/reports/<id>/download (GET), '
+                       '/api/reports/trend (GET)',
+            'uploads': '/api/uploads (POST), /api/uploads/<id> (GET), '
+                       '/api/uploads/<id>/chunks/<indice> (PUT), /api/uploads/<id>/finalize (POST)'
         }
     })
 
@@ -54,45 +254,400 @@ def health():
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
-        'temp_dir': TEMP_DIR
+        'temp_dir': TEMP_DIR,
+        'generacion': control_admision.metricas()
+    })
+
+
+@app.route('/api/metrics')
+def metrics():
+    """Métricas del proceso para dimensionar instancias"""
+    return jsonify({
+        'pid': os.getpid(),
+        'generacion': control_admision.metricas(),
+        'coalescencia': vuelo_unico.metricas() if vuelo_unico else None,
+        'cache_datos': cache_datos.metricas() if cache_datos else None,
+        'archivo_informes': archivo_informes.metricas() if archivo_informes else None
     })
 
 
+@app.route('/api/generate-from-counts', methods=['POST'])
+def generate_from_counts():
+    """
+    Genera un informe a partir de conteos ya agregados, sin subir el libro
+    
+    Cuerpo (JSON, validado de forma estricta):
+        {"nombre_uds": str, "total_respuestas": int,
+         "preguntas": {pregunta: {respuesta: conteo}}}
+    
+    Parámetros (query, opcionales): perfil, motor_graficas, motor_documento, progreso_id,
+        periodo (AAAA-MM, para el archivo de informes)
+    
+    Returns:
+        Archivo .docx generado; 400 con la lista de errores si el JSON no es válido
+    """
+    temp_work_dir = None
+    progreso_id = None
+    tiempos = {'inicio': time.perf_counter()}
+    try:
+        if request.content_length and request.content_length > app.config['COUNTS_MAX_BYTES']:
+            return jsonify({'error': f"El JSON de conteos supera {app.config['COUNTS_MAX_BYTES']} bytes"}), 413
+        if not request.is_json:
+            return jsonify({'error': 'Se esperaba un cuerpo application/json'}), 415
+        
+        try:
+            datos = validar_conteos(request.get_data(cache=False))
+        except ErrorConteos as e:
+            return jsonify({'error': str(e), 'errores': e.errores}), 400
+        
+        motor_graficas = request.args.get('motor_graficas') or None
+        if motor_graficas and motor_graficas not in MOTORES_GRAFICAS:
+            return jsonify({'error': f'Motor de gráficas no válido. Use uno de: {", ".join(MOTORES_GRAFICAS)}'}), 400
+        
+        motor_documento = request.args.get('motor_documento') or None
+        if motor_documento and motor_documento not in MOTORES_DOCUMENTO:
+            return jsonify({'error': f'Motor de documento no válido. Use uno de: {", ".join(MOTORES_DOCUMENTO)}'}), 400
+        
+        perfil_marca = request.args.get('perfil') or None
+        if perfil_marca:
+            try:
+                cargar_perfil(perfil_marca)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        
+        periodo = request.args.get('periodo') or None
+        if periodo:
+            try:
+                validar_periodo(periodo)
+            except ErrorArchivo as e:
+                return jsonify({'error': str(e)}), e.codigo
+        
+        progreso_id = request.args.get('progreso_id') or None
+        try:
+            emitir_progreso = canales_progreso.emisor(progreso_id) if progreso_id else None
+        except ErrorProgreso as e:
+            progreso_id = None
+            return jsonify({'error': str(e)}), e.codigo
+        
+        temp_work_dir = tempfile.mkdtemp(dir=TEMP_DIR)
+        output_filename = generar_nombre_salida(f"{secure_filename(datos['nombre_uds']) or 'uds'}.xlsx")
+        output_path = os.path.join(temp_work_dir, output_filename)
+        perfil_memoria = app.config['MEMORY_PROFILING'] and request.args.get('perfil_memoria', '1') == '1'
+        
+        def generar_admitido():
+            with control_admision.admitir():
+                inicio = time.perf_counter()
+                resultado = generar_informe_desde_conteos(
+                    datos,
+                    archivo_salida=output_path,
+                    directorio_trabajo=temp_work_dir,
+                    motor_graficas=motor_graficas,
+                    motor_documento=motor_documento,
+                    perfil_memoria=perfil_memoria,
+                    presupuesto_memoria_mb=app.config['MEMORY_BUDGET_MB'],
+                    progreso=emitir_progreso,
+                    perfil_marca=perfil_marca,
+                    validados=True
+                )
+                tiempos['generacion'] = round(time.perf_counter() - inicio, 3)
+                return resultado
+        
+        # Los conteos ya validados (y ordenados como llegaron) identifican la entrada
+        import json
+        archivo_conteos = os.path.join(temp_work_dir, 'conteos.json')
+        with open(archivo_conteos, 'w', encoding='utf-8') as f:
+            json.dump(datos, f, ensure_ascii=False)
+        opciones = {
+            'entrada': 'conteos',
+            'motor_graficas': motor_graficas,
+            'motor_documento': motor_documento,
+            'perfil_marca': perfil_marca,
+            'presupuesto_memoria_mb': app.config['MEMORY_BUDGET_MB']
+        }
+        clave = clave_generacion(archivo_conteos, datos['nombre_uds'], opciones=opciones)
+        
+        coalescida = False
+        if vuelo_unico and not perfil_memoria:
+            resultado, coalescida = vuelo_unico.ejecutar(clave, generar_admitido, output_path)
+        else:
+            resultado = generar_admitido()
+        
+        if progreso_id:
+            canales_progreso.finalizar(progreso_id, coalescida=coalescida)
+        
+        # Las peticiones coalescidas comparten el informe que ya archivó la primera
+        informe_id = None
+        if not coalescida:
+            informe_id = archivar_informe(output_path, resultado, clave, output_filename, periodo, tiempos, opciones)
+        
+        response = Response(
+            transmitir_y_limpiar(output_path, temp_work_dir),
+            mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+        )
+        response.headers['Content-Length'] = str(os.path.getsize(output_path))
+        response.headers['Content-Disposition'] = f'attachment; filename="{output_filename}"'
+        temp_work_dir = None
+        
+        memoria = resultado['memoria']
+        if memoria['pico_trazado_bytes'] is not None:
+            response.headers['X-Memory-Peak-Traced'] = str(memoria['pico_trazado_bytes'])
+        if memoria['degradaciones']:
+            response.headers['X-Memory-Degraded'] = '; '.join(memoria['degradaciones'])
+        if coalescida:
+            response.headers['X-Coalesced'] = '1'
+        if informe_id:
+            response.headers['X-Report-Id'] = str(informe_id)
+        
+        return response
+        
+    except Saturado as e:
+        if temp_work_dir and os.path.exists(temp_work_dir):
+            import shutil
+            shutil.rmtree(temp_work_dir, ignore_errors=True)
+        if progreso_id:
+            canales_progreso.finalizar(progreso_id, error=e, retry_after=e.retry_after)
+        
+        response = jsonify({'error': str(e), 'retry_after': e.retry_after})
+        response.status_code = e.codigo
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response
+        
+    except ErrorPerfilMemoria as e:
+        if temp_work_dir and os.path.exists(temp_work_dir):
+            import shutil
+            shutil.rmtree(temp_work_dir, ignore_errors=True)
+        if progreso_id:
+            canales_progreso.finalizar(progreso_id, error=e)
+        return jsonify({'error': str(e)}), e.codigo
+        
+    except Exception as e:
+        if temp_work_dir and os.path.exists(temp_work_dir):
+            import shutil
+            shutil.rmtree(temp_work_dir, ignore_errors=True)
+        if progreso_id:
+            canales_progreso.finalizar(progreso_id, error=e)
+        
+        print(f"Error al generar informe desde conteos: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/reports', methods=['GET'])
+def reports_list():
+    """
+    Lista y busca informes archivados (del más reciente al más antiguo)
+    
+    Parámetros (query, opcionales):
+        uds, periodo, desde, hasta (AAAA-MM), q (texto en la UDS o en las preguntas),
+        limite (por defecto 50), desplazamiento
+    """
+    try:
+        verificar_archivo()
+        return jsonify(archivo_informes.listar(
+            uds=request.args.get('uds') or None,
+            periodo=request.args.get('periodo') or None,
+            desde=request.args.get('desde') or None,
+            hasta=request.args.get('hasta') or None,
+            texto=request.args.get('q') or None,
+            limite=request.args.get('limite', 50, type=int),
+            desplazamiento=request.args.get('desplazamiento', 0, type=int)
+        ))
+    except ErrorArchivo as e:
+        return jsonify({'error': str(e)}), e.codigo
+
+
+@app.route('/api/reports/<int:informe_id>', methods=['GET'])
+def report_detail(informe_id):
+    """Datos de un informe archivado: tiempos, opciones y resumen de cada pregunta"""
+    try:
+        verificar_archivo()
+        informe = archivo_informes.obtener(informe_id)
+        informe['descarga'] = f'/api/reports/{informe_id}/download'
+        return jsonify(informe)
+    except ErrorArchivo as e:
+        return jsonify({'error': str(e)}), e.codigo
+
+
+@app.route('/api/reports/<int:informe_id>/download', methods=['GET'])
+def report_download(informe_id):
+    """Vuelve a descargar un informe archivado sin regenerarlo"""
+    try:
+        verificar_archivo()
+        ruta, nombre = archivo_informes.documento(informe_id)
+    except ErrorArchivo as e:
+        return jsonify({'error': str(e)}), e.codigo
+    
+    return send_file(
+        ruta,
+        mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+        as_attachment=True,
+        download_name=nombre
+    )
+
+
+@app.route('/api/reports/trend', methods=['GET'])
+def report_trend():
+    """
+    Porcentaje favorable de una UDS por periodo, según sus informes archivados
+    
+    Parámetros (query):
+        uds: Nombre de la UDS (requerido)
+        pregunta: Texto de una pregunta (opcional; por defecto todo el informe)
+    """
+    try:
+        verificar_archivo()
+        uds = request.args.get('uds', '').strip()
+        if not uds:
+            return jsonify({'error': 'Indique la UDS con el parámetro uds'}), 400
+        pregunta = request.args.get('pregunta') or None
+        return jsonify({
+            'uds': uds,
+            'pregunta': pregunta,
+            'puntos': archivo_informes.tendencia(uds, pregunta)
+        })
+    except ErrorArchivo as e:
+        return jsonify({'error': str(e)}), e.codigo
+
+
+@app.route('/api/branding-profiles')
+def branding_profiles():
+    """Perfiles de marca disponibles para el campo 'perfil' de /api/generate"""
+    perfiles = []
+    for perfil_id in perfiles_disponibles():
+        try:
+            perfil = cargar_perfil(perfil_id)
+        except ValueError as e:
+            print(f"⚠️  {e}")
+            continue
+        perfiles.append({
+            'id': perfil['id'],
+            'nombre': perfil['nombre'],
+            'encabezado_imagen': perfil['imagenes']['encabezado'] is not None,
+            'pie_imagen': perfil['imagenes']['pie'] is not None
+        })
+    return jsonify({'perfiles': perfiles})
+
+
 @app.route('/api/generate', methods=['POST'])
 def generate_report():
     """
     Genera un informe a partir de un archivo Excel
     
     Parámetros:
-        - excel_file: Archivo Excel con los datos (requerido)
+        - excel_file: Archivo Excel con los datos (requerido si no se envía upload_id)
+        - upload_id: Identificador de una carga por partes ya finalizada (opcional)
         - nombre_uds: Nombre de la UDS (opcional)
         - encabezado: Imagen del encabezado (opcional)
         - pie: Imagen del pie (opcional)
+        - motor_graficas: Motor de gráficas 'matplotlib', 'pillow' o 'mosaico' (opcional)
+        - periodo: Mes del informe AAAA-MM para el archivo (opcional; por defecto el de las respuestas)
+        - motor_documento: Motor de documento 'docx' o 'incremental' (opcional)
+        - segmentar_por: Columna demográfica para la tabla cruzada por segmento (opcional)
+        - tendencia: 'semana' o 'mes' para la tendencia de respuestas favorables (opcional)
+        - perfil: Perfil de marca (textos, imágenes y plantilla de la asociación) (opcional)
+        - progreso_id: Identificador elegido por el cliente para seguir el progreso
+          en /api/progress/<progreso_id> (opcional)
+        - profile=1 (query): Perfila la generación con cProfile (requiere
+          PROFILING_ENABLED o el encabezado X-Admin-Token)
     
     Returns:
         Archivo .docx generado
     """
     temp_work_dir = None
+    tiempos = {'inicio': time.perf_counter()}
+    progreso_id = None
+    
+    def rechazar(mensaje, codigo=400):
+        """Respuesta de error que además cierra el stream de progreso del cliente"""
+        if progreso_id:
+            canales_progreso.finalizar(progreso_id, error=mensaje)
+        return jsonify({'error': mensaje}), codigo
+    
     try:
-        # Validar que se envió el archivo Excel
-        if 'excel_file' not in request.files:
-            return jsonify({'error': 'No se envió el archivo Excel'}), 400
+        # El id se valida primero para poder cerrar su stream en cualquier rechazo
+        progreso_id = request.form.get('progreso_id') or None
+        if progreso_id:
+            try:
+                canales_progreso.validar(progreso_id)
+            except ErrorProgreso as e:
+                progreso_id = None
+                return jsonify({'error': str(e)}), e.codigo
         
-        excel_file = request.files['excel_file']
+        perfilar = request.args.get('profile') == '1'
+        if perfilar:
+            try:
+                verificar_perfilado()
+            except ErrorPerfilado as e:
+                return rechazar(str(e), e.codigo)
         
-        if excel_file.filename == '':
-            return jsonify({'error': 'Nombre de archivo vacío'}), 400
+        motor_graficas = request.form.get('motor_graficas') or None
+        if motor_graficas and motor_graficas not in MOTORES_GRAFICAS:
+            return rechazar(f'Motor de gráficas no válido. Use uno de: {", ".join(MOTORES_GRAFICAS)}')
         
-        if not allowed_file(excel_file.filename, ALLOWED_EXTENSIONS):
-            return jsonify({'error': 'Formato de archivo no válido. Use .xlsx o .xls'}), 400
+        motor_documento = request.form.get('motor_documento') or None
+        if motor_documento and motor_documento not in MOTORES_DOCUMENTO:
+            return rechazar(f'Motor de documento no válido. Use uno de: {", ".join(MOTORES_DOCUMENTO)}')
         
-        # Crear directorio temporal único para este request
-        temp_work_dir = tempfile.mkdtemp(dir=TEMP_DIR)
+        columna_segmento = request.form.get('segmentar_por') or None
+        periodo_tendencia = request.form.get('tendencia') or None
+        if periodo_tendencia and periodo_tendencia not in PERIODOS_TENDENCIA:
+            return rechazar(f'Tendencia no válida. Use una de: {", ".join(PERIODOS_TENDENCIA)}')
+        
+        perfil_marca = request.form.get('perfil') or None
+        if perfil_marca:
+            try:
+                cargar_perfil(perfil_marca)
+            except ValueError as e:
+                return rechazar(str(e))
+        
+        periodo = request.form.get('periodo') or None
+        if periodo:
+            try:
+                validar_periodo(periodo)
+            except ErrorArchivo as e:
+                return rechazar(str(e), e.codigo)
+        
+        upload_id = request.form.get('upload_id', '')
         
-        # Guardar archivo Excel
-        excel_filename = secure_filename(excel_file.filename)
-        excel_path = os.path.join(temp_work_dir, excel_filename)
-        excel_file.save(excel_path)
+        if upload_id:
+            # Archivo recibido previamente mediante carga por partes
+            try:
+                excel_path = almacen_cargas.ruta_finalizada(upload_id)
+            except ErrorCarga as e:
+                return rechazar(str(e), e.codigo)
+            
+            if not allowed_file(excel_path, ALLOWED_EXTENSIONS):
+                return rechazar('Formato de archivo no válido. Use .xlsx o .xls')
+            
+            temp_work_dir = tempfile.mkdtemp(dir=TEMP_DIR)
+        else:
+            # Validar que se envió el archivo Excel
+            if 'excel_file' not in request.files:
+                return rechazar('No se envió el archivo Excel')
+            
+            excel_file = request.files['excel_file']
+            
+            if excel_file.filename == '':
+                return rechazar('Nombre de archivo vacío')
+            
+            if not allowed_file(excel_file.filename, ALLOWED_EXTENSIONS):
+                return rechazar('Formato de archivo no válido. Use .xlsx o .xls')
+            
+            # Crear directorio temporal único para este request
+            temp_work_dir = tempfile.mkdtemp(dir=TEMP_DIR)
+            
+            # Guardar archivo Excel
+            excel_filename = secure_filename(excel_file.filename)
+            excel_path = os.path.join(temp_work_dir, excel_filename)
+            excel_file.save(excel_path)
+        
+        # La columna de segmento se comprueba con el encabezado, antes de la cola
+        if columna_segmento and columna_segmento not in leer_encabezado(excel_path):
+            raise ErrorSegmento(f'La columna de segmento no existe: {columna_segmento}')
+        
+        # El canal se abre con la petición ya validada ('recibido')
+        emitir_progreso = canales_progreso.emisor(progreso_id) if progreso_id else None
         
         # Obtener nombre UDS (del formulario o del archivo)
         nombre_uds = request.form.get('nombre_uds', '')
@@ -100,12 +655,14 @@ def generate_report():
             nombre_uds = extraer_nombre_uds(excel_path)
         
         # Guardar imágenes si se enviaron
+        imagenes = []
         if 'encabezado' in request.files:
             encabezado_file = request.files['encabezado']
             if encabezado_file.filename != '' and allowed_file(encabezado_file.filename, ALLOWED_IMAGE_EXTENSIONS):
                 ext = encabezado_file.filename.rsplit('.', 1)[1].lower()
                 encabezado_path = os.path.join(temp_work_dir, f'encabezado.{ext}')
                 encabezado_file.save(encabezado_path)
+                imagenes.append(encabezado_path)
         
         if 'pie' in request.files:
             pie_file = request.files['pie']
@@ -113,42 +670,130 @@ def generate_report():
                 ext = pie_file.filename.rsplit('.', 1)[1].lower()
                 pie_path = os.path.join(temp_work_dir, f'pie.{ext}')
                 pie_file.save(pie_path)
+                imagenes.append(pie_path)
         
         # Generar nombre del archivo de salida
         output_filename = generar_nombre_salida(excel_path)
         output_path = os.path.join(temp_work_dir, output_filename)
         
-        # Generar el informe
-        resultado = generar_informe_word(
-            archivo_excel=excel_path,
-            archivo_salida=output_path,
-            nombre_uds=nombre_uds,
-            directorio_trabajo=temp_work_dir
-        )
+        # El perfil de memoria se activa globalmente o por petición si está habilitado
+        perfil_memoria = app.config['MEMORY_PROFILING'] and request.args.get('perfil_memoria', '1') == '1'
         
-        # Leer el archivo generado en memoria
-        with open(output_path, 'rb') as f:
-            file_data = f.read()
+        parametros = {
+            'archivo_excel': excel_path,
+            'archivo_salida': output_path,
+            'nombre_uds': nombre_uds,
+            'directorio_trabajo': temp_work_dir,
+            'motor_graficas': motor_graficas,
+            'motor_documento': motor_documento,
+            'columna_segmento': columna_segmento,
+            'periodo_tendencia': periodo_tendencia,
+            'perfil_memoria': perfil_memoria,
+            'presupuesto_memoria_mb': app.config['MEMORY_BUDGET_MB'],
+            'cache_datos': cache_datos,
+            'progreso': emitir_progreso,
+            'perfil_marca': perfil_marca
+        }
         
-        # Limpiar archivos temporales
-        import shutil
-        if temp_work_dir and os.path.exists(temp_work_dir):
-            shutil.rmtree(temp_work_dir)
+        def generar_admitido():
+            with control_admision.admitir():
+                inicio = time.perf_counter()
+                resultado = generar_informe_word(**parametros)
+                tiempos['generacion'] = round(time.perf_counter() - inicio, 3)
+                return resultado
         
-        # Crear respuesta con el archivo en memoria
-        from io import BytesIO
-        file_stream = BytesIO(file_data)
-        file_stream.seek(0)
+        opciones = {
+            'motor_graficas': motor_graficas,
+            'motor_documento': motor_documento,
+            'columna_segmento': columna_segmento,
+            'periodo_tendencia': periodo_tendencia,
+            'perfil_marca': perfil_marca,
+            'presupuesto_memoria_mb': app.config['MEMORY_BUDGET_MB']
+        }
+        # Hash de la entrada: identifica generaciones idénticas y los informes archivados
+        clave = clave_generacion(excel_path, nombre_uds, imagenes=imagenes, opciones=opciones) \
+            if vuelo_unico or archivo_informes else None
         
-        response = send_file(
-            file_stream,
-            as_attachment=True,
-            download_name=output_filename,
+        # Generar el informe (sujeto al control de admisión); el perfil
+        # cubre solo la generación, no la espera en cola. Las peticiones
+        # perfiladas no se coalescen: cada una necesita su propia medición
+        perfil = None
+        coalescida = False
+        if perfilar:
+            with control_admision.admitir():
+                with almacen_perfiles.perfilar(os.path.basename(excel_path)) as perfil:
+                    resultado = generar_informe_word(**parametros)
+            tiempos['generacion'] = perfil['segundos']
+        elif vuelo_unico and not perfil_memoria:
+            resultado, coalescida = vuelo_unico.ejecutar(clave, generar_admitido, output_path)
+        else:
+            resultado = generar_admitido()
+        
+        if progreso_id:
+            canales_progreso.finalizar(progreso_id, coalescida=coalescida)
+        
+        # La carga por partes ya se usó: se libera ahora en lugar de esperar a
+        # que expire (si la generación falla se conserva para reintentar)
+        if upload_id:
+            almacen_cargas.eliminar(upload_id)
+        
+        # Las peticiones coalescidas comparten el informe que ya archivó la primera
+        informe_id = None
+        if not coalescida and archivo_informes is not None:
+            informe_id = archivar_informe(output_path, resultado, clave, output_filename, periodo, tiempos, opciones)
+        
+        if perfil:
+            print(f"🔬 Perfil {perfil['id']} ({perfil['segundos']}s):")
+            for fila in perfil['top'][:10]:
+                print(f"   {fila['tiempo_acumulado']:>8.3f}s  {fila['funcion']}  {os.path.basename(fila['archivo'])}:{fila['linea']}")
+        
+        if perfil_memoria:
+            import json
+            print(f"🧠 Perfil de memoria: {json.dumps(resultado['memoria'])}")
+        
+        # Transmitir el informe desde disco en lugar de copiarlo a memoria;
+        # el directorio temporal se elimina al terminar la respuesta
+        response = Response(
+            transmitir_y_limpiar(output_path, temp_work_dir),
             mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
         )
-        
+        response.headers['Content-Length'] = str(os.path.getsize(output_path))
         response.headers['Content-Disposition'] = f'attachment; filename="{output_filename}"'
+        temp_work_dir = None
+        
+        memoria = resultado['memoria']
+        if memoria['pico_trazado_bytes'] is not None:
+            response.headers['X-Memory-Peak-Traced'] = str(memoria['pico_trazado_bytes'])
+        if memoria['degradaciones']:
+            response.headers['X-Memory-Degraded'] = '; '.join(memoria['degradaciones'])
+        if coalescida:
+            response.headers['X-Coalesced'] = '1'
+        if informe_id:
+            response.headers['X-Report-Id'] = str(informe_id)
+        if perfil:
+            response.headers['X-Profile-Id'] = perfil['id']
+            response.headers['X-Profile-Url'] = f"/api/profiles/{perfil['id']}"
+        
+        return response
+        
+    except (ErrorPerfilado, ErrorPerfilMemoria, ErrorSegmento) as e:
+        if temp_work_dir and os.path.exists(temp_work_dir):
+            import shutil
+            shutil.rmtree(temp_work_dir, ignore_errors=True)
+        if progreso_id:
+            canales_progreso.finalizar(progreso_id, error=e)
+        return jsonify({'error': str(e)}), e.codigo
+        
+    except Saturado as e:
+        if temp_work_dir and os.path.exists(temp_work_dir):
+            import shutil
+            shutil.rmtree(temp_work_dir, ignore_errors=True)
+        if progreso_id:
+            canales_progreso.finalizar(progreso_id, error=e, retry_after=e.retry_after)
         
+        response = jsonify({'error': str(e), 'retry_after': e.retry_after})
+        response.status_code = e.codigo
+        response.headers['Retry-After'] = str(e.retry_after)
         return response
         
     except Exception as e:
@@ -157,12 +802,143 @@ def generate_report():
             import shutil
             shutil.rmtree(temp_work_dir, ignore_errors=True)
         
+        if progreso_id:
+            canales_progreso.finalizar(progreso_id, error=e)
+        
         print(f"Error al generar informe: {str(e)}")
         import traceback
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/progress/<progreso_id>', methods=['GET'])
+def progress_stream(progreso_id):
+    """
+    Stream de progreso (Server-Sent Events) de la generación con ese progreso_id
+    
+    Eventos: leido, columna, grafica, guardado y, al terminar, fin o error.
+    Se puede abrir antes de enviar /api/generate; los eventos ya emitidos se reenvían.
+    """
+    try:
+        stream = canales_progreso.stream(progreso_id)
+    except ErrorProgreso as e:
+        return jsonify({'error': str(e)}), e.codigo
+    
+    response = Response(stream, mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Sin buffer en proxies nginx
+    return response
+
+
+@app.route('/api/profiles/<perfil_id>', methods=['GET'])
+def profile_summary(perfil_id):
+    """Resumen de un perfil: funciones con más tiempo acumulado"""
+    try:
+        verificar_perfilado()
+        resumen = almacen_perfiles.resumen(perfil_id)
+        resumen['pstats'] = f'/api/profiles/{perfil_id}/pstats'
+        return jsonify(resumen)
+    except ErrorPerfilado as e:
+        return jsonify({'error': str(e)}), e.codigo
+
+
+@app.route('/api/profiles/<perfil_id>/pstats', methods=['GET'])
+def profile_download(perfil_id):
+    """Descarga el perfil en formato pstats (snakeviz, gprof2dot, flameprof)"""
+    try:
+        verificar_perfilado()
+        return send_file(
+            almacen_perfiles.ruta_pstats(perfil_id),
+            mimetype='application/octet-stream',
+            as_attachment=True,
+            download_name=f'perfil_{perfil_id}.pstats'
+        )
+    except ErrorPerfilado as e:
+        return jsonify({'error': str(e)}), e.codigo
+
+
+@app.route('/api/uploads', methods=['POST'])
+def init_upload():
+    """
+    Inicia una carga por partes
+    
+    Parámetros (JSON):
+        - filename: Nombre del archivo Excel (requerido)
+        - size: Tamaño total en bytes (requerido)
+        - chunk_size: Tamaño de cada parte en bytes (opcional)
+        - sha256: Hash SHA-256 del archivo completo (opcional)
+    
+    Returns:
+        Estado de la carga con su upload_id
+    """
+    datos = request.get_json(silent=True) or {}
+    filename = datos.get('filename', '')
+    
+    if not allowed_file(filename, ALLOWED_EXTENSIONS):
+        return jsonify({'error': 'Formato de archivo no válido. Use .xlsx o .xls'}), 400
+    
+    try:
+        tamano_total = int(datos.get('size', 0))
+        tamano_parte = int(datos.get('chunk_size', app.config['UPLOAD_CHUNK_MAX_SIZE']))
+        estado = almacen_cargas.iniciar(filename, tamano_total, tamano_parte, datos.get('sha256'))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'size y chunk_size deben ser enteros'}), 400
+    except ErrorCarga as e:
+        return jsonify({'error': str(e)}), e.codigo
+    
+    return jsonify(estado), 201
+
+
+@app.route('/api/uploads/<upload_id>', methods=['GET'])
+def upload_status(upload_id):
+    """Devuelve las partes recibidas y faltantes para reanudar una carga"""
+    try:
+        return jsonify(almacen_cargas.estado(upload_id))
+    except ErrorCarga as e:
+        return jsonify({'error': str(e)}), e.codigo
+
+
+@app.route('/api/uploads/<upload_id>/chunks/<int:indice>', methods=['PUT'])
+def upload_chunk(upload_id, indice):
+    """
+    Recibe una parte en el cuerpo de la petición
+    
+    Encabezados:
+        - X-Chunk-SHA256: Hash SHA-256 de la parte (opcional)
+    """
+    try:
+        estado = almacen_cargas.guardar_parte(
+            upload_id,
+            indice,
+            request.stream,
+            sha256=request.headers.get('X-Chunk-SHA256')
+        )
+        return jsonify(estado)
+    except ErrorCarga as e:
+        return jsonify({'error': str(e)}), e.codigo
+
+
+@app.route('/api/uploads/<upload_id>/finalize', methods=['POST'])
+def finalize_upload(upload_id):
+    """Une las partes y valida el hash; el upload_id queda listo para /api/generate"""
+    try:
+        estado = almacen_cargas.finalizar(upload_id)
+        estado.pop('ruta', None)
+        return jsonify(estado)
+    except ErrorCarga as e:
+        return jsonify({'error': str(e)}), e.codigo
+
+
+@app.route('/api/uploads/<upload_id>', methods=['DELETE'])
+def delete_upload(upload_id):
+    """Descarta una carga por partes"""
+    try:
+        almacen_cargas.eliminar(upload_id)
+        return jsonify({'deleted': True})
+    except ErrorCarga as e:
+        return jsonify({'error': str(e)}), e.codigo
+
+
 @app.route('/api/validate', methods=['POST'])
 def validate_file():
     """
@@ -186,8 +962,7 @@ def validate_file():
         excel_file.save(temp_path)
         
         # Leer y validar
-        import pandas as pd
-        df = pd.read_excel(temp_path)
+        df = leer_excel(temp_path)
         
         # Limpiar archivo temporal
         if temp_path and os.path.exists(temp_path):
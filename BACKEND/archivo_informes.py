@@ -0,0 +1,336 @@
+"""
+Archivo persistente de informes generados
+Cada informe se guarda una sola vez por contenido (SHA-256 del .docx) y un
+índice SQLite registra la UDS, el periodo, el hash de la entrada, el resumen
+de cada pregunta y los tiempos de generación. Listar, buscar, volver a
+descargar y consultar la tendencia de una UDS se responden desde el índice,
+sin releer ningún libro ni documento.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+import time
+import unicodedata
+from contextlib import contextmanager
+
+
+PATRON_PERIODO = re.compile(r'^\d{4}-(0[1-9]|1[0-2])$')
+
+# Versión del esquema del índice (PRAGMA user_version)
+VERSION_ESQUEMA = 1
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS informes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uds TEXT NOT NULL,
+    uds_normalizada TEXT NOT NULL,
+    periodo TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    hash_entrada TEXT NOT NULL,
+    hash_docx TEXT NOT NULL,
+    nombre_archivo TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    total_respuestas INTEGER NOT NULL,
+    total_preguntas INTEGER NOT NULL,
+    porcentaje_favorable REAL,
+    segundos_generacion REAL,
+    segundos_total REAL,
+    etapas TEXT NOT NULL,
+    opciones TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS preguntas (
+    informe_id INTEGER NOT NULL REFERENCES informes(id) ON DELETE CASCADE,
+    orden INTEGER NOT NULL,
+    pregunta TEXT NOT NULL,
+    pregunta_normalizada TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    escala TEXT,
+    total INTEGER NOT NULL,
+    opcion_principal TEXT,
+    porcentaje_principal REAL,
+    porcentaje_favorable REAL,
+    PRIMARY KEY (informe_id, orden)
+);
+CREATE INDEX IF NOT EXISTS informes_uds_periodo ON informes (uds_normalizada, periodo);
+CREATE INDEX IF NOT EXISTS informes_hash_entrada ON informes (hash_entrada);
+CREATE INDEX IF NOT EXISTS preguntas_pregunta ON preguntas (pregunta_normalizada);
+"""
+
+# Columnas de informes que se devuelven al listar
+COLUMNAS_LISTADO = (
+    'id', 'uds', 'periodo', 'fecha', 'hash_entrada', 'hash_docx', 'nombre_archivo', 'bytes',
+    'total_respuestas', 'total_preguntas', 'porcentaje_favorable', 'segundos_generacion', 'segundos_total'
+)
+
+
+class ErrorArchivo(Exception):
+    """Error al consultar el archivo de informes"""
+
+    def __init__(self, mensaje, codigo=400):
+        super().__init__(mensaje)
+        self.codigo = codigo
+
+
+def normalizar_texto(texto):
+    """Minúsculas, sin tildes y con espacios simples (para buscar y agrupar)"""
+    texto = unicodedata.normalize('NFKD', str(texto))
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(texto.lower().split())
+
+
+def validar_periodo(periodo):
+    """
+    Returns:
+        str: El periodo 'AAAA-MM' validado
+
+    Raises:
+        ErrorArchivo: Si no tiene el formato AAAA-MM
+    """
+    if not PATRON_PERIODO.match(periodo or ''):
+        raise ErrorArchivo(f"Periodo no válido: {periodo}. Use el formato AAAA-MM", 400)
+    return periodo
+
+
+class ArchivoInformes:
+    """
+    Informes archivados en disco con su índice
+
+    Estructura en disco:
+        <directorio>/informes/<hash[:2]>/<hash>.docx   (contenido direccionado)
+        <directorio>/indice.sqlite3
+
+    Cada operación abre su propia conexión, así que se puede usar desde
+    varios hilos y varios procesos worker a la vez (SQLite en modo WAL).
+    """
+
+    def __init__(self, directorio):
+        """
+        Args:
+            directorio: Directorio del archivo (documentos e índice)
+        """
+        self.directorio = directorio
+        self.directorio_informes = os.path.join(directorio, 'informes')
+        self.ruta_indice = os.path.join(directorio, 'indice.sqlite3')
+        os.makedirs(self.directorio_informes, exist_ok=True)
+
+        with self._conexion() as con:
+            con.execute('PRAGMA journal_mode = WAL')
+            con.executescript(ESQUEMA)
+            con.execute(f'PRAGMA user_version = {VERSION_ESQUEMA}')
+
+    @contextmanager
+    def _conexion(self):
+        con = sqlite3.connect(self.ruta_indice, timeout=30)
+        con.row_factory = sqlite3.Row
+        con.execute('PRAGMA foreign_keys = ON')
+        try:
+            with con:  # Transacción: commit al salir, rollback si hay error
+                yield con
+        finally:
+            con.close()
+
+    def _ruta_docx(self, hash_docx):
+        return os.path.join(self.directorio_informes, hash_docx[:2], f'{hash_docx}.docx')
+
+    def _guardar_docx(self, archivo_docx):
+        """Copia el documento a su ruta por contenido (una sola vez) y devuelve su hash"""
+        hasher = hashlib.sha256()
+        with open(archivo_docx, 'rb') as f:
+            for bloque in iter(lambda: f.read(1024 * 1024), b''):
+                hasher.update(bloque)
+        hash_docx = hasher.hexdigest()
+
+        destino = self._ruta_docx(hash_docx)
+        if not os.path.exists(destino):
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            temporal = f'{destino}.{os.getpid()}.tmp'
+            shutil.copyfile(archivo_docx, temporal)
+            os.replace(temporal, destino)
+        return hash_docx
+
+    def guardar(self, archivo_docx, resultado, hash_entrada, nombre_archivo=None, periodo=None,
+                segundos_generacion=None, segundos_total=None, opciones=None):
+        """
+        Archiva un informe recién generado
+
+        Args:
+            archivo_docx: Ruta del .docx generado (se copia; el original no se toca)
+            resultado: Diccionario devuelto por generar_informe_word / generar_informe_desde_conteos
+            hash_entrada: Hash de todo lo que determina el informe (clave_generacion)
+            nombre_archivo: Nombre con el que se vuelve a descargar
+            periodo: 'AAAA-MM'; por defecto el de las respuestas o, si no hay, el mes actual
+            segundos_generacion: Duración de la generación
+            segundos_total: Duración de la petición, incluida la espera en cola
+            opciones: Diccionario con los parámetros de la generación
+
+        Returns:
+            dict: id y hash_docx del informe archivado
+        """
+        periodo = validar_periodo(periodo or resultado.get('periodo') or time.strftime('%Y-%m'))
+        hash_docx = self._guardar_docx(archivo_docx)
+        preguntas = resultado.get('preguntas') or []
+        favorables = [p['porcentaje_favorable'] for p in preguntas if p['porcentaje_favorable'] is not None]
+        etapas = [{'etapa': e['etapa'], 'segundos': e['segundos']} for e in resultado['memoria']['etapas']]
+
+        with self._conexion() as con:
+            cursor = con.execute(
+                """INSERT INTO informes (uds, uds_normalizada, periodo, fecha, hash_entrada, hash_docx,
+                       nombre_archivo, bytes, total_respuestas, total_preguntas, porcentaje_favorable,
+                       segundos_generacion, segundos_total, etapas, opciones)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    resultado['nombre_uds'], normalizar_texto(resultado['nombre_uds']), periodo,
+                    time.strftime('%Y-%m-%dT%H:%M:%S'), hash_entrada, hash_docx,
+                    nombre_archivo or os.path.basename(archivo_docx), os.path.getsize(archivo_docx),
+                    int(resultado['total_respuestas']), int(resultado['total_preguntas']),
+                    round(sum(favorables) / len(favorables), 2) if favorables else None,
+                    segundos_generacion, segundos_total,
+                    json.dumps(etapas), json.dumps(opciones or {}, sort_keys=True, default=str)
+                )
+            )
+            informe_id = cursor.lastrowid
+            con.executemany(
+                """INSERT INTO preguntas (informe_id, orden, pregunta, pregunta_normalizada, tipo, escala,
+                       total, opcion_principal, porcentaje_principal, porcentaje_favorable)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                [
+                    (informe_id, orden, p['pregunta'], normalizar_texto(p['pregunta']), p['tipo'], p['escala'],
+                     p['total'], p['opcion_principal'], p['porcentaje_principal'], p['porcentaje_favorable'])
+                    for orden, p in enumerate(preguntas)
+                ]
+            )
+
+        print(f"🗄️  Informe archivado: #{informe_id} {resultado['nombre_uds']} ({periodo})")
+        return {'id': informe_id, 'hash_docx': hash_docx}
+
+    def listar(self, uds=None, periodo=None, desde=None, hasta=None, texto=None, limite=50, desplazamiento=0):
+        """
+        Informes archivados, del más reciente al más antiguo
+
+        Args:
+            uds: Nombre exacto de la UDS (sin distinguir mayúsculas ni tildes)
+            periodo: Periodo exacto 'AAAA-MM'
+            desde, hasta: Rango de periodos 'AAAA-MM' (inclusive)
+            texto: Busca en el nombre de la UDS y en el texto de las preguntas
+            limite: Máximo de informes devueltos (1 a 500)
+            desplazamiento: Informes omitidos (paginación)
+
+        Returns:
+            dict: total de coincidencias e informes de esta página
+        """
+        condiciones, parametros = [], []
+        if uds:
+            condiciones.append('uds_normalizada = ?')
+            parametros.append(normalizar_texto(uds))
+        for campo, operador, valor in (('periodo', '=', periodo), ('periodo', '>=', desde), ('periodo', '<=', hasta)):
+            if valor:
+                condiciones.append(f'{campo} {operador} ?')
+                parametros.append(validar_periodo(valor))
+        if texto:
+            patron = f"%{normalizar_texto(texto).replace('%', '').replace('_', '')}%"
+            condiciones.append(
+                '(uds_normalizada LIKE ? OR id IN (SELECT informe_id FROM preguntas WHERE pregunta_normalizada LIKE ?))'
+            )
+            parametros += [patron, patron]
+
+        if not 1 <= limite <= 500:
+            raise ErrorArchivo('limite debe estar entre 1 y 500', 400)
+        if desplazamiento < 0:
+            raise ErrorArchivo('desplazamiento no puede ser negativo', 400)
+
+        donde = f"WHERE {' AND '.join(condiciones)}" if condiciones else ''
+        with self._conexion() as con:
+            total = con.execute(f'SELECT COUNT(*) FROM informes {donde}', parametros).fetchone()[0]
+            filas = con.execute(
+                f"SELECT {', '.join(COLUMNAS_LISTADO)} FROM informes {donde} ORDER BY id DESC LIMIT ? OFFSET ?",
+                parametros + [limite, desplazamiento]
+            ).fetchall()
+        return {'total': total, 'informes': [dict(fila) for fila in filas]}
+
+    def obtener(self, informe_id):
+        """
+        Returns:
+            dict: Datos del informe con etapas, opciones y el resumen de cada pregunta
+
+        Raises:
+            ErrorArchivo: Si el informe no existe (404)
+        """
+        with self._conexion() as con:
+            fila = con.execute('SELECT * FROM informes WHERE id = ?', (informe_id,)).fetchone()
+            if fila is None:
+                raise ErrorArchivo(f'Informe no encontrado: {informe_id}', 404)
+            preguntas = con.execute(
+                """SELECT pregunta, tipo, escala, total, opcion_principal, porcentaje_principal, porcentaje_favorable
+                   FROM preguntas WHERE informe_id = ? ORDER BY orden""",
+                (informe_id,)
+            ).fetchall()
+
+        informe = {columna: fila[columna] for columna in COLUMNAS_LISTADO}
+        informe['etapas'] = json.loads(fila['etapas'])
+        informe['opciones'] = json.loads(fila['opciones'])
+        informe['preguntas'] = [dict(p) for p in preguntas]
+        return informe
+
+    def documento(self, informe_id):
+        """
+        Returns:
+            tuple: (ruta del .docx archivado, nombre de descarga)
+
+        Raises:
+            ErrorArchivo: Si el informe o su documento no existen (404)
+        """
+        with self._conexion() as con:
+            fila = con.execute('SELECT hash_docx, nombre_archivo FROM informes WHERE id = ?', (informe_id,)).fetchone()
+        if fila is None:
+            raise ErrorArchivo(f'Informe no encontrado: {informe_id}', 404)
+        ruta = self._ruta_docx(fila['hash_docx'])
+        if not os.path.exists(ruta):
+            raise ErrorArchivo(f'El documento del informe {informe_id} ya no está en el archivo', 404)
+        return ruta, fila['nombre_archivo']
+
+    def tendencia(self, uds, pregunta=None):
+        """
+        Porcentaje favorable de una UDS por periodo (el informe más reciente de cada periodo)
+
+        Args:
+            uds: Nombre de la UDS (sin distinguir mayúsculas ni tildes)
+            pregunta: Texto exacto de una pregunta; por defecto el porcentaje de todo el informe
+
+        Returns:
+            list: Puntos {periodo, informe_id, fecha, total_respuestas, porcentaje_favorable}
+                ordenados por periodo
+        """
+        ultimos = """SELECT MAX(id) FROM informes WHERE uds_normalizada = ? GROUP BY periodo"""
+        with self._conexion() as con:
+            if pregunta:
+                filas = con.execute(
+                    f"""SELECT i.periodo, i.id AS informe_id, i.fecha, p.total AS total_respuestas,
+                               p.porcentaje_favorable, p.porcentaje_principal, p.opcion_principal
+                        FROM informes i JOIN preguntas p ON p.informe_id = i.id
+                        WHERE i.id IN ({ultimos}) AND p.pregunta_normalizada = ?
+                        ORDER BY i.periodo""",
+                    (normalizar_texto(uds), normalizar_texto(pregunta))
+                ).fetchall()
+            else:
+                filas = con.execute(
+                    f"""SELECT periodo, id AS informe_id, fecha, total_respuestas, porcentaje_favorable
+                        FROM informes WHERE id IN ({ultimos}) ORDER BY periodo""",
+                    (normalizar_texto(uds),)
+                ).fetchall()
+        return [dict(fila) for fila in filas]
+
+    def metricas(self):
+        """
+        Returns:
+            dict: Informes indexados, documentos distintos y bytes en disco
+        """
+        with self._conexion() as con:
+            informes, documentos = con.execute('SELECT COUNT(*), COUNT(DISTINCT hash_docx) FROM informes').fetchone()
+            bytes_disco = con.execute(
+                'SELECT COALESCE(SUM(bytes), 0) FROM (SELECT DISTINCT hash_docx, bytes FROM informes)'
+            ).fetchone()[0]
+        return {'informes': informes, 'documentos': documentos, 'bytes': bytes_disco}
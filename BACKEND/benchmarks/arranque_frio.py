@@ -0,0 +1,80 @@
+"""
+Benchmark del arranque en frío con y sin artefactos precalculados
+
+Cada medición corre en un proceso nuevo con un directorio temporal vacío
+(como /tmp en una instancia serverless recién creada): importa app.py y
+genera un informe pequeño. Requiere haber corrido construir_artefactos.py.
+
+Uso:
+    python benchmarks/arranque_frio.py --repeticiones 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datos_sinteticos import crear_libro_sintetico
+
+
+DIRECTORIO_BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Se ejecuta en el proceso hijo
+MEDICION = """
+import contextlib, io, json, sys, time
+inicio = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+    importado = time.perf_counter()
+    app.generar_informe_word(sys.argv[1], sys.argv[2], nombre_uds='Benchmark', directorio_trabajo=sys.argv[3])
+fin = time.perf_counter()
+print(json.dumps({'importar': importado - inicio, 'primer_informe': fin - importado, 'total': fin - inicio}))
+"""
+
+
+def medir(excel, con_artefactos):
+    with tempfile.TemporaryDirectory() as tmp:
+        entorno = dict(os.environ, TMPDIR=tmp, DATA_CACHE_ENABLED='0')
+        entorno.pop('MPLCONFIGDIR', None)
+        if not con_artefactos:
+            # Sin artefactos: matplotlib reconstruye su caché en un directorio vacío
+            entorno['ARTEFACTOS_DIR'] = os.path.join(tmp, 'sin_artefactos')
+            entorno['MPLCONFIGDIR'] = os.path.join(tmp, 'mplconfig')
+        trabajo = os.path.join(tmp, 'trabajo')
+        os.makedirs(trabajo)
+        salida = subprocess.run(
+            [sys.executable, '-c', MEDICION, excel, os.path.join(trabajo, 'informe.docx'), trabajo],
+            cwd=DIRECTORIO_BACKEND, env=entorno, capture_output=True, text=True, check=True
+        ).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeticiones', '-n', type=int, default=5)
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.join(DIRECTORIO_BACKEND, 'artefactos', 'manifiesto.json')):
+        print("⚠️  No hay artefactos construidos; ejecute primero: python construir_artefactos.py")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        excel = crear_libro_sintetico(os.path.join(tmp, 'uds_benchmark.xlsx'), 100, 6)
+        print(f"{'modo':>15} {'importar':>9} {'1er informe':>12} {'total':>7}  (mediana de {args.repeticiones}, s)")
+        # Alternar los modos en cada repetición para que el ruido de la máquina afecte a ambos por igual
+        medidas = {False: [], True: []}
+        for _ in range(args.repeticiones):
+            for con_artefactos in (False, True):
+                medidas[con_artefactos].append(medir(excel, con_artefactos))
+        for con_artefactos in (False, True):
+            mediana = {k: statistics.median(m[k] for m in medidas[con_artefactos]) for k in ('importar', 'primer_informe', 'total')}
+            modo = 'con artefactos' if con_artefactos else 'sin artefactos'
+            print(f"{modo:>15} {mediana['importar']:>9.3f} {mediana['primer_informe']:>12.3f} {mediana['total']:>7.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,374 @@
+"""
+Prueba de carga de la API con libros sintéticos
+
+Levanta el servidor de producción (servidor.py) en un puerto local, o usa
+uno ya en marcha con --url, y envía peticiones a /api/generate,
+/api/validate y /api/health con la concurrencia y la tasa indicadas.
+Reporta throughput, latencias p50/p95/p99, errores por endpoint y la
+memoria residente (RSS) del servidor a lo largo de la prueba, y escribe
+un JSON para comparar ejecuciones entre cambios de código.
+
+Uso:
+    python benchmarks/carga_api.py --concurrencia 4 --duracion 60
+    python benchmarks/carga_api.py --tasa 2 --mezcla generate=3,validate=1,health=1 --tamanos 100x10 1000x30
+    python benchmarks/carga_api.py --url http://127.0.0.1:8000 --resultado carga.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datos_sinteticos import crear_libro_sintetico
+
+
+DIRECTORIO_BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENDPOINTS = ('generate', 'validate', 'health')
+PERCENTILES = (50, 95, 99)
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _multipart(campos, archivos):
+    """
+    Codifica un formulario multipart/form-data
+
+    Args:
+        campos: dict {nombre: valor}
+        archivos: dict {nombre: (nombre_archivo, bytes)}
+
+    Returns:
+        tuple: (cuerpo en bytes, cabecera Content-Type)
+    """
+    limite = uuid.uuid4().hex
+    partes = []
+    for nombre, valor in campos.items():
+        partes.append(f'--{limite}\r\nContent-Disposition: form-data; name="{nombre}"\r\n\r\n{valor}\r\n'.encode())
+    for nombre, (nombre_archivo, datos) in archivos.items():
+        partes.append(
+            f'--{limite}\r\nContent-Disposition: form-data; name="{nombre}"; filename="{nombre_archivo}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n'.encode() + datos + b'\r\n'
+        )
+    partes.append(f'--{limite}--\r\n'.encode())
+    return b''.join(partes), f'multipart/form-data; boundary={limite}'
+
+
+def _peticion(url, endpoint, libro, timeout):
+    """
+    Ejecuta una petición y mide su latencia
+
+    Returns:
+        tuple: (código HTTP o None, segundos, bytes de respuesta, error)
+    """
+    if endpoint == 'health':
+        req = urllib.request.Request(f'{url}/api/health')
+    else:
+        nombre_archivo, datos = libro
+        # Un nombre distinto por petición: las generaciones idénticas simultáneas se
+        # coalescen y se mediría una copia en lugar de una generación (también con --url)
+        campos = {'nombre_uds': f'Prueba de carga {uuid.uuid4().hex[:8]}'} if endpoint == 'generate' else {}
+        cuerpo, tipo = _multipart(campos, {'excel_file': (nombre_archivo, datos)})
+        req = urllib.request.Request(f'{url}/api/{endpoint}', data=cuerpo, method='POST',
+                                     headers={'Content-Type': tipo})
+
+    inicio = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as respuesta:
+            tamano = len(respuesta.read())
+            return respuesta.status, time.perf_counter() - inicio, tamano, None
+    except urllib.error.HTTPError as e:
+        e.read()
+        return e.code, time.perf_counter() - inicio, 0, None
+    except Exception as e:
+        return None, time.perf_counter() - inicio, 0, f'{type(e).__name__}: {e}'
+
+
+def _rss_arbol(pid):
+    """
+    RSS total en bytes de un proceso y sus descendientes (maestro + workers)
+
+    Lee /proc, así que solo funciona en Linux; en otro sistema devuelve None.
+    """
+    if not os.path.isdir('/proc'):
+        return None
+    hijos = {}
+    rss = {}
+    for entrada in os.listdir('/proc'):
+        if not entrada.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entrada}/status') as f:
+                estado = dict(linea.split(':', 1) for linea in f if ':' in linea)
+        except OSError:
+            continue
+        hijos.setdefault(int(estado['PPid'].strip()), []).append(int(entrada))
+        if 'VmRSS' in estado:
+            rss[int(entrada)] = int(estado['VmRSS'].split()[0]) * 1024
+
+    total = 0
+    pendientes = [pid]
+    while pendientes:
+        actual = pendientes.pop()
+        total += rss.get(actual, 0)
+        pendientes.extend(hijos.get(actual, []))
+    return total
+
+
+def percentil(valores, p):
+    """Percentil por el método del rango más cercano"""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    indice = max(0, min(len(ordenados) - 1, int(round(p / 100 * len(ordenados) + 0.5)) - 1))
+    return ordenados[indice]
+
+
+def parsear_mezcla(texto):
+    """Convierte 'generate=3,validate=1' en {'generate': 3, 'validate': 1}"""
+    mezcla = {}
+    for parte in texto.split(','):
+        nombre, _, peso = parte.partition('=')
+        nombre = nombre.strip()
+        if nombre not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Endpoint desconocido: {nombre}. Use {ENDPOINTS}")
+        mezcla[nombre] = float(peso or 1)
+    return mezcla
+
+
+def parsear_tamano(texto):
+    """Convierte '500x20' en (500 filas, 20 preguntas)"""
+    filas, _, preguntas = texto.lower().partition('x')
+    return int(filas), int(preguntas or 10)
+
+
+def iniciar_servidor(puerto, workers, entorno_extra=None):
+    """
+    Arranca servidor.py en segundo plano y espera a que responda /api/health
+
+    Returns:
+        Popen: Proceso del maestro de gunicorn
+    """
+    entorno = dict(os.environ, **(entorno_extra or {}))
+    proceso = subprocess.Popen(
+        [sys.executable, 'servidor.py', '--bind', f'127.0.0.1:{puerto}', '--workers', str(workers),
+         '--max-requests', '0'],
+        cwd=DIRECTORIO_BACKEND, env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    limite = time.monotonic() + 60
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError(f"El servidor terminó al arrancar (código {proceso.returncode})")
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{puerto}/api/health', timeout=1):
+                return proceso
+        except OSError:
+            time.sleep(0.2)
+    proceso.terminate()
+    raise RuntimeError("El servidor no respondió en 60s")
+
+
+def ejecutar_carga(url, libros, mezcla, concurrencia, duracion, tasa=None, timeout=120, semilla=0):
+    """
+    Envía peticiones durante duracion segundos
+
+    Con tasa=None cada hilo envía la siguiente petición en cuanto recibe la
+    respuesta (carga cerrada). Con una tasa en peticiones/segundo las
+    salidas se programan a intervalos fijos y la latencia se mide desde el
+    instante programado, para no ocultar el tiempo de espera en cola.
+
+    Returns:
+        list: Muestras (inicio relativo, endpoint, código, segundos, bytes, error)
+    """
+    rnd = random.Random(semilla)
+    nombres = list(mezcla)
+    pesos = [mezcla[n] for n in nombres]
+    plan = ((rnd.choices(nombres, pesos)[0], rnd.choice(libros)) for _ in itertools.count())
+    bloqueo = threading.Lock()
+    muestras = []
+    inicio = time.perf_counter()
+    fin = inicio + duracion
+    secuencia = itertools.count()
+
+    def hilo():
+        while True:
+            with bloqueo:
+                endpoint, libro = next(plan)
+                n = next(secuencia)
+            programada = inicio + n / tasa if tasa else time.perf_counter()
+            if programada >= fin:
+                return
+            espera = programada - time.perf_counter()
+            if espera > 0:
+                time.sleep(espera)
+            codigo, segundos, tamano, error = _peticion(url, endpoint, libro, timeout)
+            if tasa:
+                segundos = time.perf_counter() - programada
+            with bloqueo:
+                muestras.append((programada - inicio, endpoint, codigo, segundos, tamano, error))
+
+    hilos = [threading.Thread(target=hilo, daemon=True) for _ in range(concurrencia)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    return muestras
+
+
+def resumir(muestras, duracion):
+    """
+    Agrega las muestras por endpoint
+
+    Returns:
+        dict: Por endpoint: peticiones, throughput, errores por código y percentiles
+    """
+    resumen = {}
+    for endpoint in sorted({m[1] for m in muestras}) + ['total']:
+        grupo = [m for m in muestras if endpoint in ('total', m[1])]
+        exitos = [m[3] for m in grupo if m[2] == 200]
+        codigos = {}
+        for m in grupo:
+            clave = str(m[2]) if m[2] is not None else 'conexion'
+            codigos[clave] = codigos.get(clave, 0) + 1
+        errores = len(grupo) - len(exitos)
+        resumen[endpoint] = {
+            'peticiones': len(grupo),
+            'exitos': len(exitos),
+            'throughput_rps': round(len(exitos) / duracion, 3) if duracion else None,
+            'tasa_error': round(errores / len(grupo), 4) if grupo else 0,
+            'codigos': codigos,
+            'latencia_ms': {
+                f'p{p}': round(percentil(exitos, p) * 1000, 1) if exitos else None
+                for p in PERCENTILES
+            },
+            'bytes_respuesta_medio': round(sum(m[4] for m in grupo) / len(grupo)) if grupo else 0
+        }
+    return resumen
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='API ya en marcha (por defecto se arranca servidor.py en un puerto libre)')
+    parser.add_argument('--workers', type=int, default=2, help='Workers del servidor arrancado localmente')
+    parser.add_argument('--concurrencia', '-c', type=int, default=4, help='Peticiones simultáneas')
+    parser.add_argument('--tasa', type=float, help='Peticiones por segundo (por defecto: carga cerrada)')
+    parser.add_argument('--duracion', '-d', type=float, default=30, help='Segundos de carga')
+    parser.add_argument('--mezcla', type=parsear_mezcla, default=parsear_mezcla('generate=2,validate=1,health=1'),
+                        help='Pesos por endpoint (por defecto: generate=2,validate=1,health=1)')
+    parser.add_argument('--tamanos', type=parsear_tamano, nargs='+', default=[(100, 10), (500, 20), (2000, 30)],
+                        help='Libros sintéticos como FILASxPREGUNTAS (por defecto: 100x10 500x20 2000x30)')
+    parser.add_argument('--intervalo-rss', type=float, default=0.5, help='Segundos entre muestras de RSS')
+    parser.add_argument('--timeout', type=float, default=120, help='Timeout por petición en segundos')
+    parser.add_argument('--resultado', '-o', default='carga_api.json', help='Archivo JSON de resultados')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        libros = []
+        for filas, preguntas in args.tamanos:
+            ruta = crear_libro_sintetico(os.path.join(tmp, f'uds_{filas}x{preguntas}.xlsx'), filas, preguntas)
+            with open(ruta, 'rb') as f:
+                libros.append((os.path.basename(ruta), f.read()))
+        print(f"📊 {len(libros)} libro(s) sintético(s): {', '.join(n for n, _ in libros)}")
+
+        servidor = None
+        url = args.url
+        if not url:
+            puerto = _puerto_libre()
+            print(f"🚀 Arrancando servidor.py en 127.0.0.1:{puerto} con {args.workers} worker(s)...")
+            # Sin caché de datos, coalescencia ni archivo: cada petición mide el
+            # camino completo de lectura y generación, sin escribir en el índice
+            servidor = iniciar_servidor(puerto, args.workers, {
+                'DATA_CACHE_ENABLED': '0',
+                'GENERATION_COALESCE': '0',
+                'REPORT_ARCHIVE': '0',
+                'GENERATION_MAX_CONCURRENCY': str(max(1, args.concurrencia)),
+                'GENERATION_MAX_QUEUE': str(max(1, args.concurrencia) * 2),
+            })
+            url = f'http://127.0.0.1:{puerto}'
+
+        rss = []
+        detener = threading.Event()
+
+        def muestrear_rss():
+            inicio = time.perf_counter()
+            while not detener.is_set():
+                valor = _rss_arbol(servidor.pid)
+                if valor is not None:
+                    rss.append((round(time.perf_counter() - inicio, 2), valor))
+                detener.wait(args.intervalo_rss)
+
+        muestreador = None
+        if servidor:
+            muestreador = threading.Thread(target=muestrear_rss, daemon=True)
+            muestreador.start()
+
+        modo = f"{args.tasa} pet/s" if args.tasa else "carga cerrada"
+        print(f"⏱️  {args.duracion:.0f}s, concurrencia {args.concurrencia}, {modo}")
+        try:
+            inicio = time.perf_counter()
+            muestras = ejecutar_carga(url, libros, args.mezcla, args.concurrencia, args.duracion,
+                                      tasa=args.tasa, timeout=args.timeout)
+            transcurrido = time.perf_counter() - inicio
+        finally:
+            detener.set()
+            if muestreador:
+                muestreador.join()
+            if servidor:
+                servidor.terminate()
+                servidor.wait(timeout=30)
+
+    resumen = resumir(muestras, transcurrido)
+
+    print(f"\n{'endpoint':>9} {'pet':>5} {'ok':>5} {'rps':>7} {'error':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for endpoint, r in resumen.items():
+        lat = r['latencia_ms']
+        fmt = lambda v: f"{v:>8.1f}" if v is not None else f"{'-':>8}"
+        print(f"{endpoint:>9} {r['peticiones']:>5} {r['exitos']:>5} {r['throughput_rps']:>7.2f} "
+              f"{r['tasa_error'] * 100:>5.1f}% {fmt(lat['p50'])} {fmt(lat['p95'])} {fmt(lat['p99'])}")
+    if rss:
+        print(f"\n🧠 RSS del servidor: inicio {rss[0][1] / 2**20:.0f} MB, "
+              f"pico {max(v for _, v in rss) / 2**20:.0f} MB, final {rss[-1][1] / 2**20:.0f} MB")
+
+    errores = sorted({m[5] for m in muestras if m[5]})
+    for error in errores[:5]:
+        print(f"  ⚠️  {error}")
+
+    resultado = {
+        'fecha': datetime.now().isoformat(),
+        'configuracion': {
+            'url': args.url or 'local',
+            'workers': None if args.url else args.workers,
+            'concurrencia': args.concurrencia,
+            'tasa': args.tasa,
+            'duracion': args.duracion,
+            'mezcla': args.mezcla,
+            'tamanos': [f'{f}x{p}' for f, p in args.tamanos],
+        },
+        'duracion_real': round(transcurrido, 3),
+        'resumen': resumen,
+        'rss': [{'t': t, 'bytes': v} for t, v in rss],
+        'errores': errores,
+    }
+    with open(args.resultado, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Resultados en {args.resultado}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Libros de Excel sintéticos con la forma de una encuesta de satisfacción real
+(marca temporal, correo, preguntas Likert 1-5, sí/no y de satisfacción)
+"""
+
+import random
+
+
+ESCALAS = [
+    ['5', '4', '3', '2', '1'],
+    ['Si', 'No'],
+    ['Muy satisfecho', 'Satisfecho', 'Insatisfecho'],
+    ['Excelente', 'Bueno', 'Regular', 'Malo'],
+]
+
+TEMAS = ['la calidad del servicio', 'la alimentación', 'la comunicación con las familias',
+         'los espacios', 'el talento humano', 'las actividades pedagógicas',
+         'la higiene', 'la seguridad', 'los horarios', 'los materiales']
+
+
+def crear_dataframe_sintetico(filas, preguntas, semilla=0, unanimes=0):
+    """
+    Construye un DataFrame de encuesta sintético
+
+    Args:
+        filas: Número de respuestas
+        preguntas: Número de preguntas
+        semilla: Semilla del generador aleatorio
+        unanimes: Cuántas de las preguntas tienen una única respuesta (100%)
+
+    Returns:
+        DataFrame: Datos de la encuesta
+    """
+    import pandas as pd
+
+    rnd = random.Random(semilla)
+    datos = {
+        'Marca temporal': pd.date_range('2025-01-01', periods=filas, freq='h'),
+        'Dirección de correo electrónico': [f'usuario{i}@correo.com' for i in range(filas)],
+    }
+    for i in range(preguntas):
+        escala = ESCALAS[i % len(ESCALAS)]
+        pesos = [len(escala) - j for j in range(len(escala))]
+        titulo = f'{i + 1}. ¿Cómo califica {TEMAS[i % len(TEMAS)]}?'
+        if i < unanimes:
+            datos[titulo] = [escala[0]] * filas
+        else:
+            datos[titulo] = rnd.choices(escala, weights=pesos, k=filas)
+    return pd.DataFrame(datos)
+
+
+def crear_libro_sintetico(ruta, filas, preguntas, semilla=0, unanimes=0):
+    """
+    Escribe un libro .xlsx sintético
+
+    Returns:
+        str: Ruta del archivo creado
+    """
+    crear_dataframe_sintetico(filas, preguntas, semilla, unanimes).to_excel(ruta, index=False)
+    return ruta
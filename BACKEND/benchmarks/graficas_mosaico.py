@@ -0,0 +1,101 @@
+"""
+Benchmark del motor de gráficas 'mosaico' frente a una figura por gráfica
+Mide el tiempo de render de las gráficas de un informe sintético y compara
+píxel a píxel cada tesela con la gráfica individual ('matplotlib'). Termina
+con código 1 si alguna tesela no es visualmente equivalente.
+
+Uso:
+    python benchmarks/graficas_mosaico.py --preguntas 10 30 100
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datos_sinteticos import crear_dataframe_sintetico
+
+
+# Umbrales de equivalencia visual (canales de 0 a 255)
+DIFERENCIA_MEDIA_MAX = 3.0
+FRACCION_DISTINTA_MAX = 0.03  # Píxeles con algún canal a más de 64 de distancia
+
+
+def graficas_informe(preguntas, filas):
+    """Lista de (porcentajes_exactos, pregunta) como las arma el informe"""
+    from generador import analizar_columna
+
+    df = crear_dataframe_sintetico(filas, preguntas)
+    graficas = []
+    for columna in df.columns[2:]:
+        resultado = analizar_columna(df, columna)
+        graficas.append((resultado['porcentajes_exactos'], resultado['pregunta']))
+    return graficas
+
+
+def comparar(buffer_a, buffer_b):
+    """
+    Returns:
+        tuple: (mismo tamaño, diferencia media, fracción de píxeles distintos)
+    """
+    import numpy as np
+    from PIL import Image
+
+    a = np.asarray(Image.open(buffer_a).convert('RGB'), dtype=np.int16)
+    b = np.asarray(Image.open(buffer_b).convert('RGB'), dtype=np.int16)
+    if a.shape != b.shape:
+        return False, float('inf'), 1.0
+    diferencia = np.abs(a - b)
+    return True, float(diferencia.mean()), float((diferencia.max(axis=2) > 64).mean())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--preguntas', type=int, nargs='+', default=[10, 30, 100])
+    parser.add_argument('--filas', type=int, default=200)
+    parser.add_argument('--dpi', type=int, default=300)
+    args = parser.parse_args()
+
+    from generador.graficas import crear_graficas_circulares, GRAFICAS_POR_LAMINA
+
+    # Calentar importaciones y caché de fuentes para no cargarlas a la primera medición
+    calentamiento = graficas_informe(1, args.filas)
+    for motor in ('matplotlib', 'mosaico'):
+        crear_graficas_circulares(calentamiento, motor=motor, dpi=args.dpi)
+
+    equivalentes = True
+    print(f"Gráficas por lámina: {GRAFICAS_POR_LAMINA}")
+    print(f"{'preguntas':>9} {'matplotlib s':>13} {'mosaico s':>10} {'mejora':>7} {'dif. media':>11} {'% distintos':>12}")
+    for preguntas in args.preguntas:
+        graficas = graficas_informe(preguntas, args.filas)
+
+        inicio = time.perf_counter()
+        individuales = crear_graficas_circulares(graficas, motor='matplotlib', dpi=args.dpi)
+        segundos_individual = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        teselas = crear_graficas_circulares(graficas, motor='mosaico', dpi=args.dpi)
+        segundos_mosaico = time.perf_counter() - inicio
+
+        peor_media = 0.0
+        peor_fraccion = 0.0
+        for (_, titulo), individual, tesela in zip(graficas, individuales, teselas):
+            mismo_tamano, media, fraccion = comparar(individual, tesela)
+            peor_media = max(peor_media, media)
+            peor_fraccion = max(peor_fraccion, fraccion)
+            if not mismo_tamano or media > DIFERENCIA_MEDIA_MAX or fraccion > FRACCION_DISTINTA_MAX:
+                equivalentes = False
+                print(f"❌ Tesela distinta ({'tamaño' if not mismo_tamano else f'{media:.2f} / {fraccion:.2%}'}): {titulo}")
+
+        print(f"{preguntas:>9} {segundos_individual:>13.2f} {segundos_mosaico:>10.2f} "
+              f"{segundos_individual / segundos_mosaico:>6.2f}x {peor_media:>11.2f} {peor_fraccion:>12.2%}")
+
+    if not equivalentes:
+        sys.exit(1)
+    print("✅ Todas las teselas son visualmente equivalentes a la gráfica individual")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""
+Equivalencia visual del motor de gráficas 'pillow' frente a 'matplotlib'
+Renderiza las mismas distribuciones con ambos motores (casos límite y las
+preguntas de un informe sintético) y compara:
+
+- tamaño en píxeles del PNG
+- sectores: color de la torta muestreado en coordenadas polares alrededor
+  del centro de cada torta (detecta sectores girados, reflejados o de otro
+  tamaño aunque los dos motores no ubiquen la torta en el mismo píxel)
+- píxeles distintos de la imagen completa, reescalada al tamaño de matplotlib
+
+Termina con código 1 si alguna gráfica supera los umbrales.
+
+Uso:
+    python benchmarks/graficas_pillow.py --preguntas 20
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datos_sinteticos import crear_dataframe_sintetico
+
+
+# Umbrales de equivalencia visual
+# Con el título en dos líneas matplotlib agranda la figura y pillow achica la
+# torta dentro del lienzo fijo: el alto llega a diferir ~10%
+DIFERENCIA_TAMANO_MAX = 0.15   # Diferencia relativa de ancho o alto del PNG
+SECTORES_DISTINTOS_MAX = 0.02  # Muestras polares con distinto color de sector
+FRACCION_DISTINTA_MAX = 0.25   # Píxeles con algún canal a más de 64 de distancia
+
+# Distancia máxima (por canal) para asignar un píxel a un color de la paleta
+_TOLERANCIA_COLOR = 24
+
+CASOS_LIMITE = [
+    ({'Sí': 100.0}, '¿Recomendaría el servicio?'),
+    ({'Sí': 97.0, 'No': 3.0}, '¿El horario de atención es adecuado?'),
+    ({'Sí': 80.0, 'No': 20.0}, '¿Está satisfecho con la alimentación?'),
+    ({'5': 50.0, '4': 30.0, '3': 20.0}, '¿Cómo califica la calidad del servicio?'),
+    ({'Muy satisfecho': 40.0, 'Satisfecho': 30.0, 'Neutral': 15.0, 'Insatisfecho': 10.0,
+      'Muy insatisfecho': 5.0},
+     '¿Qué tan satisfecho está con la atención que recibe su hijo o hija en la unidad de servicio?'),
+    ({str(i): 10.0 for i in range(1, 11)}, 'Diez opciones con el mismo porcentaje'),
+]
+
+
+def graficas_informe(preguntas, filas):
+    """Lista de (porcentajes_exactos, pregunta) como las arma el informe"""
+    from generador import analizar_columna
+
+    df = crear_dataframe_sintetico(filas, preguntas)
+    graficas = []
+    for columna in df.columns[2:]:
+        resultado = analizar_columna(df, columna)
+        graficas.append((resultado['porcentajes_exactos'], resultado['pregunta']))
+    return graficas
+
+
+def _clases(imagen):
+    """Índice de la paleta de cada píxel (-1 si no es color de sector)"""
+    import numpy as np
+    from generador.graficas import COLORES
+
+    paleta = np.array([[int(color[i:i + 2], 16) for i in (1, 3, 5)] for color in COLORES], dtype=np.int16)
+    pixeles = np.asarray(imagen, dtype=np.int16)
+    distancia = np.abs(pixeles[:, :, None, :] - paleta[None, None]).max(axis=3)
+    clases = distancia.argmin(axis=2)
+    clases[distancia.min(axis=2) >= _TOLERANCIA_COLOR] = -1
+    return clases
+
+
+def _muestreo_polar(imagen, angulos=360, radios=8):
+    """
+    Color de sector en una grilla polar de 0.2 a 0.9 radios alrededor del
+    centro de la torta (centroide y radio equivalente de los píxeles de color)
+    """
+    import numpy as np
+
+    clases = _clases(imagen)
+    ys, xs = np.nonzero(clases >= 0)
+    if len(ys) == 0:
+        return np.full((angulos, radios), -1)
+    cy, cx = ys.mean(), xs.mean()
+    radio = np.sqrt(len(ys) / np.pi)
+
+    angulo = np.radians(np.arange(angulos) * 360.0 / angulos)[:, None]
+    fraccion = np.linspace(0.2, 0.9, radios)[None, :]
+    py = np.clip(np.round(cy - radio * fraccion * np.sin(angulo)).astype(int), 0, clases.shape[0] - 1)
+    px = np.clip(np.round(cx + radio * fraccion * np.cos(angulo)).astype(int), 0, clases.shape[1] - 1)
+    return clases[py, px]
+
+
+def comparar(buffer_matplotlib, buffer_pillow):
+    """
+    Returns:
+        tuple: (diferencia relativa de tamaño, fracción de sectores distintos,
+            fracción de píxeles distintos)
+    """
+    import numpy as np
+    from PIL import Image
+
+    a = Image.open(buffer_matplotlib).convert('RGB')
+    b = Image.open(buffer_pillow).convert('RGB')
+    tamano = max(abs(b.width / a.width - 1), abs(b.height / a.height - 1))
+
+    # Las muestras sobre un porcentaje (texto blanco) no cuentan
+    polar_a, polar_b = _muestreo_polar(a), _muestreo_polar(b)
+    validas = (polar_a >= 0) & (polar_b >= 0)
+    sectores = float((polar_a[validas] != polar_b[validas]).mean()) if validas.any() else 1.0
+
+    diferencia = np.abs(np.asarray(a, dtype=np.int16)
+                        - np.asarray(b.resize(a.size, Image.LANCZOS), dtype=np.int16))
+    return tamano, sectores, float((diferencia.max(axis=2) > 64).mean())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--preguntas', type=int, default=20, help='Preguntas del informe sintético')
+    parser.add_argument('--filas', type=int, default=200)
+    parser.add_argument('--dpi', type=int, default=300)
+    args = parser.parse_args()
+
+    from generador.graficas import crear_grafica_circular
+
+    graficas = CASOS_LIMITE + graficas_informe(args.preguntas, args.filas)
+
+    # Calentar importaciones y caché de fuentes para no cargarlas a la primera medición
+    for motor in ('matplotlib', 'pillow'):
+        crear_grafica_circular(*CASOS_LIMITE[0], motor=motor, dpi=args.dpi)
+
+    equivalentes = True
+    segundos = {'matplotlib': 0.0, 'pillow': 0.0}
+    peor = [0.0, 0.0, 0.0]
+    print(f"{'opciones':>8} {'tamaño':>7} {'sectores':>9} {'% distintos':>12}  pregunta")
+    for datos, titulo in graficas:
+        buffers = {}
+        for motor in segundos:
+            inicio = time.perf_counter()
+            buffers[motor] = crear_grafica_circular(datos, titulo, motor=motor, dpi=args.dpi)
+            segundos[motor] += time.perf_counter() - inicio
+
+        tamano, sectores, fraccion = comparar(buffers['matplotlib'], buffers['pillow'])
+        peor = [max(p, v) for p, v in zip(peor, (tamano, sectores, fraccion))]
+        fuera = (tamano > DIFERENCIA_TAMANO_MAX or sectores > SECTORES_DISTINTOS_MAX
+                 or fraccion > FRACCION_DISTINTA_MAX)
+        if fuera:
+            equivalentes = False
+        print(f"{len(datos):>8} {tamano:>7.1%} {sectores:>9.1%} {fraccion:>12.1%}  "
+              f"{'❌ ' if fuera else ''}{titulo[:60]}")
+
+    print(f"\nPeor caso: tamaño {peor[0]:.1%} (máx. {DIFERENCIA_TAMANO_MAX:.0%}), "
+          f"sectores {peor[1]:.1%} (máx. {SECTORES_DISTINTOS_MAX:.0%}), "
+          f"píxeles distintos {peor[2]:.1%} (máx. {FRACCION_DISTINTA_MAX:.0%})")
+    print(f"Tiempo total: matplotlib {segundos['matplotlib']:.2f}s, pillow {segundos['pillow']:.2f}s "
+          f"({segundos['matplotlib'] / segundos['pillow']:.1f}x)")
+
+    if not equivalentes:
+        sys.exit(1)
+    print("✅ Las gráficas de pillow son visualmente equivalentes a las de matplotlib")
+
+
+if __name__ == '__main__':
+    main()
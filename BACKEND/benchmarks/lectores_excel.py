@@ -0,0 +1,46 @@
+"""
+Matriz de benchmark de los motores de lectura: filas × columnas × motor
+
+Uso:
+    python benchmarks/lectores_excel.py --filas 100 1000 10000 --columnas 10 40 --repeticiones 3
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generador.lectura import leer_excel, motores_disponibles, CADENAS_RESPALDO
+from datos_sinteticos import crear_libro_sintetico
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--columnas', type=int, nargs='+', default=[10, 40])
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    motores = [m for m in motores_disponibles() if m in CADENAS_RESPALDO['.xlsx']]
+    print(f"Motores disponibles para .xlsx: {', '.join(motores)}\n")
+    print(f"{'filas':>7} {'columnas':>8} {'motor':>10} {'mejor s':>9} {'filas/s':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for filas in args.filas:
+            for columnas in args.columnas:
+                excel = crear_libro_sintetico(os.path.join(tmp, f'l_{filas}_{columnas}.xlsx'), filas, columnas)
+                for motor in motores:
+                    tiempos = []
+                    for _ in range(args.repeticiones):
+                        inicio = time.perf_counter()
+                        leer_excel(excel, motor=motor)
+                        tiempos.append(time.perf_counter() - inicio)
+                    mejor = min(tiempos)
+                    print(f"{filas:>7} {columnas:>8} {motor:>10} {mejor:>9.3f} {filas / mejor:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark de los motores de documento ('docx' e 'incremental')
+Cada medición corre en un proceso aparte para que el pico de memoria
+(ru_maxrss) de un motor no contamine al otro
+
+Uso:
+    python benchmarks/motores_documento.py --preguntas 30 100 200
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datos_sinteticos import crear_libro_sintetico
+
+
+DIRECTORIO_BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Se ejecuta en el proceso hijo
+MEDICION = """
+import contextlib, io, json, os, resource, sys, time
+from generador import generar_informe_word
+inicio = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    generar_informe_word(sys.argv[1], sys.argv[2], nombre_uds='Benchmark', directorio_trabajo=sys.argv[3],
+                         motor_documento=sys.argv[4])
+print(json.dumps({
+    'segundos': time.perf_counter() - inicio,
+    'rss_pico_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'bytes': os.path.getsize(sys.argv[2])
+}))
+"""
+
+
+def medir(excel, salida, motor):
+    resultado = subprocess.run(
+        [sys.executable, '-c', MEDICION, excel, salida, os.path.dirname(salida), motor],
+        cwd=DIRECTORIO_BACKEND, capture_output=True, text=True, check=True
+    )
+    return json.loads(resultado.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--preguntas', type=int, nargs='+', default=[30, 100, 200])
+    parser.add_argument('--filas', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'preguntas':>9} {'motor':>12} {'seg':>7} {'RSS pico MB':>12} {'docx KB':>9}")
+        for preguntas in args.preguntas:
+            excel = crear_libro_sintetico(os.path.join(tmp, f'uds_{preguntas}.xlsx'), args.filas, preguntas)
+            for motor in ('docx', 'incremental'):
+                r = medir(excel, os.path.join(tmp, f'informe_{preguntas}_{motor}.docx'), motor)
+                print(f"{preguntas:>9} {motor:>12} {r['segundos']:>7.2f} {r['rss_pico_mb']:>12.1f} {r['bytes'] / 1024:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
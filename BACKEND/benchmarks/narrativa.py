@@ -0,0 +1,82 @@
+"""
+Texto de resultados por pregunta: verificación de referencia y tiempos
+Compara la redacción de cada distribución de narrativa_golden.json con el
+texto que producía el generador antes de las plantillas (termina con código
+1 si alguna cambia) y mide la redacción de un consolidado sintético de
+varias UDS con la memoización en frío y en caliente.
+
+Uso:
+    python benchmarks/narrativa.py --uds 50 --preguntas 100
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datos_sinteticos import crear_dataframe_sintetico
+
+
+ARCHIVO_REFERENCIA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'narrativa_golden.json')
+
+
+def verificar_referencia():
+    """
+    Returns:
+        int: Número de textos distintos a la referencia
+    """
+    from generador.analizador import detectar_escala
+    from generador.documento import _generar_texto_resultado
+
+    with open(ARCHIVO_REFERENCIA, 'r', encoding='utf-8') as f:
+        casos = json.load(f)
+
+    distintos = 0
+    for caso in casos:
+        items = [tuple(item) for item in caso['items']]
+        escala = detectar_escala([valor for valor, _ in items])
+        for texto in (_generar_texto_resultado(items), _generar_texto_resultado(items, escala)):
+            if texto != caso['texto']:
+                distintos += 1
+                print(f"❌ {caso['items']}\n   esperado: {caso['texto']}\n   obtenido: {texto}")
+    print(f"Referencia: {len(casos)} distribuciones, {distintos} textos distintos")
+    return distintos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--uds', type=int, default=50)
+    parser.add_argument('--preguntas', type=int, default=100)
+    parser.add_argument('--filas', type=int, default=60)
+    args = parser.parse_args()
+
+    if verificar_referencia():
+        sys.exit(1)
+
+    from generador import analizar_columna
+    from generador.documento import _generar_texto_resultado, _redactar_resultado
+
+    # Un resultado por pregunta y UDS, como en un consolidado
+    resultados = []
+    for semilla in range(args.uds):
+        df = crear_dataframe_sintetico(args.filas, args.preguntas, semilla=semilla)
+        resultados.extend(analizar_columna(df, columna) for columna in df.columns[2:])
+
+    _redactar_resultado.cache_clear()
+    print(f"{'modo':>10} {'textos':>8} {'ms':>8} {'µs/texto':>9}")
+    for modo in ('frio', 'caliente'):
+        inicio = time.perf_counter()
+        for resultado in resultados:
+            _generar_texto_resultado(list(resultado['porcentajes'].items()), resultado['escala'])
+        segundos = time.perf_counter() - inicio
+        print(f"{modo:>10} {len(resultados):>8} {segundos * 1000:>8.1f} {segundos / len(resultados) * 1e6:>9.2f}")
+
+    info = _redactar_resultado.cache_info()
+    print(f"Distribuciones distintas: {info.currsize} de {len(resultados)} preguntas")
+
+
+if __name__ == '__main__':
+    main()
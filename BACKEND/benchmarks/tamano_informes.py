@@ -0,0 +1,65 @@
+"""
+Benchmark del tamaño de los informes con y sin compactación de imágenes
+
+Uso:
+    python benchmarks/tamano_informes.py --preguntas 10 30 --filas 200
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generador import generar_informe_word
+from datos_sinteticos import crear_libro_sintetico
+
+
+def medir(archivo_excel, archivo_salida, compactar):
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        generar_informe_word(archivo_excel, archivo_salida, nombre_uds='Benchmark',
+                             compactar_imagenes=compactar)
+    segundos = time.perf_counter() - inicio
+
+    with zipfile.ZipFile(archivo_salida) as z:
+        medios = [i for i in z.infolist() if i.filename.startswith('word/media/')]
+    return {
+        'bytes': os.path.getsize(archivo_salida),
+        'medios': len(medios),
+        'bytes_medios': sum(i.file_size for i in medios),
+        'segundos': segundos
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--preguntas', type=int, nargs='+', default=[10, 30])
+    parser.add_argument('--filas', type=int, default=200)
+    parser.add_argument('--unanimes', type=int, default=2, help='Preguntas con 100%% en una respuesta')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'preguntas':>9} {'modo':>10} {'docx KB':>9} {'medios':>6} {'medios KB':>9} {'seg':>6}")
+        for preguntas in args.preguntas:
+            excel = crear_libro_sintetico(os.path.join(tmp, f'uds_{preguntas}.xlsx'),
+                                          args.filas, preguntas, unanimes=args.unanimes)
+            base = None
+            for compactar in (False, True):
+                r = medir(excel, os.path.join(tmp, f'informe_{preguntas}_{compactar}.docx'), compactar)
+                modo = 'compacto' if compactar else 'original'
+                print(f"{preguntas:>9} {modo:>10} {r['bytes'] / 1024:>9.1f} {r['medios']:>6} "
+                      f"{r['bytes_medios'] / 1024:>9.1f} {r['segundos']:>6.2f}")
+                if base is None:
+                    base = r['bytes']
+                else:
+                    print(f"{'':>9} {'reducción':>10} {base / r['bytes']:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
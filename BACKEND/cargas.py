@@ -0,0 +1,347 @@
+"""
+Cargas por partes (chunked) y reanudables para archivos grandes
+Cada parte se recibe en un buffer temporal con umbral de memoria configurable
+y se persiste en disco, de modo que la memoria por petición queda acotada
+sin importar el tamaño total del archivo
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from werkzeug.utils import secure_filename
+
+try:
+    import fcntl
+except ImportError:  # Windows: el bloqueo solo cubre los hilos del proceso
+    fcntl = None
+
+
+# Tamaño de bloque para copiar flujos a disco
+TAMANO_BLOQUE = 64 * 1024
+
+
+class ErrorCarga(Exception):
+    """Error de validación en una carga por partes"""
+
+    def __init__(self, mensaje, codigo=400):
+        super().__init__(mensaje)
+        self.codigo = codigo
+
+
+class AlmacenCargas:
+    """
+    Almacén de cargas por partes en disco
+
+    Estructura en disco:
+        <directorio>/<upload_id>/meta.json
+        <directorio>/<upload_id>/meta.lock          (bloqueo de meta.json entre workers)
+        <directorio>/<upload_id>/<indice>.part
+        <directorio>/<upload_id>/<nombre_archivo>   (tras finalizar)
+    """
+
+    def __init__(self, directorio, umbral_memoria=1024 * 1024, tamano_parte_max=8 * 1024 * 1024,
+                 tamano_total_max=512 * 1024 * 1024, expiracion_segundos=24 * 3600):
+        """
+        Args:
+            directorio: Directorio base donde se guardan las cargas
+            umbral_memoria: Bytes que se mantienen en memoria antes de volcar la parte a disco
+            tamano_parte_max: Tamaño máximo de cada parte en bytes
+            tamano_total_max: Tamaño máximo del archivo completo en bytes
+            expiracion_segundos: Tiempo tras el cual una carga inactiva se elimina
+        """
+        self.directorio = directorio
+        self.umbral_memoria = umbral_memoria
+        self.tamano_parte_max = tamano_parte_max
+        self.tamano_total_max = tamano_total_max
+        self.expiracion_segundos = expiracion_segundos
+        self._bloqueo_hilos = threading.Lock()
+        os.makedirs(self.directorio, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Utilidades internas
+    # ------------------------------------------------------------------
+
+    def _ruta_carga(self, upload_id):
+        # Solo se aceptan identificadores generados por uuid4().hex
+        if not upload_id or len(upload_id) != 32 or not all(c in '0123456789abcdef' for c in upload_id):
+            raise ErrorCarga('Identificador de carga no válido', 404)
+        return os.path.join(self.directorio, upload_id)
+
+    def _leer_meta(self, upload_id):
+        ruta = self._ruta_carga(upload_id)
+        archivo_meta = os.path.join(ruta, 'meta.json')
+        if not os.path.exists(archivo_meta):
+            raise ErrorCarga('La carga no existe o expiró', 404)
+        with open(archivo_meta, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _guardar_meta(self, upload_id, meta):
+        ruta = self._ruta_carga(upload_id)
+        meta['actualizado'] = time.time()
+        # Temporal único: las partes de una misma carga pueden llegar en paralelo
+        fd, temporal = tempfile.mkstemp(dir=ruta, prefix='meta.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.replace(temporal, os.path.join(ruta, 'meta.json'))
+        except OSError:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+
+    @contextmanager
+    def _bloquear(self, upload_id):
+        """
+        Bloqueo exclusivo de la carga para leer, modificar y guardar meta.json
+
+        Con fcntl el bloqueo de archivo cubre también a otros procesos worker
+        (cada apertura es independiente, así que excluye igual entre hilos).
+        """
+        ruta = self._ruta_carga(upload_id)
+        if fcntl is None:
+            with self._bloqueo_hilos:
+                yield
+            return
+        try:
+            descriptor = os.open(os.path.join(ruta, 'meta.lock'), os.O_CREAT | os.O_RDWR, 0o600)
+        except FileNotFoundError:
+            raise ErrorCarga('La carga no existe o expiró', 404)
+        try:
+            fcntl.flock(descriptor, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(descriptor)
+
+    def _partes_recibidas(self, upload_id, meta):
+        ruta = self._ruta_carga(upload_id)
+        return [i for i in range(meta['total_partes'])
+                if os.path.exists(os.path.join(ruta, f'{i}.part'))]
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def iniciar(self, nombre_archivo, tamano_total, tamano_parte, sha256=None):
+        """
+        Registra una nueva carga
+
+        Args:
+            nombre_archivo: Nombre original del archivo
+            tamano_total: Tamaño total del archivo en bytes
+            tamano_parte: Tamaño de cada parte (la última puede ser menor)
+            sha256: Hash SHA-256 esperado del archivo completo (opcional)
+
+        Returns:
+            dict: Estado inicial de la carga
+        """
+        self.limpiar_expiradas()
+
+        nombre_archivo = secure_filename(nombre_archivo or '')
+        if not nombre_archivo:
+            raise ErrorCarga('Nombre de archivo vacío')
+        if tamano_total <= 0:
+            raise ErrorCarga('El tamaño total debe ser mayor que cero')
+        if tamano_total > self.tamano_total_max:
+            raise ErrorCarga('El archivo supera el tamaño máximo permitido', 413)
+        if tamano_parte <= 0 or tamano_parte > self.tamano_parte_max:
+            raise ErrorCarga(f'El tamaño de parte debe estar entre 1 y {self.tamano_parte_max} bytes')
+        if sha256 is not None:
+            sha256 = sha256.lower()
+            if len(sha256) != 64 or not all(c in '0123456789abcdef' for c in sha256):
+                raise ErrorCarga('El hash SHA-256 no es válido')
+
+        upload_id = uuid.uuid4().hex
+        os.makedirs(self._ruta_carga(upload_id))
+
+        meta = {
+            'upload_id': upload_id,
+            'nombre_archivo': nombre_archivo,
+            'tamano_total': tamano_total,
+            'tamano_parte': tamano_parte,
+            'total_partes': (tamano_total + tamano_parte - 1) // tamano_parte,
+            'sha256': sha256,
+            'finalizada': False,
+            'creado': time.time()
+        }
+        self._guardar_meta(upload_id, meta)
+        return self.estado(upload_id)
+
+    def estado(self, upload_id):
+        """
+        Devuelve el estado de una carga, incluyendo las partes ya recibidas
+        (permite a un cliente reanudar tras una conexión caída)
+        """
+        meta = self._leer_meta(upload_id)
+        if meta['finalizada']:
+            recibidas = list(range(meta['total_partes']))
+        else:
+            recibidas = self._partes_recibidas(upload_id, meta)
+        return {
+            'upload_id': upload_id,
+            'nombre_archivo': meta['nombre_archivo'],
+            'tamano_total': meta['tamano_total'],
+            'tamano_parte': meta['tamano_parte'],
+            'total_partes': meta['total_partes'],
+            'partes_recibidas': recibidas,
+            'partes_faltantes': [i for i in range(meta['total_partes']) if i not in set(recibidas)],
+            'finalizada': meta['finalizada']
+        }
+
+    def guardar_parte(self, upload_id, indice, flujo, sha256=None):
+        """
+        Guarda una parte leyendo el flujo por bloques
+
+        La parte se acumula en un SpooledTemporaryFile: por debajo del umbral
+        vive en memoria y por encima se vuelca a disco. Solo se publica como
+        <indice>.part si el tamaño y el hash (si se envió) son correctos, así
+        que reenviar una parte es idempotente.
+
+        Args:
+            upload_id: Identificador de la carga
+            indice: Índice de la parte (desde 0)
+            flujo: Objeto tipo archivo con el contenido de la parte
+            sha256: Hash SHA-256 esperado de la parte (opcional)
+
+        Returns:
+            dict: Estado actualizado de la carga
+        """
+        meta = self._leer_meta(upload_id)
+        if meta['finalizada']:
+            raise ErrorCarga('La carga ya fue finalizada', 409)
+        if indice < 0 or indice >= meta['total_partes']:
+            raise ErrorCarga('Índice de parte fuera de rango')
+
+        if indice == meta['total_partes'] - 1:
+            esperado = meta['tamano_total'] - meta['tamano_parte'] * indice
+        else:
+            esperado = meta['tamano_parte']
+
+        hasher = hashlib.sha256()
+        recibido = 0
+        ruta = self._ruta_carga(upload_id)
+
+        with tempfile.SpooledTemporaryFile(max_size=self.umbral_memoria, dir=ruta) as buffer:
+            while True:
+                bloque = flujo.read(TAMANO_BLOQUE)
+                if not bloque:
+                    break
+                recibido += len(bloque)
+                if recibido > esperado:
+                    raise ErrorCarga(f'La parte {indice} excede el tamaño esperado ({esperado} bytes)')
+                hasher.update(bloque)
+                buffer.write(bloque)
+
+            if recibido != esperado:
+                raise ErrorCarga(f'La parte {indice} está incompleta: {recibido} de {esperado} bytes')
+            if sha256 and hasher.hexdigest() != sha256.lower():
+                raise ErrorCarga(f'El hash de la parte {indice} no coincide', 422)
+
+            buffer.seek(0)
+            # Temporal único: dos envíos simultáneos de la misma parte no se pisan
+            fd, temporal = tempfile.mkstemp(dir=ruta, prefix=f'{indice}.', suffix='.part.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as destino:
+                    shutil.copyfileobj(buffer, destino, TAMANO_BLOQUE)
+                with self._bloquear(upload_id):
+                    meta = self._leer_meta(upload_id)
+                    if meta['finalizada']:
+                        raise ErrorCarga('La carga ya fue finalizada', 409)
+                    os.replace(temporal, os.path.join(ruta, f'{indice}.part'))
+                    self._guardar_meta(upload_id, meta)
+            finally:
+                if os.path.exists(temporal):
+                    os.remove(temporal)
+
+        return self.estado(upload_id)
+
+    def finalizar(self, upload_id):
+        """
+        Une las partes en el archivo final y valida el hash completo
+
+        Returns:
+            dict: Estado con la ruta del archivo final ('ruta') y su 'sha256'
+        """
+        self.limpiar_expiradas()
+        with self._bloquear(upload_id):
+            return self._finalizar(upload_id)
+
+    def _finalizar(self, upload_id):
+        meta = self._leer_meta(upload_id)
+        ruta = self._ruta_carga(upload_id)
+        archivo_final = os.path.join(ruta, meta['nombre_archivo'])
+
+        if meta['finalizada']:
+            return {**self.estado(upload_id), 'ruta': archivo_final, 'sha256': meta['sha256']}
+
+        faltantes = [i for i in range(meta['total_partes'])
+                     if i not in set(self._partes_recibidas(upload_id, meta))]
+        if faltantes:
+            raise ErrorCarga(f'Faltan partes por recibir: {faltantes}', 409)
+
+        hasher = hashlib.sha256()
+        fd, temporal = tempfile.mkstemp(dir=ruta, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as destino:
+            for i in range(meta['total_partes']):
+                with open(os.path.join(ruta, f'{i}.part'), 'rb') as parte:
+                    while True:
+                        bloque = parte.read(TAMANO_BLOQUE)
+                        if not bloque:
+                            break
+                        hasher.update(bloque)
+                        destino.write(bloque)
+
+        digest = hasher.hexdigest()
+        if meta['sha256'] and digest != meta['sha256']:
+            os.remove(temporal)
+            raise ErrorCarga('El hash del archivo completo no coincide', 422)
+
+        os.replace(temporal, archivo_final)
+        for i in range(meta['total_partes']):
+            os.remove(os.path.join(ruta, f'{i}.part'))
+
+        meta['finalizada'] = True
+        meta['sha256'] = digest
+        self._guardar_meta(upload_id, meta)
+        return {**self.estado(upload_id), 'ruta': archivo_final, 'sha256': digest}
+
+    def ruta_finalizada(self, upload_id):
+        """
+        Devuelve la ruta del archivo de una carga finalizada
+
+        Raises:
+            ErrorCarga: Si la carga no existe o no ha sido finalizada
+        """
+        self.limpiar_expiradas()
+        meta = self._leer_meta(upload_id)
+        if not meta['finalizada']:
+            raise ErrorCarga('La carga no ha sido finalizada', 409)
+        return os.path.join(self._ruta_carga(upload_id), meta['nombre_archivo'])
+
+    def eliminar(self, upload_id):
+        """Elimina una carga y todos sus archivos"""
+        ruta = self._ruta_carga(upload_id)
+        if os.path.exists(ruta):
+            shutil.rmtree(ruta, ignore_errors=True)
+
+    def limpiar_expiradas(self):
+        """
+        Elimina las cargas sin actividad por más de expiracion_segundos
+
+        Se ejecuta al iniciar, finalizar y usar una carga, así que una
+        instancia que solo genera también purga las abandonadas.
+        """
+        limite = time.time() - self.expiracion_segundos
+        for nombre in os.listdir(self.directorio):
+            archivo_meta = os.path.join(self.directorio, nombre, 'meta.json')
+            try:
+                if os.path.getmtime(archivo_meta) < limite:
+                    shutil.rmtree(os.path.join(self.directorio, nombre), ignore_errors=True)
+            except OSError:
+                continue
@@ -0,0 +1,305 @@
+"""
+Coalescencia de generaciones idénticas en curso (single-flight)
+Si llega una petición cuya entrada (bytes del Excel, nombre_uds, imágenes y
+opciones) coincide con una generación que ya está corriendo, espera ese
+resultado y recibe una copia del informe en lugar de generar otro igual.
+Dentro del proceso se coordina con un evento por clave; entre procesos
+worker, opcionalmente, con un bloqueo de archivo (fcntl) por clave.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo coalescencia dentro del proceso
+    fcntl = None
+
+
+# Segundos que se conserva un resultado publicado para otros procesos
+VIGENCIA_RESULTADO = 120
+
+
+def clave_generacion(archivo_excel, nombre_uds='', imagenes=(), opciones=None):
+    """
+    Hash de todo lo que determina el informe generado
+
+    Args:
+        archivo_excel: Ruta del libro de Excel
+        nombre_uds: Nombre de la UDS usado en el informe
+        imagenes: Rutas de las imágenes de encabezado/pie subidas (las ausentes se ignoran)
+        opciones: Diccionario con el resto de parámetros de la generación
+
+    Returns:
+        str: SHA-256 en hexadecimal
+    """
+    hasher = hashlib.sha256()
+    for ruta in [archivo_excel] + [r for r in imagenes if r]:
+        # El nombre sin extensión (encabezado/pie) distingue qué imagen es cuál
+        etiqueta = 'excel' if ruta == archivo_excel else os.path.splitext(os.path.basename(ruta))[0]
+        hasher.update(etiqueta.encode('utf-8') + b'\0')
+        with open(ruta, 'rb') as f:
+            for bloque in iter(lambda: f.read(1024 * 1024), b''):
+                hasher.update(bloque)
+    hasher.update(json.dumps({'nombre_uds': nombre_uds, 'opciones': opciones or {}},
+                             sort_keys=True, default=str).encode('utf-8'))
+    return hasher.hexdigest()
+
+
+class _Vuelo:
+    """Generación en curso dentro del proceso"""
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.esperando = 0
+        self.pendientes = None  # Lo fija el líder al cerrar el vuelo
+        self.resultado = None
+        self.error = None
+        self.publicado = None
+
+
+class VueloUnico:
+    """
+    Ejecuta una sola vez las generaciones idénticas concurrentes
+
+    Uso:
+        resultado, coalescida = vuelo_unico.ejecutar(clave, generar, archivo_salida)
+
+    generar() debe escribir el informe en archivo_salida y devolver un
+    diccionario serializable a JSON. Las peticiones coalescidas reciben una
+    copia del archivo y el mismo diccionario (o la misma excepción).
+    """
+
+    def __init__(self, directorio, entre_procesos=False, espera_max=300):
+        """
+        Args:
+            directorio: Directorio para los resultados publicados y los bloqueos
+            entre_procesos: Coordinar también entre procesos worker (requiere fcntl)
+            espera_max: Segundos máximos esperando a otra generación antes de generar por cuenta propia
+        """
+        self.directorio = directorio
+        self.entre_procesos = entre_procesos and fcntl is not None
+        self.espera_max = espera_max
+        os.makedirs(self.directorio, exist_ok=True)
+        if entre_procesos and fcntl is None:
+            print("⚠️  fcntl no disponible: la coalescencia será solo dentro del proceso")
+
+        self._bloqueo = threading.Lock()
+        self._vuelos = {}
+
+        # Métricas
+        self._lideres = 0
+        self._coalescidas = 0
+        self._coalescidas_procesos = 0
+        self._errores_compartidos = 0
+        self._esperas_agotadas = 0
+
+    def _ruta(self, clave, extension):
+        return os.path.join(self.directorio, f'{clave}.{extension}')
+
+    def ejecutar(self, clave, generar, archivo_salida):
+        """
+        Ejecuta generar() o espera a la generación idéntica en curso
+
+        Returns:
+            tuple: (resultado, True si la petición se coalesció con otra)
+        """
+        with self._bloqueo:
+            vuelo = self._vuelos.get(clave)
+            lider = vuelo is None
+            if lider:
+                vuelo = _Vuelo()
+                self._vuelos[clave] = vuelo
+                self._lideres += 1
+            else:
+                vuelo.esperando += 1
+
+        if lider:
+            return self._liderar(clave, vuelo, generar, archivo_salida)
+        return self._seguir(clave, vuelo, generar, archivo_salida)
+
+    def _liderar(self, clave, vuelo, generar, archivo_salida):
+        try:
+            if self.entre_procesos:
+                vuelo.resultado, coalescida = self._ejecutar_entre_procesos(clave, generar, archivo_salida)
+            else:
+                vuelo.resultado, coalescida = generar(), False
+        except Exception as e:
+            vuelo.error = e
+            raise
+        finally:
+            # A partir de aquí ninguna petición nueva se une a este vuelo
+            with self._bloqueo:
+                del self._vuelos[clave]
+                vuelo.pendientes = vuelo.esperando
+            if vuelo.pendientes and vuelo.error is None:
+                # Copia propia del vuelo: el líder borra su directorio al terminar la respuesta
+                vuelo.publicado = f'{self._ruta(clave, "docx")}.{id(vuelo)}'
+                try:
+                    try:
+                        os.link(archivo_salida, vuelo.publicado)
+                    except OSError:
+                        shutil.copyfile(archivo_salida, vuelo.publicado)
+                except OSError as e:
+                    # Los seguidores reciben el error; el líder ya tiene su informe
+                    vuelo.error = e
+            vuelo.evento.set()
+        return vuelo.resultado, coalescida
+
+    def _seguir(self, clave, vuelo, generar, archivo_salida):
+        if not vuelo.evento.wait(self.espera_max):
+            with self._bloqueo:
+                # Si el líder ya cerró el vuelo, esta petición cuenta en pendientes
+                # y su copia se está publicando: abandonar dejaría el .docx sin borrar
+                abandonar = vuelo.pendientes is None
+                if abandonar:
+                    self._esperas_agotadas += 1
+                    vuelo.esperando -= 1
+            if abandonar:
+                print(f"⚠️  Espera agotada para una generación idéntica, se genera por separado")
+                return generar(), False
+            vuelo.evento.wait()
+
+        if vuelo.error is not None:
+            with self._bloqueo:
+                self._errores_compartidos += 1
+            raise vuelo.error
+
+        try:
+            shutil.copyfile(vuelo.publicado, archivo_salida)
+        finally:
+            with self._bloqueo:
+                self._coalescidas += 1
+                vuelo.pendientes -= 1
+                ultimo = vuelo.pendientes == 0
+            if ultimo:
+                os.remove(vuelo.publicado)
+        return vuelo.resultado, True
+
+    def _ejecutar_entre_procesos(self, clave, generar, archivo_salida):
+        """
+        Coordina con otros procesos mediante un bloqueo exclusivo por clave
+
+        El proceso que obtiene el bloqueo genera y publica el informe; los
+        que lo encuentran tomado esperan a que se libere y copian el resultado.
+        """
+        self._limpiar_publicados()
+        descriptor, espero = self._tomar_bloqueo(self._ruta(clave, 'lock'), time.monotonic() + self.espera_max)
+        if descriptor is None:
+            with self._bloqueo:
+                self._esperas_agotadas += 1
+            return generar(), False
+        try:
+            if espero:
+                # El otro proceso terminó: usar su resultado si lo publicó
+                try:
+                    with open(self._ruta(clave, 'json'), 'r', encoding='utf-8') as f:
+                        resultado = json.load(f)
+                    shutil.copyfile(self._ruta(clave, 'docx'), archivo_salida)
+                    with self._bloqueo:
+                        self._coalescidas_procesos += 1
+                    return resultado, True
+                except (OSError, ValueError):
+                    pass  # Falló o ya se limpió: generar aquí con el bloqueo tomado
+
+            resultado = generar()
+            temporal = f'{self._ruta(clave, "docx")}.{os.getpid()}.tmp'
+            shutil.copyfile(archivo_salida, temporal)
+            os.replace(temporal, self._ruta(clave, 'docx'))
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump(resultado, f, default=str)
+            os.replace(temporal, self._ruta(clave, 'json'))
+            return resultado, False
+        finally:
+            os.close(descriptor)
+
+    @staticmethod
+    def _vigente(ruta, descriptor):
+        """Indica si el descriptor sigue siendo el archivo que hay en la ruta"""
+        try:
+            en_ruta = os.stat(ruta)
+        except FileNotFoundError:
+            return False
+        abierto = os.fstat(descriptor)
+        return (en_ruta.st_dev, en_ruta.st_ino) == (abierto.st_dev, abierto.st_ino)
+
+    def _tomar_bloqueo(self, ruta, limite):
+        """
+        Abre y bloquea el archivo de bloqueo de una clave
+
+        _limpiar_publicados puede borrar un bloqueo libre entre el open() de
+        otro proceso y su flock(): ese proceso bloquearía un archivo ya
+        desvinculado mientras un tercero crea uno nuevo, y habría dos
+        líderes. Por eso, con el bloqueo tomado, se comprueba que el
+        descriptor sigue siendo el archivo de la ruta y si no se reintenta.
+
+        Returns:
+            tuple: (descriptor bloqueado o None si se agotó la espera,
+                True si hubo que esperar a que otro proceso lo liberara)
+        """
+        espero = False
+        while True:
+            descriptor = os.open(ruta, os.O_CREAT | os.O_RDWR, 0o644)
+            try:
+                while True:
+                    try:
+                        fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        espero = True
+                        if time.monotonic() >= limite:
+                            os.close(descriptor)
+                            return None, True
+                        time.sleep(0.1)
+                if self._vigente(ruta, descriptor):
+                    return descriptor, espero
+            except BaseException:
+                os.close(descriptor)
+                raise
+            os.close(descriptor)
+
+    def _limpiar_publicados(self):
+        """Elimina resultados publicados (y bloqueos libres) más antiguos que VIGENCIA_RESULTADO"""
+        limite = time.time() - VIGENCIA_RESULTADO
+        for nombre in os.listdir(self.directorio):
+            ruta = os.path.join(self.directorio, nombre)
+            try:
+                if os.path.getmtime(ruta) >= limite:
+                    continue
+                if nombre.endswith('.lock'):
+                    descriptor = os.open(ruta, os.O_RDWR)
+                    try:
+                        fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        # Otro limpiador pudo borrarlo y un líder crear uno nuevo
+                        # en la misma ruta: solo se borra el archivo que se bloqueó
+                        if self._vigente(ruta, descriptor):
+                            os.remove(ruta)
+                    except BlockingIOError:
+                        pass
+                    finally:
+                        os.close(descriptor)
+                else:
+                    os.remove(ruta)
+            except OSError:
+                continue
+
+    def metricas(self):
+        """
+        Returns:
+            dict: Generaciones en curso, líderes, peticiones coalescidas y errores compartidos
+        """
+        with self._bloqueo:
+            return {
+                'en_vuelo': len(self._vuelos),
+                'esperando': sum(v.esperando for v in self._vuelos.values()),
+                'lideres': self._lideres,
+                'coalescidas': self._coalescidas,
+                'coalescidas_entre_procesos': self._coalescidas_procesos,
+                'errores_compartidos': self._errores_compartidos,
+                'esperas_agotadas': self._esperas_agotadas,
+                'entre_procesos': self.entre_procesos
+            }
@@ -0,0 +1,116 @@
+"""
+Construye los artefactos precalculados que se despliegan con la API
+Se ejecuta en el build (antes de desplegar en Vercel) para que el arranque
+en frío no tenga que reconstruir la caché de fuentes de matplotlib,
+normalizar las imágenes estáticas ni armar el encabezado y pie del documento
+
+Uso:
+    python BACKEND/construir_artefactos.py
+    python BACKEND/construir_artefactos.py --salida /ruta/artefactos
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generador.artefactos import DIRECTORIO_ARTEFACTOS, huella_fuentes, imagen_estatica_original
+
+
+def construir_cache_fuentes(directorio):
+    """Genera fontlist-*.json en un proceso aparte con MPLCONFIGDIR apuntando a directorio"""
+    os.makedirs(directorio, exist_ok=True)
+    entorno = dict(os.environ, MPLCONFIGDIR=directorio)
+    subprocess.run([sys.executable, '-c', 'import matplotlib.font_manager'], env=entorno, check=True)
+    # Solo se despliega la lista de fuentes; el resto del directorio no aporta
+    for nombre in os.listdir(directorio):
+        if not nombre.startswith('fontlist'):
+            ruta = os.path.join(directorio, nombre)
+            shutil.rmtree(ruta) if os.path.isdir(ruta) else os.remove(ruta)
+    return [n for n in os.listdir(directorio) if n.startswith('fontlist')]
+
+
+def normalizar_imagenes(directorio):
+    """
+    Copia las imágenes estáticas como PNG
+
+    Los PNG se copian byte a byte y los demás formatos se convierten igual
+    que convertir_a_png, para que el documento resultante sea el mismo.
+    """
+    from PIL import Image
+
+    generadas = []
+    for nombre in ('encabezado', 'pie'):
+        original = imagen_estatica_original(nombre)
+        if not original:
+            continue
+        destino = os.path.join(directorio, f'{nombre}.png')
+        with Image.open(original) as img:
+            if img.format == 'PNG':
+                shutil.copyfile(original, destino)
+            else:
+                img.convert('RGB').save(destino, 'PNG')
+        generadas.append(os.path.basename(destino))
+    return generadas
+
+
+def construir_plantilla(ruta):
+    """Guarda un documento vacío con márgenes, encabezado y pie estáticos"""
+    from docx import Document
+    from generador.documento import _agregar_encabezado_pie
+
+    doc = Document()
+    with tempfile.TemporaryDirectory() as vacio:
+        # Directorio de trabajo vacío: se usan las imágenes estáticas
+        _agregar_encabezado_pie(doc, vacio)
+    doc.save(ruta)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--salida', default=DIRECTORIO_ARTEFACTOS,
+                        help=f'Directorio de artefactos (por defecto: {DIRECTORIO_ARTEFACTOS})')
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    # Construir en un directorio temporal y reemplazar al final: nunca queda
+    # un directorio de artefactos a medias
+    temporal = tempfile.mkdtemp(prefix='artefactos_', dir=os.path.dirname(os.path.abspath(args.salida)))
+    os.chmod(temporal, 0o755)
+    try:
+        fuentes = construir_cache_fuentes(os.path.join(temporal, 'mplconfig'))
+        print(f"🔤 Caché de fuentes: {', '.join(fuentes)}")
+
+        imagenes = normalizar_imagenes(temporal)
+        print(f"🖼️  Imágenes normalizadas: {', '.join(imagenes) or 'ninguna'}")
+
+        construir_plantilla(os.path.join(temporal, 'plantilla.docx'))
+        print("📄 Plantilla base: plantilla.docx")
+
+        import matplotlib
+        with open(os.path.join(temporal, 'manifiesto.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'huella': huella_fuentes(),
+                'matplotlib': matplotlib.__version__,
+                'fecha': time.strftime('%Y-%m-%dT%H:%M:%S')
+            }, f, indent=2, ensure_ascii=False)
+
+        if os.path.exists(args.salida):
+            shutil.rmtree(args.salida)
+        os.replace(temporal, args.salida)
+    except Exception:
+        shutil.rmtree(temporal, ignore_errors=True)
+        raise
+
+    print(f"✅ Artefactos construidos en {time.perf_counter() - inicio:.2f}s → {args.salida}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
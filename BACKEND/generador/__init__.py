@@ -4,24 +4,35 @@ Módulo generador de informes ICBF
 
 from .analizador import (
     analizar_columna,
+    perfilar_columna,
     generar_analisis_resultados,
     generar_oportunidades_mejora,
     extraer_tema_pregunta
 )
 
-from .graficas import crear_grafica_circular
+from .segmentos import analizar_segmentos
 
-from .documento import generar_informe_word
+from .graficas import crear_grafica_circular, crear_graficas_circulares
+
+from .documento import generar_informe_word, generar_informe_desde_conteos
+
+from .conteos import validar_conteos, ErrorConteos
 
 from .utils import convertir_a_png
 
 __version__ = '1.0.0'
 __all__ = [
     'analizar_columna',
+    'perfilar_columna',
     'generar_analisis_resultados',
     'generar_oportunidades_mejora',
     'extraer_tema_pregunta',
+    'analizar_segmentos',
     'crear_grafica_circular',
+    'crear_graficas_circulares',
     'generar_informe_word',
+    'generar_informe_desde_conteos',
+    'validar_conteos',
+    'ErrorConteos',
     'convertir_a_png'
 ]
\ No newline at end of file
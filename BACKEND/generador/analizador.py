@@ -3,13 +3,145 @@ Módulo para análisis de datos de encuestas
 Genera análisis inteligente y oportunidades de mejora
 """
 
+import re
+from collections import Counter
+
 import pandas as pd
 
+from .utils import (
+    MAX_RESPUESTAS_GRAFICA,
+    ETIQUETA_OTROS,
+    MIN_DISTINTOS_TEXTO_LIBRE,
+    RATIO_DISTINTOS_TEXTO_LIBRE,
+    MAX_FILAS_TABLA_TEXTO,
+    MAX_PALABRAS_FRECUENTES,
+    RESPUESTAS_FAVORABLES
+)
+
+
+# Tipos de columna que se grafican y entran en el análisis de satisfacción
+TIPOS_GRAFICABLES = ('likert', 'si_no', 'categorica')
+
+_VALORES_LIKERT = {'1', '2', '3', '4', '5'}
+_VALORES_SI_NO = {'si', 'sí', 'no'}
+
+# Escalas de respuesta con las que se redactan los resultados
+ESCALAS_RESPUESTA = ('numerica', 'satisfaccion', 'calificacion', 'otra')
+_PALABRAS_SATISFACCION = ('satisfecho', 'satisfactorio', 'satisfactoria')
+_PALABRAS_CALIFICACION = ('bueno', 'buena', 'malo', 'mala', 'regular', 'excelente')
+
+# Palabras vacías que no aportan al resumen de texto libre
+_PALABRAS_VACIAS = {
+    'para', 'como', 'pero', 'porque', 'este', 'esta', 'estos', 'estas', 'todo', 'todos',
+    'muy', 'más', 'mas', 'sobre', 'entre', 'cuando', 'donde', 'desde', 'hasta', 'también',
+    'tambien', 'sus', 'los', 'las', 'del', 'que', 'con', 'una', 'uno', 'unos', 'unas',
+    'por', 'sin', 'son', 'han', 'hay', 'ser', 'mis', 'nos', 'les', 'ellos', 'ellas', 'bien'
+}
+
+
+def perfilar_columna(serie):
+    """
+    Clasifica una columna según sus valores y su proporción de respuestas distintas
+    
+    Tipos:
+        - 'vacia': sin respuestas
+        - 'fecha': valores de fecha u hora
+        - 'likert': escala numérica de 1 a 5
+        - 'si_no': respuestas sí/no
+        - 'texto_libre': muchas respuestas distintas (no se grafica)
+        - 'categorica': el resto de opciones cerradas
+    
+    Args:
+        serie: Serie de pandas con las respuestas
+        
+    Returns:
+        dict: Tipo, número de respuestas y de valores distintos
+    """
+    datos = serie.dropna()
+    total = len(datos)
+    
+    if total == 0:
+        return {'tipo': 'vacia', 'total': 0, 'distintos': 0, 'ratio_distintos': 0.0}
+    
+    distintos = datos.nunique()
+    ratio = distintos / total
+    
+    if pd.api.types.is_datetime64_any_dtype(datos):
+        tipo = 'fecha'
+    else:
+        tipo = _tipo_por_valores(datos.unique(), distintos, ratio)
+    
+    return {'tipo': tipo, 'total': total, 'distintos': distintos, 'ratio_distintos': ratio}
+
+
+def _tipo_por_valores(valores_unicos, distintos, ratio):
+    """Tipo de una pregunta (likert, si_no, texto_libre o categorica) según sus valores distintos"""
+    valores = {
+        str(int(v)) if isinstance(v, float) and v.is_integer() else str(v).strip().lower()
+        for v in valores_unicos
+    }
+    if valores <= _VALORES_LIKERT:
+        return 'likert'
+    if valores <= _VALORES_SI_NO:
+        return 'si_no'
+    if distintos >= MIN_DISTINTOS_TEXTO_LIBRE and ratio >= RATIO_DISTINTOS_TEXTO_LIBRE:
+        return 'texto_libre'
+    return 'categorica'
+
+
+def detectar_escala(opciones):
+    """
+    Escala de respuesta de una pregunta graficada, para redactar sus resultados
+    
+    Escalas:
+        - 'numerica': todas las opciones son 1 a 5 (tal como se muestran)
+        - 'satisfaccion': la opción más frecuente habla de satisfacción
+        - 'calificacion': la opción más frecuente es bueno/malo/regular/excelente
+        - 'otra': el resto
+    
+    Args:
+        opciones: Etiquetas de las opciones en el orden del informe (más frecuente primero)
+        
+    Returns:
+        str: Una de ESCALAS_RESPUESTA
+    """
+    if all(opcion.strip() in _VALORES_LIKERT for opcion in opciones):
+        return 'numerica'
+    primera = opciones[0].lower()
+    if any(palabra in primera for palabra in _PALABRAS_SATISFACCION):
+        return 'satisfaccion'
+    if any(palabra in primera for palabra in _PALABRAS_CALIFICACION):
+        return 'calificacion'
+    return 'otra'
+
+
+def perfilar_conteos(frecuencias):
+    """
+    Equivalente de perfilar_columna para una pregunta recibida como conteos
+    
+    Args:
+        frecuencias: Serie respuesta -> conteo (sin conteos en 0)
+        
+    Returns:
+        dict: Tipo, número de respuestas y de valores distintos
+    """
+    total = int(frecuencias.sum())
+    if total == 0:
+        return {'tipo': 'vacia', 'total': 0, 'distintos': 0, 'ratio_distintos': 0.0}
+    distintos = len(frecuencias)
+    ratio = distintos / total
+    tipo = _tipo_por_valores(frecuencias.index, distintos, ratio)
+    return {'tipo': tipo, 'total': total, 'distintos': distintos, 'ratio_distintos': ratio}
+
 
 def analizar_columna(df, columna):
     """
     Analiza una columna del DataFrame
     
+    Las columnas categóricas con más de MAX_RESPUESTAS_GRAFICA respuestas se
+    limitan a las más frecuentes más un grupo "Otros"; las de texto libre se
+    resumen con sus respuestas y palabras más frecuentes en lugar de graficarse.
+    
     Args:
         df: DataFrame de pandas con los datos
         columna: Nombre de la columna a analizar
@@ -17,13 +149,71 @@ def analizar_columna(df, columna):
     Returns:
         dict: Diccionario con resultados del análisis o None si está vacía
     """
-    datos_limpios = df[columna].dropna()
+    perfil = perfilar_columna(df[columna])
     
-    if len(datos_limpios) == 0:
+    if perfil['tipo'] == 'vacia':
         return None
     
+    datos_limpios = df[columna].dropna()
     frecuencias = datos_limpios.value_counts()
-    total = len(datos_limpios)
+    
+    palabras = _palabras_frecuentes(datos_limpios) if perfil['tipo'] == 'texto_libre' else None
+    return _resultado_frecuencias(columna, perfil, frecuencias, len(datos_limpios), palabras)
+
+
+def analizar_conteos(pregunta, conteos):
+    """
+    Analiza una pregunta recibida como conteos agregados (sin datos por persona)
+    
+    Produce el mismo diccionario que analizar_columna, así que el resto del
+    informe (textos, gráficas y análisis) no distingue el origen.
+    
+    Args:
+        pregunta: Texto de la pregunta
+        conteos: dict respuesta -> conteo, en el orden recibido
+        
+    Returns:
+        dict: Resultados del análisis o None si no tiene respuestas
+    """
+    # Mayor conteo primero; los empates conservan el orden recibido (como value_counts)
+    frecuencias = pd.Series(conteos, dtype='int64').sort_values(ascending=False, kind='stable')
+    frecuencias = frecuencias[frecuencias > 0]
+    perfil = perfilar_conteos(frecuencias)
+    
+    if perfil['tipo'] == 'vacia':
+        return None
+    
+    palabras = _palabras_frecuentes_conteos(frecuencias) if perfil['tipo'] == 'texto_libre' else None
+    return _resultado_frecuencias(pregunta, perfil, frecuencias, perfil['total'], palabras)
+
+
+def _resultado_frecuencias(pregunta, perfil, frecuencias, total, palabras_frecuentes=None):
+    """Resultado del análisis de una pregunta a partir de sus frecuencias ordenadas"""
+    if perfil['tipo'] == 'texto_libre':
+        return {
+            'pregunta': pregunta,
+            'tipo': perfil['tipo'],
+            'total': total,
+            'distintos': perfil['distintos'],
+            'respuestas_frecuentes': [
+                (str(valor), int(conteo), f"{conteo / total * 100:.1f}")
+                for valor, conteo in frecuencias.head(MAX_FILAS_TABLA_TEXTO).items()
+            ],
+            'palabras_frecuentes': palabras_frecuentes
+        }
+    
+    # Limitar las opciones graficadas: top N + "Otros"
+    if len(frecuencias) > MAX_RESPUESTAS_GRAFICA:
+        resto = frecuencias.iloc[MAX_RESPUESTAS_GRAFICA:].sum()
+        frecuencias = frecuencias.iloc[:MAX_RESPUESTAS_GRAFICA]
+        # Si "Otros" ya es una respuesta del top N, el resto se suma a ella
+        # (una segunda entrada con la misma etiqueta se pisaría en los dicts)
+        otros = [valor for valor in frecuencias.index if str(valor) == ETIQUETA_OTROS]
+        if otros:
+            frecuencias = frecuencias.copy()
+            frecuencias[otros[0]] += resto
+        else:
+            frecuencias = pd.concat([frecuencias, pd.Series({ETIQUETA_OTROS: resto})])
     
     # Calcular porcentajes
     porcentajes = {}
@@ -35,7 +225,10 @@ def analizar_columna(df, columna):
         porcentajes_exactos[str(valor)] = porcentaje_exacto
     
     return {
-        'pregunta': columna,
+        'pregunta': pregunta,
+        'tipo': perfil['tipo'],
+        # Se detecta una vez aquí, sobre las etiquetas tal como se muestran
+        'escala': detectar_escala(list(porcentajes)),
         'frecuencias': frecuencias.to_dict(),
         'porcentajes': porcentajes,
         'porcentajes_exactos': porcentajes_exactos,
@@ -43,6 +236,71 @@ def analizar_columna(df, columna):
     }
 
 
+def resumir_resultado(resultado):
+    """
+    Resumen compacto de una pregunta analizada (para el archivo de informes)
+    
+    El porcentaje favorable usa las mismas respuestas favorables que la
+    segmentación; es None si ninguna opción de la pregunta es favorable.
+    
+    Args:
+        resultado: Diccionario de analizar_columna / analizar_conteos
+        
+    Returns:
+        dict: pregunta, tipo, escala, total, opcion_principal,
+            porcentaje_principal y porcentaje_favorable
+    """
+    resumen = {
+        'pregunta': resultado['pregunta'],
+        'tipo': resultado['tipo'],
+        'escala': resultado.get('escala'),
+        'total': int(resultado['total']),
+        'opcion_principal': None,
+        'porcentaje_principal': None,
+        'porcentaje_favorable': None
+    }
+    if resultado['tipo'] == 'texto_libre':
+        return resumen
+    
+    opcion, porcentaje = next(iter(resultado['porcentajes_exactos'].items()))
+    resumen['opcion_principal'] = opcion
+    resumen['porcentaje_principal'] = round(porcentaje, 2)
+    
+    favorables = [
+        p for valor, p in resultado['porcentajes_exactos'].items()
+        if re.sub(r'\.0$', '', valor.strip().lower()) in RESPUESTAS_FAVORABLES
+    ]
+    if favorables:
+        resumen['porcentaje_favorable'] = round(sum(favorables), 2)
+    return resumen
+
+
+def _palabras_frecuentes(serie):
+    """
+    Cuenta las palabras más frecuentes de respuestas abiertas
+    
+    Returns:
+        list: Tuplas (palabra, conteo) ordenadas de mayor a menor
+    """
+    contador = Counter()
+    for texto in serie.astype(str):
+        contador.update(
+            palabra for palabra in re.findall(r'\w+', texto.lower())
+            if len(palabra) > 3 and not palabra.isdigit() and palabra not in _PALABRAS_VACIAS
+        )
+    return contador.most_common(MAX_PALABRAS_FRECUENTES)
+
+
+def _palabras_frecuentes_conteos(frecuencias):
+    """Igual que _palabras_frecuentes, ponderando cada respuesta por su conteo"""
+    contador = Counter()
+    for texto, conteo in frecuencias.items():
+        for palabra in re.findall(r'\w+', str(texto).lower()):
+            if len(palabra) > 3 and not palabra.isdigit() and palabra not in _PALABRAS_VACIAS:
+                contador[palabra] += int(conteo)
+    return contador.most_common(MAX_PALABRAS_FRECUENTES)
+
+
 def extraer_tema_pregunta(pregunta):
     """
     Extrae el tema principal de una pregunta para el análisis
@@ -0,0 +1,134 @@
+"""
+Artefactos precalculados en el build para reducir el arranque en frío
+Los genera construir_artefactos.py y se despliegan junto con el código:
+
+    artefactos/mplconfig/fontlist-*.json   Caché de fuentes de matplotlib
+    artefactos/encabezado.png, pie.png     Imágenes estáticas ya normalizadas a PNG
+    artefactos/plantilla.docx              Documento base con márgenes, encabezado y pie
+    artefactos/manifiesto.json             Hashes de las fuentes para detectar artefactos obsoletos
+
+Todo se lee en modo solo lectura; si falta un artefacto o no coincide con
+las fuentes actuales se usa el comportamiento de siempre.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from functools import lru_cache
+
+from .utils import ENCABEZADO, PIE_PAGINA
+
+
+DIRECTORIO_BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIRECTORIO_ARTEFACTOS = os.environ.get('ARTEFACTOS_DIR', os.path.join(DIRECTORIO_BASE, 'artefactos'))
+DIRECTORIO_IMAGENES = os.path.join(DIRECTORIO_BASE, 'imagenes')
+EXTENSIONES_IMAGEN = ['.png', '.jpg', '.jpeg', '.PNG', '.JPG', '.JPEG']
+
+# Se incrementa si cambia la forma de la plantilla o de los artefactos
+VERSION_ARTEFACTOS = 1
+
+
+def imagen_estatica_original(nombre):
+    """Ruta de la imagen estática 'encabezado' o 'pie' en imagenes/, o None"""
+    for ext in EXTENSIONES_IMAGEN:
+        archivo = os.path.join(DIRECTORIO_IMAGENES, f'{nombre}{ext}')
+        if os.path.exists(archivo):
+            return archivo
+    return None
+
+
+def huella_fuentes():
+    """
+    Hash de todo lo que determina el contenido de los artefactos
+
+    Returns:
+        dict: Versión de artefactos y de python-docx, textos de marca e imágenes estáticas
+    """
+    import docx
+
+    huella = {
+        'version_artefactos': VERSION_ARTEFACTOS,
+        'python_docx': getattr(docx, '__version__', ''),
+        'marca': hashlib.sha256(json.dumps([ENCABEZADO, PIE_PAGINA], sort_keys=True).encode('utf-8')).hexdigest()
+    }
+    for nombre in ('encabezado', 'pie'):
+        archivo = imagen_estatica_original(nombre)
+        if archivo:
+            with open(archivo, 'rb') as f:
+                huella[f'imagen_{nombre}'] = hashlib.sha256(f.read()).hexdigest()
+        else:
+            huella[f'imagen_{nombre}'] = None
+    return huella
+
+
+@lru_cache(maxsize=1)
+def artefactos_validos():
+    """Indica si hay artefactos construidos para las fuentes actuales (se evalúa una vez por proceso)"""
+    try:
+        with open(os.path.join(DIRECTORIO_ARTEFACTOS, 'manifiesto.json'), 'r', encoding='utf-8') as f:
+            manifiesto = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if manifiesto.get('huella') != huella_fuentes():
+        print(f"  ⚠️  Artefactos obsoletos en {DIRECTORIO_ARTEFACTOS}, se ignoran")
+        return False
+    return True
+
+
+def configurar_matplotlib(directorio_escribible=None):
+    """
+    Apunta MPLCONFIGDIR a una copia de la caché de fuentes precalculada
+
+    matplotlib exige que su directorio de configuración sea escribible, así
+    que la caché desplegada (solo lectura) se copia una vez a /tmp en lugar
+    de reconstruir la lista de fuentes. Debe llamarse antes de importar
+    matplotlib. No hace nada si MPLCONFIGDIR ya está definido o no hay caché.
+
+    Returns:
+        bool: True si se configuró la caché precalculada
+    """
+    origen = os.path.join(DIRECTORIO_ARTEFACTOS, 'mplconfig')
+    if 'MPLCONFIGDIR' in os.environ or not os.path.isdir(origen):
+        return False
+
+    import tempfile
+    destino = directorio_escribible or os.path.join(tempfile.gettempdir(), 'mplconfig')
+    try:
+        os.makedirs(destino, exist_ok=True)
+        for nombre in os.listdir(origen):
+            if nombre.startswith('fontlist') and not os.path.exists(os.path.join(destino, nombre)):
+                shutil.copyfile(os.path.join(origen, nombre), os.path.join(destino, nombre))
+    except OSError as e:
+        print(f"  ⚠️  No se pudo preparar la caché de fuentes: {e}")
+        return False
+
+    os.environ['MPLCONFIGDIR'] = destino
+    return True
+
+
+def imagen_estatica(nombre):
+    """
+    Imagen estática 'encabezado' o 'pie' lista para insertar
+
+    Returns:
+        str: La versión normalizada de artefactos/ si es válida, o la original de imagenes/
+    """
+    if artefactos_validos():
+        archivo = os.path.join(DIRECTORIO_ARTEFACTOS, f'{nombre}.png')
+        if os.path.exists(archivo):
+            return archivo
+    return imagen_estatica_original(nombre)
+
+
+def plantilla_base():
+    """
+    Ruta de la plantilla .docx con encabezado y pie estáticos, o None
+
+    Solo aplica cuando el informe usa las imágenes estáticas (sin imágenes
+    subidas por el usuario).
+    """
+    if not artefactos_validos():
+        return None
+    archivo = os.path.join(DIRECTORIO_ARTEFACTOS, 'plantilla.docx')
+    return archivo if os.path.exists(archivo) else None
@@ -0,0 +1,221 @@
+"""
+Caché en disco de libros de Excel ya leídos
+Evita volver a leer la hoja de cálculo cuando se regenera el mismo libro
+(por ejemplo, cambiando solo nombre_uds o las imágenes). Las entradas se
+identifican por el hash del contenido del archivo, se guardan con columnas
+categóricas (compactas) y se desalojan por LRU al superar el tamaño máximo.
+Al vivir en el sistema de archivos, la comparten todos los procesos worker.
+
+Las entradas son pickles con datos de los encuestados: el directorio tiene que
+ser privado del usuario del servidor (modo 0700), porque cualquiera que pueda
+escribir en él podría ejecutar código al cargar una entrada.
+"""
+
+import hashlib
+import os
+import pickle
+import stat
+import tempfile
+import time
+
+import pandas as pd
+
+
+# Se incrementa si cambia el formato de las entradas
+VERSION_FORMATO = 1
+
+# Fracción máxima de valores distintos para guardar una columna como categórica
+UMBRAL_CATEGORICA = 0.5
+
+
+def hash_archivo(ruta, tamano_bloque=1024 * 1024):
+    """
+    Calcula el SHA-256 del contenido de un archivo
+
+    Returns:
+        str: Hash en hexadecimal
+    """
+    hasher = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        while True:
+            bloque = f.read(tamano_bloque)
+            if not bloque:
+                break
+            hasher.update(bloque)
+    return hasher.hexdigest()
+
+
+class CacheDatos:
+    """Caché LRU de DataFrames en un directorio compartido"""
+
+    def __init__(self, directorio, tamano_max_mb=256):
+        """
+        Args:
+            directorio: Directorio de la caché
+            tamano_max_mb: Tamaño total máximo en MB antes de desalojar entradas
+        """
+        self.directorio = directorio
+        self.tamano_max = tamano_max_mb * 1024 * 1024
+        self.aciertos = 0
+        self.fallos = 0
+        os.makedirs(self.directorio, mode=0o700, exist_ok=True)
+        self._verificar_directorio()
+
+    def _verificar_directorio(self):
+        """
+        Comprueba que el directorio es del usuario actual y no lo pueden usar otros
+
+        Raises:
+            PermissionError: Si es un enlace simbólico o pertenece a otro usuario
+        """
+        info = os.lstat(self.directorio)
+        if not stat.S_ISDIR(info.st_mode):
+            raise PermissionError(f'La caché de datos no es un directorio: {self.directorio}')
+        if hasattr(os, 'getuid') and info.st_uid != os.getuid():
+            raise PermissionError(f'La caché de datos pertenece a otro usuario: {self.directorio}')
+        if stat.S_IMODE(info.st_mode) & 0o077:
+            os.chmod(self.directorio, 0o700)
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, f'{clave}.v{VERSION_FORMATO}.pkl')
+
+    def obtener(self, clave):
+        """
+        Devuelve el DataFrame guardado para la clave, o None
+
+        Un acierto actualiza la fecha de modificación de la entrada, que es
+        el criterio de antigüedad del desalojo LRU.
+        """
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, 'rb') as f:
+                entrada = pickle.load(f)
+        except FileNotFoundError:
+            self.fallos += 1
+            return None
+        except Exception as e:
+            # Entrada corrupta o de otra versión de pandas: se trata como fallo
+            print(f"  ⚠️  Entrada de caché ilegible, se descarta: {e}")
+            self._descartar(ruta)
+            self.fallos += 1
+            return None
+
+        try:
+            df = entrada['datos']
+            # Restaurar los tipos originales para que el análisis sea idéntico
+            for columna, dtype in entrada['tipos'].items():
+                df[columna] = df[columna].astype(dtype)
+        except Exception as e:
+            print(f"  ⚠️  Entrada de caché con formato inesperado, se descarta: {e}")
+            self._descartar(ruta)
+            self.fallos += 1
+            return None
+
+        try:
+            os.utime(ruta)
+        except OSError:
+            pass
+        self.aciertos += 1
+        return df
+
+    def _descartar(self, ruta):
+        try:
+            os.remove(ruta)
+        except OSError:
+            pass
+
+    def guardar(self, clave, df):
+        """Guarda un DataFrame con las columnas de texto repetitivo como categóricas"""
+        compacto = df.copy()
+        tipos = {}
+        for columna in compacto.columns:
+            serie = compacto[columna]
+            if pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie):
+                if len(serie) and serie.nunique(dropna=True) / len(serie) <= UMBRAL_CATEGORICA:
+                    tipos[columna] = serie.dtype
+                    compacto[columna] = serie.astype('category')
+
+        # Escritura atómica: otros procesos nunca ven una entrada a medias
+        fd, temporal = tempfile.mkstemp(dir=self.directorio, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump({'datos': compacto, 'tipos': tipos}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporal, self._ruta(clave))
+        except OSError:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+
+        self.desalojar()
+
+    def desalojar(self):
+        """Elimina las entradas menos usadas hasta quedar bajo el tamaño máximo"""
+        entradas = []
+        total = 0
+        for nombre in os.listdir(self.directorio):
+            ruta = os.path.join(self.directorio, nombre)
+            try:
+                info = os.stat(ruta)
+            except OSError:
+                continue
+            # Temporales huérfanos de escrituras interrumpidas
+            if nombre.endswith('.tmp'):
+                if info.st_mtime < time.time() - 3600:
+                    os.remove(ruta)
+                continue
+            entradas.append((info.st_mtime, info.st_size, ruta))
+            total += info.st_size
+
+        for _, tamano, ruta in sorted(entradas):
+            if total <= self.tamano_max:
+                break
+            try:
+                os.remove(ruta)
+                total -= tamano
+            except OSError:
+                continue
+
+    def leer(self, archivo, lector):
+        """
+        Devuelve el DataFrame del archivo desde la caché o leyéndolo con lector
+
+        Args:
+            archivo: Ruta del libro de Excel
+            lector: Función que recibe la ruta y devuelve el DataFrame
+
+        Returns:
+            tuple: (DataFrame, bool indicando si vino de la caché)
+        """
+        clave = hash_archivo(archivo)
+        df = self.obtener(clave)
+        if df is not None:
+            return df, True
+
+        df = lector(archivo)
+        try:
+            self.guardar(clave, df)
+        except OSError as e:
+            print(f"  ⚠️  No se pudo guardar en caché: {e}")
+        return df, False
+
+    def metricas(self):
+        """
+        Returns:
+            dict: Aciertos, fallos y tamaño actual de la caché
+        """
+        tamano = 0
+        entradas = 0
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith('.pkl'):
+                entradas += 1
+                try:
+                    tamano += os.path.getsize(os.path.join(self.directorio, nombre))
+                except OSError:
+                    pass
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'entradas': entradas,
+            'bytes': tamano,
+            'bytes_max': self.tamano_max
+        }
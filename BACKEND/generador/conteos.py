@@ -0,0 +1,129 @@
+"""
+Entrada agregada: conteos de respuestas ya calculados por el socio
+En lugar del libro con una fila por persona (más pesado, lento de leer y
+con datos personales) se recibe un JSON compacto:
+
+    {
+        "nombre_uds": "Hogar Infantil Norte",
+        "total_respuestas": 60,
+        "preguntas": {
+            "¿Cómo califica la calidad del servicio?": {"5": 30, "4": 20, "3": 10},
+            "¿Está satisfecho con la alimentación?": {"Sí": 52, "No": 8}
+        }
+    }
+
+El esquema se valida de forma estricta: claves desconocidas, tipos
+incorrectos o conteos incoherentes con el total se rechazan.
+"""
+
+import json
+
+
+MAX_PREGUNTAS_CONTEOS = 500
+MAX_RESPUESTAS_POR_PREGUNTA = 1000
+MAX_LARGO_TEXTO = 500
+
+CLAVES_CONTEOS = ('nombre_uds', 'total_respuestas', 'preguntas')
+
+
+class ErrorConteos(ValueError):
+    """JSON de conteos inválido; errores contiene cada problema con su ruta"""
+
+    def __init__(self, errores):
+        super().__init__('JSON de conteos inválido: ' + '; '.join(errores[:5])
+                         + (f' (y {len(errores) - 5} más)' if len(errores) > 5 else ''))
+        self.errores = errores
+
+
+def _entero_no_negativo(valor):
+    return isinstance(valor, int) and not isinstance(valor, bool) and valor >= 0
+
+
+def _texto_valido(valor):
+    return isinstance(valor, str) and valor.strip() != '' and len(valor) <= MAX_LARGO_TEXTO
+
+
+def validar_conteos(datos):
+    """
+    Valida y normaliza el JSON de conteos
+
+    Args:
+        datos: dict ya decodificado, o str/bytes con el JSON
+
+    Returns:
+        dict: nombre_uds, total_respuestas y preguntas {pregunta: {respuesta: conteo}}
+            en el orden recibido, sin respuestas con conteo 0
+
+    Raises:
+        ErrorConteos: Con la lista completa de problemas encontrados
+    """
+    if isinstance(datos, (str, bytes)):
+        try:
+            datos = json.loads(datos)
+        except ValueError as e:
+            raise ErrorConteos([f'JSON mal formado: {e}'])
+
+    if not isinstance(datos, dict):
+        raise ErrorConteos(['$: debe ser un objeto'])
+
+    errores = []
+    for clave in datos:
+        if clave not in CLAVES_CONTEOS:
+            errores.append(f'$.{clave}: clave desconocida (permitidas: {", ".join(CLAVES_CONTEOS)})')
+
+    nombre_uds = datos.get('nombre_uds')
+    if not _texto_valido(nombre_uds):
+        errores.append(f'$.nombre_uds: texto requerido de 1 a {MAX_LARGO_TEXTO} caracteres')
+
+    total = datos.get('total_respuestas')
+    if not _entero_no_negativo(total) or total == 0:
+        errores.append('$.total_respuestas: entero mayor que 0 requerido')
+        total = None
+
+    preguntas = datos.get('preguntas')
+    normalizadas = {}
+    if not isinstance(preguntas, dict) or not preguntas:
+        errores.append('$.preguntas: objeto no vacío requerido {pregunta: {respuesta: conteo}}')
+    elif len(preguntas) > MAX_PREGUNTAS_CONTEOS:
+        errores.append(f'$.preguntas: máximo {MAX_PREGUNTAS_CONTEOS} preguntas')
+    else:
+        for pregunta, respuestas in preguntas.items():
+            ruta = f'$.preguntas[{json.dumps(pregunta, ensure_ascii=False)}]'
+            if not _texto_valido(pregunta):
+                errores.append(f'{ruta}: la pregunta debe ser un texto de 1 a {MAX_LARGO_TEXTO} caracteres')
+                continue
+            if not isinstance(respuestas, dict) or not respuestas:
+                errores.append(f'{ruta}: objeto no vacío requerido {{respuesta: conteo}}')
+                continue
+            if len(respuestas) > MAX_RESPUESTAS_POR_PREGUNTA:
+                errores.append(f'{ruta}: máximo {MAX_RESPUESTAS_POR_PREGUNTA} respuestas distintas')
+                continue
+
+            validas = True
+            for respuesta, conteo in respuestas.items():
+                if not _texto_valido(respuesta):
+                    errores.append(f'{ruta}: respuesta vacía o de más de {MAX_LARGO_TEXTO} caracteres')
+                    validas = False
+                elif not _entero_no_negativo(conteo):
+                    errores.append(f'{ruta}[{json.dumps(respuesta, ensure_ascii=False)}]: conteo entero >= 0 requerido')
+                    validas = False
+            if not validas:
+                continue
+
+            suma = sum(respuestas.values())
+            if suma == 0:
+                errores.append(f'{ruta}: al menos una respuesta con conteo mayor que 0 requerida')
+                continue
+            if total is not None and suma > total:
+                errores.append(f'{ruta}: suma {suma} mayor que total_respuestas ({total})')
+                continue
+            normalizadas[pregunta] = {r: c for r, c in respuestas.items() if c > 0}
+
+    if errores:
+        raise ErrorConteos(errores)
+
+    return {
+        'nombre_uds': nombre_uds.strip(),
+        'total_respuestas': total,
+        'preguntas': normalizadas
+    }
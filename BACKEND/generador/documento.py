@@ -4,24 +4,76 @@ Genera el informe completo en formato DOCX
 """
 
 import os
-import pandas as pd
+from functools import lru_cache
+from io import BytesIO
 from docx import Document
 from docx.shared import Inches, Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 
-from .graficas import crear_grafica_circular
-from .analizador import analizar_columna, generar_analisis_resultados, generar_oportunidades_mejora
-from .utils import convertir_a_png, ENCABEZADO, PIE_PAGINA, COLUMNAS_EXCLUIR
+from .graficas import (
+    crear_graficas_circulares,
+    crear_grafica_tendencia,
+    DPI,
+    GRAFICAS_POR_LAMINA,
+    MOTOR_POR_DEFECTO
+)
+from .analizador import (
+    analizar_columna,
+    analizar_conteos,
+    detectar_escala,
+    generar_analisis_resultados,
+    generar_oportunidades_mejora,
+    resumir_resultado
+)
+from .conteos import validar_conteos
+from .imagenes import compactar_png, COMPACTAR_POR_DEFECTO
+from .artefactos import EXTENSIONES_IMAGEN
+from .escritor_docx import DocumentoIncremental, MOTORES_DOCUMENTO, MOTOR_POR_DEFECTO as MOTOR_DOCUMENTO_POR_DEFECTO
+from .lectura import leer_excel
+from .marca import cargar_perfil, fuente_imagen, plantilla_perfil, textos_perfil, PERFIL_PREDETERMINADO
+from .memoria import PerfilMemoria
+from .segmentos import analizar_segmentos, periodo_respuestas
+from .utils import convertir_a_png, COLUMNAS_EXCLUIR
 
 
-def _agregar_encabezado_pie(doc, directorio_trabajo='.'):
+# Resoluciones de respaldo cuando se supera el presupuesto de memoria
+DPI_REDUCIDO = 150
+DPI_MINIMO = 96
+
+
+def _imagen_usuario(directorio_trabajo, nombre):
+    """Imagen 'encabezado' o 'pie' subida por el usuario al directorio de trabajo, o None"""
+    for ext in EXTENSIONES_IMAGEN:
+        archivo = os.path.join(directorio_trabajo, f'{nombre}{ext}')
+        if os.path.exists(archivo):
+            return archivo
+    return None
+
+
+def _imagen_marca(marca, nombre):
+    """Imagen del perfil de marca para 'encabezado' o 'pie' (ruta o BytesIO), o None"""
+    imagen = fuente_imagen(marca, nombre)
+    if imagen is not None:
+        if marca['id'] == PERFIL_PREDETERMINADO:
+            print(f"  ℹ️  Usando imagen estática: {imagen}")
+        else:
+            print(f"  ℹ️  Usando imagen del perfil {marca['id']}: {nombre}")
+    return imagen
+
+
+def _agregar_encabezado_pie(doc, directorio_trabajo='.', marca=None):
     """
     Agrega encabezado y pie de página al documento
     
     Args:
         doc: Documento de python-docx
         directorio_trabajo: Directorio donde buscar las imágenes
+        marca: Perfil de marca (por defecto el configurado en PERFIL_MARCA)
     """
+    marca = marca or cargar_perfil()
+    encabezado = marca['encabezado']
+    pie_pagina = marca['pie_pagina']
+    
     # CONFIGURAR MÁRGENES DE LA PÁGINA
     section = doc.sections[0]
     
@@ -38,31 +90,17 @@ def _agregar_encabezado_pie(doc, directorio_trabajo='.'):
     header = section.header
     
     # Buscar imagen de encabezado en múltiples ubicaciones
-    imagen_encabezado = None
-    
     # 1. Primero buscar en directorio de trabajo (para imágenes subidas por el usuario)
-    for ext in ['.png', '.jpg', '.jpeg', '.PNG', '.JPG', '.JPEG']:
-        archivo = os.path.join(directorio_trabajo, f'encabezado{ext}')
-        if os.path.exists(archivo):
-            imagen_encabezado = archivo
-            break
+    imagen_encabezado = _imagen_usuario(directorio_trabajo, 'encabezado')
     
-    # 2. Si no se encontró, buscar en carpeta imagenes/ (imágenes estáticas)
+    # 2. Si no se encontró, usar la del perfil de marca (ya normalizada)
     if not imagen_encabezado:
-        # Obtener ruta base del proyecto (donde está app.py)
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        imagenes_dir = os.path.join(base_dir, 'imagenes')
-        
-        for ext in ['.png', '.jpg', '.jpeg', '.PNG', '.JPG', '.JPEG']:
-            archivo = os.path.join(imagenes_dir, f'encabezado{ext}')
-            if os.path.exists(archivo):
-                imagen_encabezado = archivo
-                print(f"  ℹ️  Usando imagen estática: {archivo}")
-                break
+        imagen_encabezado = _imagen_marca(marca, 'encabezado')
     
     # Si existe imagen de encabezado, agregarla
     if imagen_encabezado:
-        imagen_encabezado = convertir_a_png(imagen_encabezado)
+        if isinstance(imagen_encabezado, str):
+            imagen_encabezado = convertir_a_png(imagen_encabezado)
         
         p_img = header.paragraphs[0]
         p_img.alignment = WD_ALIGN_PARAGRAPH.LEFT
@@ -76,21 +114,21 @@ def _agregar_encabezado_pie(doc, directorio_trabajo='.'):
     else:
         # Usar texto por defecto
         p1 = header.paragraphs[0]
-        p1.text = ENCABEZADO['linea1']
+        p1.text = encabezado['linea1']
         p1.alignment = WD_ALIGN_PARAGRAPH.CENTER
         run1 = p1.runs[0]
         run1.font.size = Pt(11)
         run1.font.bold = True
         
         p2 = header.add_paragraph()
-        p2.text = ENCABEZADO['linea2']
+        p2.text = encabezado['linea2']
         p2.alignment = WD_ALIGN_PARAGRAPH.CENTER
         run2 = p2.runs[0]
         run2.font.size = Pt(11)
         run2.font.bold = True
         
         p3 = header.add_paragraph()
-        p3.text = ENCABEZADO['linea3']
+        p3.text = encabezado['linea3']
         p3.alignment = WD_ALIGN_PARAGRAPH.CENTER
         run3 = p3.runs[0]
         run3.font.size = Pt(9)
@@ -100,29 +138,16 @@ def _agregar_encabezado_pie(doc, directorio_trabajo='.'):
     footer = section.footer
     
     # Buscar imagen de pie
-    imagen_pie = None
-    
     # 1. Primero buscar en directorio de trabajo
-    for ext in ['.png', '.jpg', '.jpeg', '.PNG', '.JPG', '.JPEG']:
-        archivo = os.path.join(directorio_trabajo, f'pie{ext}')
-        if os.path.exists(archivo):
-            imagen_pie = archivo
-            break
+    imagen_pie = _imagen_usuario(directorio_trabajo, 'pie')
     
-    # 2. Si no se encontró, buscar en carpeta imagenes/
+    # 2. Si no se encontró, usar la del perfil de marca
     if not imagen_pie:
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        imagenes_dir = os.path.join(base_dir, 'imagenes')
-        
-        for ext in ['.png', '.jpg', '.jpeg', '.PNG', '.JPG', '.JPEG']:
-            archivo = os.path.join(imagenes_dir, f'pie{ext}')
-            if os.path.exists(archivo):
-                imagen_pie = archivo
-                print(f"  ℹ️  Usando imagen estática: {archivo}")
-                break
+        imagen_pie = _imagen_marca(marca, 'pie')
     
     if imagen_pie:
-        imagen_pie = convertir_a_png(imagen_pie)
+        if isinstance(imagen_pie, str):
+            imagen_pie = convertir_a_png(imagen_pie)
         
         pf_img = footer.paragraphs[0]
         pf_img.alignment = WD_ALIGN_PARAGRAPH.LEFT
@@ -136,27 +161,55 @@ def _agregar_encabezado_pie(doc, directorio_trabajo='.'):
     else:
         # Usar texto por defecto
         pf1 = footer.paragraphs[0]
-        pf1.text = PIE_PAGINA['linea1']
+        pf1.text = pie_pagina['linea1']
         pf1.alignment = WD_ALIGN_PARAGRAPH.CENTER
         runf1 = pf1.runs[0]
         runf1.font.size = Pt(9)
         runf1.font.bold = True
         
         pf2 = footer.add_paragraph()
-        pf2.text = PIE_PAGINA['linea2']
+        pf2.text = pie_pagina['linea2']
         pf2.alignment = WD_ALIGN_PARAGRAPH.CENTER
         runf2 = pf2.runs[0]
         runf2.font.size = Pt(9)
         runf2.font.bold = True
         
         pf3 = footer.add_paragraph()
-        pf3.text = PIE_PAGINA['linea3']
+        pf3.text = pie_pagina['linea3']
         pf3.alignment = WD_ALIGN_PARAGRAPH.CENTER
         runf3 = pf3.runs[0]
         runf3.font.size = Pt(9)
         runf3.font.bold = True
 
 
+# Texto descriptivo de cada valor de la escala numérica
+_TEXTO_VALORES = {
+    '5': 'muy satisfactorio',
+    '4': 'satisfactorio',
+    '3': 'aceptable',
+    '2': 'insatisfactorio',
+    '1': 'muy insatisfactorio'
+}
+
+# Redacción de los resultados por (escala, número de opciones). {p0}, {v0}...
+# son el porcentaje y el valor de cada opción; con más de tres opciones la
+# plantilla se arma en _plantilla_resultado
+_PLANTILLAS_RESULTADO = {
+    ('numerica', 1): "El {p0}% da una calificación de {v0}.",
+    ('satisfaccion', 1): "El {p0}% dio una respuesta de {v0}.",
+    ('calificacion', 1): "El {p0}% dan una calificación de {v0} a la pregunta.",
+    ('otra', 1): "El {p0}% respondieron {v0}.",
+    ('numerica', 2): "Las respuesta es un {p0}% da una calificación de {v0} y un {p1}% da una calificación de {v1}.",
+    ('satisfaccion', 2): "El {p0}% están {v0} y el {p1}% {v1}.",
+    ('calificacion', 2): "El {p0}% dan una calificación de {v0} a la pregunta y el {p1}% da una calificación de {v1}.",
+    ('otra', 2): "El {p0}% dio una respuesta de {v0} y el {p1}% de {v1}.",
+    ('numerica', 3): "El {p0}% da una calificación de {v0}, el {p1}% de {v1} y el {p2}% de {v2}.",
+    ('satisfaccion', 3): "El {p0}% están {v0}, el {p1}% {v1} y el {p2}% {v2}.",
+    ('calificacion', 3): "El {p0}% dan una calificación de {v0}, el {p1}% de {v1} y el {p2}% de {v2}.",
+    ('otra', 3): "El {p0}% respondieron {v0}, el {p1}% {v1} y el {p2}% {v2}.",
+}
+
+
 def _convertir_valor_texto(valor):
     """
     Convierte valores numéricos a texto descriptivo
@@ -168,296 +221,632 @@ def _convertir_valor_texto(valor):
         str: Texto descriptivo
     """
     valor_str = str(valor).strip()
-    
-    if valor_str == '5':
-        return 'muy satisfactorio'
-    elif valor_str == '4':
-        return 'satisfactorio'
-    elif valor_str == '3':
-        return 'aceptable'
-    elif valor_str == '2':
-        return 'insatisfactorio'
-    elif valor_str == '1':
-        return 'muy insatisfactorio'
-    else:
-        return valor_str
+    return _TEXTO_VALORES.get(valor_str, valor_str)
+
+
+@lru_cache(maxsize=None)
+def _plantilla_resultado(escala, opciones):
+    """Método format de la plantilla para la escala y el número de opciones"""
+    plantilla = _PLANTILLAS_RESULTADO.get((escala, opciones))
+    if plantilla is None:
+        # Más de tres opciones: la misma redacción para todas las escalas
+        partes = ["El {p0}% da una calificación de {v0}"]
+        partes += [f"el {{p{i}}}% de {{v{i}}}" for i in range(1, opciones - 1)]
+        partes.append(f"y el {{p{opciones - 1}}}% de {{v{opciones - 1}}}")
+        plantilla = f"{', '.join(partes)}."
+    return plantilla.format
 
 
-def _generar_texto_resultado(items):
+@lru_cache(maxsize=4096)
+def _redactar_resultado(escala, items):
+    """Texto de resultados de una distribución (memoizado: se repiten entre preguntas e informes)"""
+    campos = {}
+    for i, (valor, porcentaje) in enumerate(items):
+        campos[f'p{i}'] = porcentaje
+        campos[f'v{i}'] = _convertir_valor_texto(valor) if escala == 'numerica' else valor
+    return _plantilla_resultado(escala, len(items))(**campos)
+
+
+def _generar_texto_resultado(items, escala=None):
     """
     Genera el texto descriptivo de los resultados
     
     Args:
         items: Lista de tuplas (valor, porcentaje)
+        escala: Escala ya detectada en el análisis (resultado['escala']);
+            si no se indica se detecta aquí
         
     Returns:
         str: Texto descriptivo
     """
-    # Detectar si son valores numéricos
-    es_numerica = all(item[0].strip() in ['1', '2', '3', '4', '5'] for item in items)
-    
-    # Detectar tipo de respuesta
-    primera_opcion = items[0][0].lower()
-    es_satisfaccion = any(palabra in primera_opcion for palabra in ['satisfecho', 'satisfactorio', 'satisfactoria'])
-    es_calificacion = any(palabra in primera_opcion for palabra in ['bueno', 'buena', 'malo', 'mala', 'regular', 'excelente'])
-    
-    if len(items) == 1:
-        valor_texto = _convertir_valor_texto(items[0][0]) if es_numerica else items[0][0]
-        
-        if es_numerica:
-            return f"El {items[0][1]}% da una calificación de {valor_texto}."
-        elif es_satisfaccion:
-            return f"El {items[0][1]}% dio una respuesta de {valor_texto}."
-        elif es_calificacion:
-            return f"El {items[0][1]}% dan una calificación de {valor_texto} a la pregunta."
-        else:
-            return f"El {items[0][1]}% respondieron {valor_texto}."
-            
-    elif len(items) == 2:
-        if es_numerica:
-            valor1 = _convertir_valor_texto(items[0][0])
-            valor2 = _convertir_valor_texto(items[1][0])
-            return f"Las respuesta es un {items[0][1]}% da una calificación de {valor1} y un {items[1][1]}% da una calificación de {valor2}."
-        elif es_satisfaccion:
-            return f"El {items[0][1]}% están {items[0][0]} y el {items[1][1]}% {items[1][0]}."
-        elif es_calificacion:
-            return f"El {items[0][1]}% dan una calificación de {items[0][0]} a la pregunta y el {items[1][1]}% da una calificación de {items[1][0]}."
-        else:
-            return f"El {items[0][1]}% dio una respuesta de {items[0][0]} y el {items[1][1]}% de {items[1][0]}."
-            
-    elif len(items) == 3:
-        if es_numerica:
-            valor1 = _convertir_valor_texto(items[0][0])
-            valor2 = _convertir_valor_texto(items[1][0])
-            valor3 = _convertir_valor_texto(items[2][0])
-            return f"El {items[0][1]}% da una calificación de {valor1}, el {items[1][1]}% de {valor2} y el {items[2][1]}% de {valor3}."
-        elif es_satisfaccion:
-            return f"El {items[0][1]}% están {items[0][0]}, el {items[1][1]}% {items[1][0]} y el {items[2][1]}% {items[2][0]}."
-        elif es_calificacion:
-            return f"El {items[0][1]}% dan una calificación de {items[0][0]}, el {items[1][1]}% de {items[1][0]} y el {items[2][1]}% de {items[2][0]}."
-        else:
-            return f"El {items[0][1]}% respondieron {items[0][0]}, el {items[1][1]}% {items[1][0]} y el {items[2][1]}% {items[2][0]}."
-            
+    items = tuple(items)
+    if escala is None:
+        escala = detectar_escala([valor for valor, _ in items])
+    return _redactar_resultado(escala, items)
+
+
+def _agregar_imagen(doc, run, img_buffer, ancho):
+    """Inserta una imagen en el run con el método del motor de documento en uso"""
+    if isinstance(doc, DocumentoIncremental):
+        doc.agregar_imagen(run, img_buffer, ancho)
     else:
-        # Más de tres opciones
-        partes = []
-        for i, (key, value) in enumerate(items):
-            valor_texto = _convertir_valor_texto(key) if es_numerica else key
-            
-            if i == 0:
-                partes.append(f"El {value}% da una calificación de {valor_texto}")
-            elif i == len(items) - 1:
-                partes.append(f"y el {value}% de {valor_texto}")
-            else:
-                partes.append(f"el {value}% de {valor_texto}")
-        return f"{', '.join(partes)}."
+        run.add_picture(img_buffer, width=ancho)
+
+
+def _etiqueta_corta(pregunta, largo=60):
+    return pregunta if len(pregunta) <= largo else f"{pregunta[:largo - 3]}..."
 
 
-def generar_informe_word(archivo_excel, archivo_salida, nombre_uds='', directorio_trabajo='.'):
+def _agregar_segmentacion(doc, segmentacion, dpi_graficas=DPI, compactar_imagenes=True, cache_imagenes=None):
     """
-    Genera el informe completo en formato Word
+    Agrega la tabla cruzada por segmento y la gráfica de tendencia
     
     Args:
-        archivo_excel: Ruta del archivo Excel con los datos
-        archivo_salida: Ruta del archivo de salida .docx
-        nombre_uds: Nombre de la Unidad de Servicio (opcional)
-        directorio_trabajo: Directorio de trabajo para las imágenes
-        
-    Returns:
-        dict: Diccionario con información del proceso
+        doc: Documento de python-docx (o DocumentoIncremental)
+        segmentacion: Resultado de analizar_segmentos
     """
-    print(f"📊 Leyendo archivo: {archivo_excel}")
-    
-    # Extraer nombre del UDS si no se proporciona
-    if not nombre_uds:
-        nombre_archivo = os.path.basename(archivo_excel)
-        nombre_sin_ext = os.path.splitext(nombre_archivo)[0]
-        nombre_uds = nombre_sin_ext.replace('_', ' ').title()
-        print(f"📝 Nombre UDS detectado: {nombre_uds}")
-    
-    # Leer Excel
-    df = pd.read_excel(archivo_excel)
-    total_respuestas = len(df)
-    print(f"✓ {total_respuestas} respuestas encontradas")
-    print(f"✓ {len(df.columns)} columnas detectadas")
-    
-    # Crear documento
-    doc = Document()
-    
-    # Agregar encabezado y pie
-    _agregar_encabezado_pie(doc, directorio_trabajo)
-    
-    # Configurar estilos
-    style = doc.styles['Normal']
-    font = style.font
-    font.name = 'Calibri'
-    font.size = Pt(11)
-    
-    # INTRODUCCIÓN
-    p_intro_titulo = doc.add_paragraph()
-    run = p_intro_titulo.add_run('Introducción')
+    p_titulo = doc.add_paragraph()
+    run = p_titulo.add_run('Resultados por segmento')
     run.font.name = 'Calibri'
     run.font.size = Pt(11)
     run.font.bold = True
-    p_intro_titulo.paragraph_format.space_after = Pt(6)
-    
-    p_intro_texto = doc.add_paragraph()
-    texto_intro = (f"Dentro del marco de las obligaciones contractuales SIGE establecidas entre "
-                   f"EL INSTITUTO COLOMBIANO DE BIENESTAR FAMILIAR ICBF y la ASOCIACION DE PADRES "
-                   f"DE FAMILIA DEL HOGAR INFANTIL GUATAPURI (UDS) {nombre_uds.upper()} se establecer el de realizar "
-                   f"una encuesta que permita saber el nivel de satisfacción de los usuarios respecto "
-                   f"al servicio prestado el siguiente documento muestra la metodología, los resultados, "
-                   f"el análisis de los mismos y unas posibles oportunidades de mejora.")
-    run = p_intro_texto.add_run(texto_intro)
-    run.font.name = 'Calibri'
-    run.font.size = Pt(11)
-    p_intro_texto.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-    p_intro_texto.paragraph_format.space_after = Pt(11)
+    p_titulo.paragraph_format.space_after = Pt(6)
+    
+    if segmentacion['segmentos']:
+        segmentos = segmentacion['segmentos']
+        p_texto = doc.add_paragraph()
+        run = p_texto.add_run(
+            f"La siguiente tabla muestra el porcentaje de respuestas favorables de cada pregunta según "
+            f"{segmentacion['columna_segmento']}. Entre paréntesis, el número de encuestas de cada grupo."
+        )
+        run.font.name = 'Calibri'
+        run.font.size = Pt(11)
+        p_texto.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
+        p_texto.paragraph_format.space_after = Pt(6)
+        
+        tabla = doc.add_table(rows=1, cols=len(segmentos) + 2)
+        tabla.style = 'Table Grid'
+        encabezados = ['Pregunta'] + [f"{s} ({segmentacion['respuestas_segmento'][s]})" for s in segmentos] + ['Total']
+        for celda, titulo in zip(tabla.rows[0].cells, encabezados):
+            run = celda.paragraphs[0].add_run(titulo)
+            run.font.name = 'Calibri'
+            run.font.size = Pt(8)
+            run.font.bold = True
+        
+        for fila in segmentacion['tabla']:
+            valores = [fila['por_segmento'][s] for s in segmentos] + [fila['total']]
+            celdas = tabla.add_row().cells
+            textos = [_etiqueta_corta(fila['pregunta'])] + ['-' if v is None else f"{v:.1f}%" for v in valores]
+            for celda, texto in zip(celdas, textos):
+                run = celda.paragraphs[0].add_run(texto)
+                run.font.name = 'Calibri'
+                run.font.size = Pt(8)
+    
+    if segmentacion['tendencia']:
+        nombre_periodo = 'semana' if segmentacion['periodo'] == 'semana' else 'mes'
+        p_texto = doc.add_paragraph()
+        run = p_texto.add_run(
+            f"La siguiente gráfica muestra la evolución del porcentaje de respuestas favorables "
+            f"(todas las preguntas) por {nombre_periodo} de diligenciamiento de la encuesta."
+        )
+        run.font.name = 'Calibri'
+        run.font.size = Pt(11)
+        p_texto.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
+        p_texto.paragraph_format.space_before = Pt(12)
+        p_texto.paragraph_format.space_after = Pt(6)
+        
+        img_buffer = crear_grafica_tendencia(
+            [(punto['periodo'], punto['porcentaje']) for punto in segmentacion['tendencia']],
+            f'Respuestas favorables por {nombre_periodo}',
+            dpi=dpi_graficas
+        )
+        if compactar_imagenes:
+            img_buffer = compactar_png(img_buffer, cache=cache_imagenes)
+        
+        p_grafica = doc.add_paragraph()
+        p_grafica.alignment = WD_ALIGN_PARAGRAPH.LEFT
+        _agregar_imagen(doc, p_grafica.add_run(), img_buffer, Inches(5.84))
+        p_grafica.paragraph_format.space_after = Pt(12)
+        img_buffer.close()
+
+
+def _agregar_resumen_texto_libre(doc, resultado):
+    """
+    Agrega el resumen de una pregunta abierta: tabla de respuestas más
+    frecuentes y palabras más mencionadas
     
-    # METODOLOGÍA
-    p_metod_titulo = doc.add_paragraph()
-    run = p_metod_titulo.add_run('Metodología')
-    run.font.name = 'Calibri'
-    run.font.size = Pt(11)
-    run.font.bold = True
-    p_metod_titulo.paragraph_format.space_after = Pt(6)
-    
-    p_metod_texto = doc.add_paragraph()
-    texto_metod = (f"El primer paso de la metodología consistió en la elaboración de una encuesta "
-                   f"(lista de preguntas con calificación) que permitiría saber el nivel de satisfacción "
-                   f"de los usuarios de cada uds (para este caso fue la uds {nombre_uds.title()}) respectos a los "
-                   f"distintos ítems de calificación del servicio estas preguntas se establecieron en un "
-                   f"orden de 1 a 5 donde uno es muy malo y 5 muy bueno, y algunas de si o no una vez "
-                   f"establecidas estas preguntas se estableció un formulario tipo GOOGLE y se vinculó al "
-                   f"correo gerenciamasisosas@gmail.com, antes del inicio del encuentro se le explico a los "
-                   f"50 usuarios de la uds la importancia del diligenciamiento de la encuesta, por medios "
-                   f"electrónicos se le envió a los usuarios la encuesta a diligenciar por lineamientos del "
-                   f"ICBF se establece un mínimo del 20% de la población como muestra, para este caso se "
-                   f"lograron diligenciar {total_respuestas} encuestas, una vez diligenciadas se procederá "
-                   f"a realizar las fase de RESULTADOS, ANALISIS DE RESULTADOS Y POSIBLES OPORTUNIDADES DE MEJORA.")
-    run = p_metod_texto.add_run(texto_metod)
+    Args:
+        doc: Documento de python-docx
+        resultado: Resultado de analizar_columna con tipo 'texto_libre'
+    """
+    p_pregunta = doc.add_paragraph()
+    texto_pregunta = (f'Ante la pregunta "{resultado["pregunta"]}" se recibieron {resultado["total"]} '
+                      f'respuestas abiertas ({resultado["distintos"]} distintas). Las más frecuentes se '
+                      f'muestran en la siguiente tabla.')
+    run = p_pregunta.add_run(texto_pregunta)
     run.font.name = 'Calibri'
     run.font.size = Pt(11)
-    p_metod_texto.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-    p_metod_texto.paragraph_format.space_after = Pt(11)
+    p_pregunta.alignment = WD_ALIGN_PARAGRAPH.LEFT
+    p_pregunta.paragraph_format.space_after = Pt(6)
     
-    # RESULTADOS (Página 2)
-    doc.add_page_break()
+    tabla = doc.add_table(rows=1, cols=3)
+    tabla.style = 'Table Grid'
+    for celda, titulo in zip(tabla.rows[0].cells, ('Respuesta', 'Cantidad', '%')):
+        run = celda.paragraphs[0].add_run(titulo)
+        run.font.name = 'Calibri'
+        run.font.size = Pt(10)
+        run.font.bold = True
+    
+    for respuesta, conteo, porcentaje in resultado['respuestas_frecuentes']:
+        celdas = tabla.add_row().cells
+        for celda, valor in zip(celdas, (respuesta, str(conteo), porcentaje)):
+            run = celda.paragraphs[0].add_run(valor)
+            run.font.name = 'Calibri'
+            run.font.size = Pt(10)
+    
+    if resultado['palabras_frecuentes']:
+        p_palabras = doc.add_paragraph()
+        palabras = ', '.join(f"{palabra} ({conteo})" for palabra, conteo in resultado['palabras_frecuentes'])
+        run = p_palabras.add_run(f"Palabras más mencionadas: {palabras}.")
+        run.font.name = 'Calibri'
+        run.font.size = Pt(11)
+        p_palabras.alignment = WD_ALIGN_PARAGRAPH.LEFT
+        p_palabras.paragraph_format.space_before = Pt(6)
+        p_palabras.paragraph_format.space_after = Pt(12)
+
+
+def _notificar(progreso, etapa, **datos):
+    """Envía un evento de progreso; un fallo del receptor no interrumpe la generación"""
+    if progreso is None:
+        return
+    try:
+        progreso({'etapa': etapa, **datos})
+    except Exception as e:
+        print(f"  ⚠️  Error al notificar progreso ({etapa}): {e}")
+
+
+def generar_informe_word(archivo_excel, archivo_salida, nombre_uds='', directorio_trabajo='.',
+                         motor_graficas=None, perfil_memoria=False, presupuesto_memoria_mb=None,
+                         compactar_imagenes=None, motor_lectura=None, cache_datos=None,
+                         dpi_graficas=DPI, motor_documento=None, columna_segmento=None,
+                         periodo_tendencia=None, progreso=None, perfil_marca=None):
+    """
+    Genera el informe completo en formato Word
     
-    p_result_titulo = doc.add_paragraph()
-    run = p_result_titulo.add_run('Resultados')
-    run.font.name = 'Calibri'
-    run.font.size = Pt(11)
-    run.font.bold = True
-    p_result_titulo.paragraph_format.space_after = Pt(12)
+    Args:
+        archivo_excel: Ruta del archivo Excel con los datos
+        archivo_salida: Ruta del archivo de salida .docx
+        nombre_uds: Nombre de la Unidad de Servicio (opcional)
+        directorio_trabajo: Directorio de trabajo para las imágenes
+        motor_graficas: Motor de gráficas ('matplotlib', 'pillow' o 'mosaico'); por defecto GRAFICAS_MOTOR
+        perfil_memoria: Si True, registra memoria por etapa con tracemalloc
+        presupuesto_memoria_mb: Crecimiento máximo del RSS del proceso en MB durante
+            la generación; al acercarse se reduce la resolución de las gráficas
+            en lugar de agotar la memoria
+        compactar_imagenes: Cuantizar y comprimir las gráficas (por defecto IMAGENES_COMPACTAR)
+        motor_lectura: Motor de lectura del Excel (por defecto EXCEL_MOTOR, 'auto')
+        cache_datos: CacheDatos opcional; si el libro ya se leyó antes no se vuelve a leer
+        dpi_graficas: Resolución de las gráficas (300 por defecto)
+        motor_documento: 'docx' (DOM completo en memoria) o 'incremental' (cuerpo e
+            imágenes se escriben al paquete a medida que se procesan); por defecto DOCUMENTO_MOTOR
+        columna_segmento: Columna demográfica para la tabla cruzada de respuestas favorables (opcional)
+        periodo_tendencia: 'semana' o 'mes' para la tendencia de respuestas favorables (opcional)
+        progreso: Función opcional que recibe un dict por evento, con 'etapa':
+            - 'leido': filas, columnas
+            - 'columna': indice, total, columna (columna analizada)
+            - 'grafica': indice, columna (gráfica renderizada)
+            - 'guardado': archivo
+        perfil_marca: Perfil de marca (textos, imágenes y plantilla); por defecto PERFIL_MARCA
+    
+    Returns:
+        dict: Diccionario con información del proceso (incluye 'memoria')
+    """
+    perfil = PerfilMemoria(activo=perfil_memoria, presupuesto_mb=presupuesto_memoria_mb)
+    try:
+        if compactar_imagenes is None:
+            compactar_imagenes = COMPACTAR_POR_DEFECTO
+        incremental = _motor_documento(motor_documento) == 'incremental'
+        marca = cargar_perfil(perfil_marca)
+    
+        print(f"📊 Leyendo archivo: {archivo_excel}")
+    
+        # Extraer nombre del UDS si no se proporciona
+        if not nombre_uds:
+            nombre_archivo = os.path.basename(archivo_excel)
+            nombre_sin_ext = os.path.splitext(nombre_archivo)[0]
+            nombre_uds = nombre_sin_ext.replace('_', ' ').title()
+            print(f"📝 Nombre UDS detectado: {nombre_uds}")
+    
+        # Leer Excel
+        with perfil.etapa('lectura'):
+            if cache_datos is not None:
+                df, desde_cache = cache_datos.leer(archivo_excel, lambda ruta: leer_excel(ruta, motor=motor_lectura))
+                if desde_cache:
+                    print("⚡ Datos recuperados de la caché")
+            else:
+                df = leer_excel(archivo_excel, motor=motor_lectura)
+        total_respuestas = len(df)
+        print(f"✓ {total_respuestas} respuestas encontradas")
+        print(f"✓ {len(df.columns)} columnas detectadas")
+        _notificar(progreso, 'leido', filas=total_respuestas, columnas=len(df.columns))
+    
+        # Tabla cruzada y tendencia en una sola agregación
+        segmentacion = None
+        if columna_segmento or periodo_tendencia:
+            with perfil.etapa('segmentos'):
+                segmentacion = analizar_segmentos(df, columna_segmento, periodo_tendencia)
+    
+        return _escribir_informe(
+            _preguntas_libro(df, columna_segmento, progreso),
+            archivo_salida, nombre_uds, total_respuestas, directorio_trabajo, perfil, marca,
+            motor_graficas=motor_graficas, compactar_imagenes=compactar_imagenes,
+            dpi_graficas=dpi_graficas, incremental=incremental, segmentacion=segmentacion,
+            progreso=progreso, periodo=periodo_respuestas(df)
+        )
+    finally:
+        # Libera tracemalloc aunque la generación falle
+        perfil.cerrar()
+
+
+def generar_informe_desde_conteos(conteos, archivo_salida, directorio_trabajo='.',
+                                  motor_graficas=None, perfil_memoria=False, presupuesto_memoria_mb=None,
+                                  compactar_imagenes=None, dpi_graficas=DPI, motor_documento=None,
+                                  progreso=None, perfil_marca=None, validados=False):
+    """
+    Genera el informe a partir de conteos agregados, sin leer ningún libro
     
-    # Procesar cada pregunta
-    print("\n📈 Generando análisis y gráficas...")
+    Las preguntas entran directamente al análisis, los textos y las gráficas;
+    el documento es el mismo que se obtendría del libro con esas respuestas
+    (sin tabla por segmento ni tendencia, que necesitan datos por persona).
     
-    resultados_todas_preguntas = []
-    contador_preguntas = 0
+    Args:
+        conteos: dict o JSON (str/bytes) con nombre_uds, total_respuestas y
+            preguntas {pregunta: {respuesta: conteo}}; ver conteos.py
+        archivo_salida: Ruta del archivo de salida .docx
+        validados: True si conteos ya es la salida de validar_conteos
+        (resto de argumentos: igual que generar_informe_word)
+    
+    Returns:
+        dict: Diccionario con información del proceso (incluye 'memoria')
     
-    for columna in df.columns:
+    Raises:
+        ErrorConteos: Si el JSON no cumple el esquema
+    """
+    datos = conteos if validados else validar_conteos(conteos)
+    perfil = PerfilMemoria(activo=perfil_memoria, presupuesto_mb=presupuesto_memoria_mb)
+    try:
+        if compactar_imagenes is None:
+            compactar_imagenes = COMPACTAR_POR_DEFECTO
+        incremental = _motor_documento(motor_documento) == 'incremental'
+        marca = cargar_perfil(perfil_marca)
+    
+        total_respuestas = datos['total_respuestas']
+        print(f"📊 Conteos recibidos: {len(datos['preguntas'])} preguntas, {total_respuestas} respuestas")
+        _notificar(progreso, 'leido', filas=total_respuestas, columnas=len(datos['preguntas']))
+    
+        return _escribir_informe(
+            _preguntas_conteos(datos['preguntas'], progreso),
+            archivo_salida, datos['nombre_uds'], total_respuestas, directorio_trabajo, perfil, marca,
+            motor_graficas=motor_graficas, compactar_imagenes=compactar_imagenes,
+            dpi_graficas=dpi_graficas, incremental=incremental, progreso=progreso
+        )
+    finally:
+        perfil.cerrar()
+
+
+def _motor_documento(motor_documento):
+    motor_documento = motor_documento or MOTOR_DOCUMENTO_POR_DEFECTO
+    if motor_documento not in MOTORES_DOCUMENTO:
+        raise ValueError(f"Motor de documento no soportado: {motor_documento}. Use uno de {MOTORES_DOCUMENTO}")
+    return motor_documento
+
+
+def _columna_excluida(columna):
+    columna_lower = columna.lower().strip()
+    return any(excluir in columna_lower for excluir in COLUMNAS_EXCLUIR)
+
+
+def _preguntas_libro(df, columna_segmento, progreso):
+    """Analiza las columnas del libro y produce el resultado de cada pregunta a informar"""
+    total_columnas = len(df.columns)
+    for indice_columna, columna in enumerate(df.columns, start=1):
         # Verificar si la columna debe excluirse
-        columna_lower = columna.lower().strip()
-        if any(excluir in columna_lower for excluir in COLUMNAS_EXCLUIR):
+        if _columna_excluida(columna):
             print(f"  ⏭️  Omitiendo: {columna}")
             continue
         
+        # La columna de segmento es demográfica, no una pregunta de satisfacción
+        if columna == columna_segmento:
+            print(f"  ⏭️  Columna de segmento: {columna}")
+            continue
+        
         print(f"  Procesando: {columna}")
         
         resultado = analizar_columna(df, columna)
+        _notificar(progreso, 'columna', indice=indice_columna, total=total_columnas, columna=columna)
         
         if resultado is None:
             print(f"  ⚠️  Columna vacía, omitiendo")
             continue
         
-        resultados_todas_preguntas.append(resultado)
-        
-        # Texto pregunta
-        p_pregunta = doc.add_paragraph()
-        texto_pregunta = f'Ante la pregunta "{resultado["pregunta"]}" Los resultados se muestran en la siguiente gráfica.'
-        run = p_pregunta.add_run(texto_pregunta)
-        run.font.name = 'Calibri'
-        run.font.size = Pt(11)
-        p_pregunta.alignment = WD_ALIGN_PARAGRAPH.LEFT
-        p_pregunta.paragraph_format.space_after = Pt(6)
+        if resultado['tipo'] == 'fecha':
+            print(f"  ⏭️  Columna de fecha, omitiendo")
+            continue
         
-        # Gráfica
-        img_buffer = crear_grafica_circular(
-            resultado['porcentajes_exactos'], 
-            resultado['pregunta']
-        )
+        yield resultado
+
+
+def _preguntas_conteos(preguntas, progreso):
+    """Analiza las preguntas recibidas como conteos, igual que _preguntas_libro"""
+    total_preguntas = len(preguntas)
+    for indice, (pregunta, conteos) in enumerate(preguntas.items(), start=1):
+        if _columna_excluida(pregunta):
+            print(f"  ⏭️  Omitiendo: {pregunta}")
+            continue
         
-        p_grafica = doc.add_paragraph()
-        p_grafica.alignment = WD_ALIGN_PARAGRAPH.LEFT
-        run = p_grafica.add_run()
-        run.add_picture(img_buffer, width=Inches(3.65))
-        p_grafica.paragraph_format.space_after = Pt(6)
+        print(f"  Procesando: {pregunta}")
         
-        # Texto resultados
-        items = list(resultado['porcentajes'].items())
-        texto_resultado = _generar_texto_resultado(items)
+        resultado = analizar_conteos(pregunta, conteos)
+        _notificar(progreso, 'columna', indice=indice, total=total_preguntas, columna=pregunta)
         
-        p_resultados = doc.add_paragraph()
-        run = p_resultados.add_run(texto_resultado)
-        run.font.name = 'Calibri'
-        run.font.size = Pt(11)
-        p_resultados.alignment = WD_ALIGN_PARAGRAPH.LEFT
-        p_resultados.paragraph_format.space_after = Pt(12)
+        if resultado is None:
+            print(f"  ⚠️  Pregunta sin respuestas, omitiendo")
+            continue
         
-        # Salto de página cada 2 preguntas
-        contador_preguntas += 1
-        if contador_preguntas % 2 == 0:
-            doc.add_page_break()
-    
-    # ANÁLISIS DE RESULTADOS
-    print("\n📊 Generando análisis de resultados...")
+        yield resultado
+
+
+def _agrupar_por_graficas(preguntas, por_lote):
+    """
+    Agrupa los resultados de modo que cada grupo tenga hasta por_lote preguntas con gráfica
+
+    Los de texto libre van en el grupo de la siguiente pregunta con gráfica.
+    Con por_lote=1 cada grupo se entrega en cuanto se analiza su pregunta.
+    """
+    grupo = []
+    con_grafica = 0
+    for resultado in preguntas:
+        grupo.append(resultado)
+        if resultado['tipo'] != 'texto_libre':
+            con_grafica += 1
+            if con_grafica == por_lote:
+                yield grupo
+                grupo = []
+                con_grafica = 0
+    if grupo:
+        yield grupo
+
+
+def _escribir_informe(preguntas, archivo_salida, nombre_uds, total_respuestas, directorio_trabajo,
+                      perfil, marca, motor_graficas=None, compactar_imagenes=True, dpi_graficas=DPI,
+                      incremental=False, segmentacion=None, progreso=None, periodo=None):
+    """
+    Arma y guarda el documento a partir de los resultados por pregunta
     
-    if contador_preguntas % 2 != 0:
+    Args:
+        preguntas: Iterable de resultados de analizar_columna / analizar_conteos
+        perfil: PerfilMemoria de la generación
+        marca: Perfil de marca ya cargado
+        periodo: Mes de las respuestas ('AAAA-MM'), si se conoce
+        (resto: ver generar_informe_word)
+    """
+    cache_imagenes = {}
+    
+    doc = None
+    try:
+        with perfil.etapa('estructura'):
+            # Crear documento: sin imágenes del usuario se parte de la plantilla
+            # del perfil de marca (márgenes, encabezado y pie ya aplicados)
+            if not (_imagen_usuario(directorio_trabajo, 'encabezado') or _imagen_usuario(directorio_trabajo, 'pie')):
+                doc = Document(BytesIO(plantilla_perfil(marca['id'])))
+            else:
+                doc = Document()
+                
+                # Agregar encabezado y pie
+                _agregar_encabezado_pie(doc, directorio_trabajo, marca)
+            
+            if incremental:
+                doc = DocumentoIncremental(doc, archivo_salida)
+            
+            # Configurar estilos
+            style = doc.styles['Normal']
+            font = style.font
+            font.name = 'Calibri'
+            font.size = Pt(11)
+            
+            # INTRODUCCIÓN
+            p_intro_titulo = doc.add_paragraph()
+            run = p_intro_titulo.add_run('Introducción')
+            run.font.name = 'Calibri'
+            run.font.size = Pt(11)
+            run.font.bold = True
+            p_intro_titulo.paragraph_format.space_after = Pt(6)
+            
+            p_intro_texto = doc.add_paragraph()
+            texto_intro = textos_perfil(marca, 'texto_introduccion', nombre_uds, total_respuestas)
+            run = p_intro_texto.add_run(texto_intro)
+            run.font.name = 'Calibri'
+            run.font.size = Pt(11)
+            p_intro_texto.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
+            p_intro_texto.paragraph_format.space_after = Pt(11)
+            
+            # METODOLOGÍA
+            p_metod_titulo = doc.add_paragraph()
+            run = p_metod_titulo.add_run('Metodología')
+            run.font.name = 'Calibri'
+            run.font.size = Pt(11)
+            run.font.bold = True
+            p_metod_titulo.paragraph_format.space_after = Pt(6)
+            
+            p_metod_texto = doc.add_paragraph()
+            texto_metod = textos_perfil(marca, 'texto_metodologia', nombre_uds, total_respuestas)
+            run = p_metod_texto.add_run(texto_metod)
+            run.font.name = 'Calibri'
+            run.font.size = Pt(11)
+            p_metod_texto.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
+            p_metod_texto.paragraph_format.space_after = Pt(11)
+        
+        # RESULTADOS (Página 2)
         doc.add_page_break()
-    
-    p_analisis_titulo = doc.add_paragraph()
-    run = p_analisis_titulo.add_run('Análisis de resultados')
-    run.font.name = 'Calibri'
-    run.font.size = Pt(11)
-    run.font.bold = True
-    p_analisis_titulo.paragraph_format.space_before = Pt(12)
-    p_analisis_titulo.paragraph_format.space_after = Pt(6)
-    
-    texto_analisis = generar_analisis_resultados(resultados_todas_preguntas, nombre_uds)
-    
-    p_analisis_texto = doc.add_paragraph()
-    run = p_analisis_texto.add_run(texto_analisis)
-    run.font.name = 'Calibri'
-    run.font.size = Pt(11)
-    p_analisis_texto.paragraph_format.space_after = Pt(12)
-    p_analisis_texto.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-    
-    # OPORTUNIDADES DE MEJORA
-    print("💡 Generando oportunidades de mejora...")
-    
-    p_oportunidades_titulo = doc.add_paragraph()
-    run = p_oportunidades_titulo.add_run('Posibles oportunidades de mejora')
-    run.font.name = 'Calibri'
-    run.font.size = Pt(11)
-    run.font.bold = True
-    p_oportunidades_titulo.paragraph_format.space_before = Pt(12)
-    p_oportunidades_titulo.paragraph_format.space_after = Pt(6)
-    
-    oportunidades = generar_oportunidades_mejora(resultados_todas_preguntas)
-    
-    for oportunidad in oportunidades:
-        p_oportunidad = doc.add_paragraph()
-        p_oportunidad.paragraph_format.left_indent = Inches(0.25)
-        run = p_oportunidad.add_run(f"·       {oportunidad}")
+        
+        p_result_titulo = doc.add_paragraph()
+        run = p_result_titulo.add_run('Resultados')
         run.font.name = 'Calibri'
         run.font.size = Pt(11)
-        p_oportunidad.paragraph_format.space_after = Pt(6)
-        p_oportunidad.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-    
-    # Guardar documento
-    doc.save(archivo_salida)
+        run.font.bold = True
+        p_result_titulo.paragraph_format.space_after = Pt(12)
+        
+        # Procesar cada pregunta
+        print("\n📈 Generando análisis y gráficas...")
+        
+        resultados_todas_preguntas = []
+        resumen_preguntas = []
+        contador_preguntas = 0
+        contador_graficas = 0
+        
+        # Con el motor 'mosaico' las gráficas se dibujan por láminas: se analizan
+        # varias preguntas por adelantado y sus gráficas se crean de una vez
+        por_lote = GRAFICAS_POR_LAMINA if (motor_graficas or MOTOR_POR_DEFECTO) == 'mosaico' else 1
+        
+        with perfil.etapa('preguntas'):
+            for grupo in _agrupar_por_graficas(preguntas, por_lote):
+                # Degradar la resolución si el proceso se acerca al presupuesto de memoria
+                if dpi_graficas > DPI_REDUCIDO and perfil.proceso_excede_presupuesto(0.8):
+                    dpi_graficas = DPI_REDUCIDO
+                    perfil.registrar_degradacion(f"gráficas a {DPI_REDUCIDO} dpi")
+                elif dpi_graficas > DPI_MINIMO and perfil.proceso_excede_presupuesto():
+                    dpi_graficas = DPI_MINIMO
+                    perfil.registrar_degradacion(f"gráficas a {DPI_MINIMO} dpi")
+                
+                graficas = iter(crear_graficas_circulares(
+                    [(r['porcentajes_exactos'], r['pregunta']) for r in grupo if r['tipo'] != 'texto_libre'],
+                    motor=motor_graficas,
+                    dpi=dpi_graficas
+                ))
+                
+                for resultado in grupo:
+                    # Escritor incremental: la pregunta anterior ya está completa, pasarla a disco
+                    if incremental:
+                        doc.volcar()
+                    
+                    resumen_preguntas.append(resumir_resultado(resultado))
+                    
+                    # Texto libre: tabla resumen en lugar de gráfica, fuera del análisis de satisfacción
+                    if resultado['tipo'] == 'texto_libre':
+                        print(f"  📝 Texto libre ({resultado['distintos']} respuestas distintas), se resume en tabla")
+                        _agregar_resumen_texto_libre(doc, resultado)
+                    
+                        contador_preguntas += 1
+                        if contador_preguntas % 2 == 0:
+                            doc.add_page_break()
+                        continue
+                    
+                    resultados_todas_preguntas.append(resultado)
+                    
+                    # Texto pregunta
+                    p_pregunta = doc.add_paragraph()
+                    texto_pregunta = f'Ante la pregunta "{resultado["pregunta"]}" Los resultados se muestran en la siguiente gráfica.'
+                    run = p_pregunta.add_run(texto_pregunta)
+                    run.font.name = 'Calibri'
+                    run.font.size = Pt(11)
+                    p_pregunta.alignment = WD_ALIGN_PARAGRAPH.LEFT
+                    p_pregunta.paragraph_format.space_after = Pt(6)
+                    
+                    # Gráfica
+                    img_buffer = next(graficas)
+                    if compactar_imagenes:
+                        img_buffer = compactar_png(img_buffer, cache=cache_imagenes)
+                    contador_graficas += 1
+                    _notificar(progreso, 'grafica', indice=contador_graficas, columna=resultado['pregunta'])
+                    
+                    p_grafica = doc.add_paragraph()
+                    p_grafica.alignment = WD_ALIGN_PARAGRAPH.LEFT
+                    run = p_grafica.add_run()
+                    _agregar_imagen(doc, run, img_buffer, Inches(3.65))
+                    p_grafica.paragraph_format.space_after = Pt(6)
+                    
+                    # La imagen ya está en el paquete (o en el .docx); liberar el buffer
+                    img_buffer.close()
+                    del img_buffer
+                    
+                    # Texto resultados
+                    items = list(resultado['porcentajes'].items())
+                    texto_resultado = _generar_texto_resultado(items, resultado.get('escala'))
+                    
+                    p_resultados = doc.add_paragraph()
+                    run = p_resultados.add_run(texto_resultado)
+                    run.font.name = 'Calibri'
+                    run.font.size = Pt(11)
+                    p_resultados.alignment = WD_ALIGN_PARAGRAPH.LEFT
+                    p_resultados.paragraph_format.space_after = Pt(12)
+                    
+                    # Salto de página cada 2 preguntas
+                    contador_preguntas += 1
+                    if contador_preguntas % 2 == 0:
+                        doc.add_page_break()
+                    
+        # ANÁLISIS DE RESULTADOS
+        print("\n📊 Generando análisis de resultados...")
+        
+        with perfil.etapa('analisis'):
+            if contador_preguntas % 2 != 0:
+                doc.add_page_break()
+            
+            if segmentacion:
+                print("📊 Agregando resultados por segmento...")
+                _agregar_segmentacion(doc, segmentacion, dpi_graficas, compactar_imagenes, cache_imagenes)
+                doc.add_page_break()
+            
+            p_analisis_titulo = doc.add_paragraph()
+            run = p_analisis_titulo.add_run('Análisis de resultados')
+            run.font.name = 'Calibri'
+            run.font.size = Pt(11)
+            run.font.bold = True
+            p_analisis_titulo.paragraph_format.space_before = Pt(12)
+            p_analisis_titulo.paragraph_format.space_after = Pt(6)
+            
+            texto_analisis = generar_analisis_resultados(resultados_todas_preguntas, nombre_uds)
+            
+            p_analisis_texto = doc.add_paragraph()
+            run = p_analisis_texto.add_run(texto_analisis)
+            run.font.name = 'Calibri'
+            run.font.size = Pt(11)
+            p_analisis_texto.paragraph_format.space_after = Pt(12)
+            p_analisis_texto.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
+            
+            # OPORTUNIDADES DE MEJORA
+            print("💡 Generando oportunidades de mejora...")
+            
+            p_oportunidades_titulo = doc.add_paragraph()
+            run = p_oportunidades_titulo.add_run('Posibles oportunidades de mejora')
+            run.font.name = 'Calibri'
+            run.font.size = Pt(11)
+            run.font.bold = True
+            p_oportunidades_titulo.paragraph_format.space_before = Pt(12)
+            p_oportunidades_titulo.paragraph_format.space_after = Pt(6)
+            
+            oportunidades = generar_oportunidades_mejora(resultados_todas_preguntas)
+            
+            for oportunidad in oportunidades:
+                p_oportunidad = doc.add_paragraph()
+                p_oportunidad.paragraph_format.left_indent = Inches(0.25)
+                run = p_oportunidad.add_run(f"·       {oportunidad}")
+                run.font.name = 'Calibri'
+                run.font.size = Pt(11)
+                p_oportunidad.paragraph_format.space_after = Pt(6)
+                p_oportunidad.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
+        
+        # Guardar documento
+        with perfil.etapa('guardado'):
+            doc.save(archivo_salida)
+    except BaseException:
+        # El .docx.tmp a medias no puede esperar a __del__: el traceback
+        # mantiene vivo el escritor y en lote.py quedaría en la carpeta de salida
+        if isinstance(doc, DocumentoIncremental):
+            doc.descartar()
+        raise
+    
+    _notificar(progreso, 'guardado', archivo=os.path.basename(archivo_salida))
     
     print(f"\n✅ Informe generado exitosamente: {archivo_salida}")
     
@@ -466,5 +855,9 @@ def generar_informe_word(archivo_excel, archivo_salida, nombre_uds='', directori
         'archivo_salida': archivo_salida,
         'nombre_uds': nombre_uds,
         'total_respuestas': total_respuestas,
-        'total_preguntas': len(resultados_todas_preguntas)
+        'total_preguntas': len(resultados_todas_preguntas),
+        'periodo': periodo,
+        'preguntas': resumen_preguntas,
+        'segmentacion': segmentacion,
+        'memoria': perfil.reporte()
     }
\ No newline at end of file
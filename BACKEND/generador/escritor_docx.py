@@ -0,0 +1,200 @@
+"""
+Escritor incremental de documentos Word
+Alternativa al guardado de python-docx para informes con muchas preguntas:
+el cuerpo (WordprocessingML) se vuelca a un archivo temporal en disco a
+medida que se procesan las preguntas y cada gráfica se escribe en el .docx
+en cuanto se inserta, así que ni el XML de todas las preguntas ni las
+imágenes se acumulan en memoria hasta el final.
+
+python-docx se sigue usando para el esqueleto (estilos, secciones,
+encabezado y pie) y para construir cada párrafo, de modo que el formato
+es el mismo que con el motor 'docx'.
+"""
+
+import hashlib
+import os
+import tempfile
+import zipfile
+
+from docx.image.image import Image
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.opc.oxml import serialize_part_xml
+from docx.opc.packuri import PackURI, CONTENT_TYPES_URI, PACKAGE_URI
+from docx.opc.part import Part
+from docx.opc.pkgwriter import _ContentTypesItem
+from docx.oxml.ns import qn
+from docx.oxml.shape import CT_Inline
+from lxml import etree
+
+
+MOTORES_DOCUMENTO = ('docx', 'incremental')
+MOTOR_POR_DEFECTO = os.environ.get('DOCUMENTO_MOTOR', 'docx')
+
+# Bytes del cuerpo que se mantienen en memoria antes de pasar a disco
+UMBRAL_CUERPO_MEMORIA = 1024 * 1024
+
+
+class DocumentoIncremental:
+    """
+    Envoltorio de un Document de python-docx que escribe el paquete por partes
+
+    Expone los mismos métodos que Document (add_paragraph, add_page_break,
+    add_table, styles...) delegando en el documento base, más:
+
+        - agregar_imagen(run, img_buffer, ancho): escribe la imagen en el .docx de inmediato
+        - volcar(): pasa a disco los párrafos ya terminados
+        - save(ruta): completa el paquete y lo mueve a su ruta final
+    """
+
+    def __init__(self, documento, archivo_salida):
+        """
+        Args:
+            documento: Document de python-docx con el esqueleto (estilos, encabezado y pie)
+            archivo_salida: Ruta final del .docx
+        """
+        self._doc = documento
+        self._archivo_salida = archivo_salida
+        self._temporal = f'{archivo_salida}.tmp'
+        self._guardado = False
+        self._zip = zipfile.ZipFile(self._temporal, 'w', zipfile.ZIP_DEFLATED)
+        self._cuerpo = tempfile.SpooledTemporaryFile(max_size=UMBRAL_CUERPO_MEMORIA)
+
+        self._parte = documento.part
+        self._paquete = self._parte.package
+        # Imágenes ya escritas en el zip: sha1 -> (rId, Image)
+        self._imagenes = {}
+        self._partes_escritas = set()
+        self._nombres_usados = {str(p.partname) for p in self._paquete.iter_parts()}
+        # python-docx recorre todo el XML para calcular cada id; aquí se lleva un contador
+        self._siguiente_id = self._parte.next_id
+        self._declaraciones_raiz = [
+            f' xmlns:{prefijo}="{uri}"'.encode('utf-8')
+            for prefijo, uri in documento.element.nsmap.items() if prefijo
+        ]
+
+    def __getattr__(self, nombre):
+        # Solo se delegan los atributos públicos de Document
+        if nombre.startswith('_'):
+            raise AttributeError(nombre)
+        return getattr(self._doc, nombre)
+
+    def __del__(self):
+        # Si la generación falló antes de save() no queda un .docx a medias
+        if getattr(self, '_zip', None) is not None and not getattr(self, '_guardado', True):
+            self.descartar()
+
+    def _nombre_imagen(self, extension):
+        n = 1
+        while f'/word/media/image{n}.{extension}' in self._nombres_usados:
+            n += 1
+        nombre = f'/word/media/image{n}.{extension}'
+        self._nombres_usados.add(nombre)
+        return nombre
+
+    def agregar_imagen(self, run, img_buffer, ancho):
+        """
+        Inserta una imagen en el run escribiéndola directamente en el paquete
+
+        Las imágenes idénticas se escriben una sola vez, igual que python-docx.
+
+        Args:
+            run: Run de python-docx donde va la imagen
+            img_buffer: BytesIO con la imagen
+            ancho: Ancho (Length); el alto se escala según la imagen
+        """
+        datos = img_buffer.getvalue()
+        clave = hashlib.sha1(datos).hexdigest()
+
+        if clave in self._imagenes:
+            rId, imagen = self._imagenes[clave]
+        else:
+            imagen = Image.from_blob(datos)
+            nombre = self._nombre_imagen(imagen.ext)
+            self._zip.writestr(nombre[1:], datos)
+            # Parte vacía: solo sirve para la relación y [Content_Types].xml
+            parte = Part(PackURI(nombre), imagen.content_type, b'', self._paquete)
+            self._partes_escritas.add(nombre)
+            rId = self._parte.relate_to(parte, RT.IMAGE)
+            self._imagenes[clave] = (rId, imagen)
+
+        cx, cy = imagen.scaled_dimensions(ancho, None)
+        inline = CT_Inline.new_pic_inline(self._siguiente_id, rId, imagen.filename, cx, cy)
+        self._siguiente_id += 1
+        run._r.add_drawing(inline)
+
+    def volcar(self):
+        """Serializa al archivo temporal los elementos del cuerpo y los quita del DOM"""
+        cuerpo = self._doc.element.body
+        for elemento in list(cuerpo):
+            if elemento.tag == qn('w:sectPr'):
+                continue
+            cuerpo.remove(elemento)
+            fragmento = etree.tostring(elemento, encoding='UTF-8', xml_declaration=False)
+            # Al serializarlo suelto, lxml repite en la primera etiqueta las
+            # declaraciones de espacios de nombres que ya hace <w:document>
+            fin = fragmento.index(b'>')
+            etiqueta = fragmento[:fin]
+            for declaracion in self._declaraciones_raiz:
+                etiqueta = etiqueta.replace(declaracion, b'')
+            self._cuerpo.write(etiqueta + fragmento[fin:])
+
+    def _escribir_documento(self):
+        """Escribe word/document.xml: esqueleto + cuerpo volcado + sectPr final"""
+        xml = serialize_part_xml(self._doc.element)
+        corte = xml.rfind(b'<w:sectPr')
+        if corte == -1:
+            corte = xml.rfind(b'</w:body>')
+
+        with self._zip.open(self._parte.partname.membername, 'w', force_zip64=True) as destino:
+            destino.write(xml[:corte])
+            self._cuerpo.seek(0)
+            while True:
+                bloque = self._cuerpo.read(64 * 1024)
+                if not bloque:
+                    break
+                destino.write(bloque)
+            destino.write(xml[corte:])
+
+    def save(self, archivo_salida=None):
+        """
+        Completa el paquete (.rels, [Content_Types].xml y partes restantes)
+
+        Args:
+            archivo_salida: Debe coincidir con el indicado al crear el documento
+        """
+        if archivo_salida is not None and os.path.abspath(archivo_salida) != os.path.abspath(self._archivo_salida):
+            raise ValueError('El escritor incremental solo puede guardar en la ruta indicada al crearlo')
+
+        self.volcar()
+        partes = list(self._paquete.iter_parts())
+        for parte in partes:
+            parte.before_marshal()
+
+        try:
+            self._zip.writestr(CONTENT_TYPES_URI.membername, _ContentTypesItem.from_parts(partes).blob)
+            self._zip.writestr(PACKAGE_URI.rels_uri.membername, self._paquete.rels.xml)
+            for parte in partes:
+                if parte.partname == self._parte.partname:
+                    self._escribir_documento()
+                elif str(parte.partname) not in self._partes_escritas:
+                    self._zip.writestr(parte.partname.membername, parte.blob)
+                if len(parte.rels):
+                    self._zip.writestr(parte.partname.rels_uri.membername, parte.rels.xml)
+            self._zip.close()
+            os.replace(self._temporal, self._archivo_salida)
+            self._guardado = True
+        except Exception:
+            self.descartar()
+            raise
+        finally:
+            self._cuerpo.close()
+
+    def descartar(self):
+        """Cierra y elimina el paquete a medias (por ejemplo, tras un error)"""
+        self._guardado = True
+        try:
+            self._zip.close()
+        except Exception:
+            pass
+        if os.path.exists(self._temporal):
+            os.remove(self._temporal)
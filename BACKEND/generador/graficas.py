@@ -1,66 +1,433 @@
 """
 Módulo para generación de gráficas circulares
+
+Motores disponibles:
+    - 'matplotlib': Render original con Figure y FigureCanvasAgg (por defecto)
+    - 'pillow': Render ligero con PIL.ImageDraw, sin importar matplotlib
+    - 'mosaico': matplotlib en lote: varias gráficas como subplots de una
+      sola figura (una lámina) que se dibuja una vez y se recorta en teselas
+
+El motor se elige por llamada (parámetro motor) o con la variable de
+entorno GRAFICAS_MOTOR.
 """
 
-import matplotlib
-matplotlib.use('Agg')  # Usar backend sin GUI
-import matplotlib.pyplot as plt
+import math
+import os
 from io import BytesIO
 
 
-def crear_grafica_circular(datos_dict, titulo):
+# Paleta compartida por todos los motores
+COLORES = ['#3b82f6', '#ef4444', '#10b981', '#f59e0b', '#8b5cf6',
+           '#ec4899', '#14b8a6', '#f97316', '#06b6d4', '#84cc16']
+
+# Dimensiones de la gráfica (9.28cm ancho x 5.74cm alto)
+# Convertir cm a pulgadas: 1 cm = 0.393701 pulgadas
+ANCHO_PULGADAS = 9.28 * 0.393701  # ≈ 3.65 pulgadas
+ALTO_PULGADAS = 5.74 * 0.393701   # ≈ 2.26 pulgadas
+DPI = 300
+
+MOTORES_GRAFICAS = ('matplotlib', 'pillow', 'mosaico')
+MOTOR_POR_DEFECTO = os.environ.get('GRAFICAS_MOTOR', 'matplotlib')
+
+# Gráficas por lámina en el motor 'mosaico': a 300 dpi cada celda ocupa ~7 MB
+# del lienzo RGBA y Agg no admite lienzos de más de 2^16 píxeles de alto
+GRAFICAS_POR_LAMINA = int(os.environ.get('GRAFICAS_POR_LAMINA', 8))
+
+# Holgura de cada celda de la lámina, en fracciones del tamaño de la gráfica
+_HOLGURA_LAMINA = {'arriba': 0.5, 'abajo': 0.1, 'lados': 0.25}
+
+# Margen del recorte, igual al pad_inches por defecto de bbox_inches='tight'
+_MARGEN_RECORTE_PULGADAS = 0.1
+
+
+def crear_grafica_circular(datos_dict, titulo, motor=None, dpi=DPI):
     """
     Crea una gráfica circular con el título de la pregunta
     Tamaño: 9.28cm ancho x 5.74cm alto
-    
+
     Args:
         datos_dict: Diccionario con los datos {etiqueta: valor}
         titulo: Título de la gráfica
-        
+        motor: Motor de render ('matplotlib' o 'pillow'); por defecto GRAFICAS_MOTOR
+        dpi: Resolución de la imagen (300 por defecto)
+
     Returns:
         BytesIO: Buffer con la imagen de la gráfica en formato PNG
     """
+    motor = motor or MOTOR_POR_DEFECTO
+
+    if motor == 'pillow':
+        return _crear_grafica_pillow(datos_dict, titulo, dpi)
+    elif motor == 'matplotlib':
+        return _crear_grafica_matplotlib(datos_dict, titulo, dpi)
+    elif motor == 'mosaico':
+        return _crear_lamina_matplotlib([(datos_dict, titulo)], dpi)[0]
+    else:
+        raise ValueError(f"Motor de gráficas no soportado: {motor}. Use uno de {MOTORES_GRAFICAS}")
+
+
+def crear_graficas_circulares(graficas, motor=None, dpi=DPI):
+    """
+    Crea varias gráficas circulares de una vez
+
+    Con el motor 'mosaico' se dibujan por láminas de GRAFICAS_POR_LAMINA, lo
+    que reparte entre todas el costo fijo de cada figura (creación, lienzo,
+    fuentes, savefig). Con los demás motores equivale a llamar a
+    crear_grafica_circular por cada una.
+
+    Args:
+        graficas: Lista de (datos_dict, titulo)
+        motor: Motor de render; por defecto GRAFICAS_MOTOR
+        dpi: Resolución de las imágenes
+
+    Returns:
+        list: Un BytesIO con el PNG de cada gráfica, en el mismo orden
+    """
+    motor = motor or MOTOR_POR_DEFECTO
+
+    if motor != 'mosaico':
+        return [crear_grafica_circular(datos_dict, titulo, motor, dpi) for datos_dict, titulo in graficas]
+
+    buffers = []
+    for inicio in range(0, len(graficas), GRAFICAS_POR_LAMINA):
+        buffers.extend(_crear_lamina_matplotlib(graficas[inicio:inicio + GRAFICAS_POR_LAMINA], dpi))
+    return buffers
+
+
+def _dibujar_circular(ax, datos_dict, titulo):
+    """Dibuja la gráfica circular con su título en los ejes dados"""
     labels = list(datos_dict.keys())
     sizes = list(datos_dict.values())
-    
-    colors = ['#3b82f6', '#ef4444', '#10b981', '#f59e0b', '#8b5cf6', 
-              '#ec4899', '#14b8a6', '#f97316', '#06b6d4', '#84cc16']
-    
-    # Crear figura con dimensiones específicas (9.28cm ancho x 5.74cm alto)
-    # Convertir cm a pulgadas: 1 cm = 0.393701 pulgadas
-    ancho_pulgadas = 9.28 * 0.393701  # ≈ 3.65 pulgadas
-    alto_pulgadas = 5.74 * 0.393701   # ≈ 2.26 pulgadas
-    
-    fig, ax = plt.subplots(figsize=(ancho_pulgadas, alto_pulgadas))
-    
+
     # Título de la gráfica
-    plt.title(titulo, fontsize=10, fontweight='bold', pad=8, wrap=True)
-    
+    ax.set_title(titulo, fontsize=10, fontweight='bold', pad=8, wrap=True)
+
     # Gráfica circular
     wedges, texts, autotexts = ax.pie(
-        sizes, 
-        labels=labels, 
-        colors=colors[:len(labels)],
+        sizes,
+        labels=labels,
+        colors=COLORES[:len(labels)],
         autopct='%1.1f%%',
         startangle=90,
         textprops={'fontsize': 9}
     )
-    
+
     # Formatear textos
     for autotext in autotexts:
         autotext.set_color('white')
         autotext.set_fontweight('bold')
         autotext.set_fontsize(10)
-    
+
     for text in texts:
         text.set_fontsize(8)
-    
+
     ax.axis('equal')
-    
+
+
+def _crear_grafica_matplotlib(datos_dict, titulo, dpi=DPI):
+    """
+    Render con matplotlib (importado solo cuando se usa este motor)
+
+    Usa Figure y FigureCanvasAgg directamente en lugar de pyplot, cuyo
+    estado global (figura actual) se mezcla entre hilos concurrentes.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=(ANCHO_PULGADAS, ALTO_PULGADAS))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+
+    _dibujar_circular(ax, datos_dict, titulo)
+
     # Guardar en buffer
     img_buffer = BytesIO()
-    plt.savefig(img_buffer, format='png', dpi=300, bbox_inches='tight')
-    plt.close()
+    fig.savefig(img_buffer, format='png', dpi=dpi, bbox_inches='tight')
     img_buffer.seek(0)
-    
-    return img_buffer
\ No newline at end of file
+
+    return img_buffer
+
+
+def _crear_lamina_matplotlib(graficas, dpi=DPI):
+    """
+    Render en lote: una figura (lámina) con una subfigura de 9.28x5.74 cm por gráfica
+
+    Cada subfigura reproduce la figura individual: add_subplot() usa los mismos
+    márgenes y el ajuste de línea del título se mide contra la subfigura. Las
+    celdas se apilan en una columna con holgura alrededor (títulos largos,
+    etiquetas que sobresalen), todo en píxeles enteros para que cada celda
+    tenga la misma fase de antialiasing. La lámina se dibuja una vez y cada
+    tesela se recorta con la caja ajustada de sus ejes más 0.1 pulgadas, como
+    bbox_inches='tight'. Si una gráfica no cabe en su celda con holgura se
+    dibuja aparte con el motor matplotlib.
+
+    Returns:
+        list: Un BytesIO con el PNG de cada gráfica
+    """
+    import numpy as np
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from PIL import Image
+
+    n = len(graficas)
+    ancho = ANCHO_PULGADAS * dpi
+    alto = ALTO_PULGADAS * dpi
+    margen_x = math.ceil(_HOLGURA_LAMINA['lados'] * ancho)
+    margen_abajo = math.ceil(_HOLGURA_LAMINA['abajo'] * alto)
+    paso = math.ceil((1 + _HOLGURA_LAMINA['arriba'] + _HOLGURA_LAMINA['abajo']) * alto)
+    ancho_lamina = math.ceil(ancho + 2 * margen_x)
+
+    fig = Figure(figsize=(ancho_lamina / dpi, n * paso / dpi), dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    rejilla = fig.add_gridspec(
+        3 * n, 3,
+        width_ratios=[margen_x, ancho, ancho_lamina - ancho - margen_x],
+        height_ratios=[paso - alto - margen_abajo, alto, margen_abajo] * n,
+        left=0, right=1, bottom=0, top=1, wspace=0, hspace=0
+    )
+
+    ejes = []
+    for i, (datos_dict, titulo) in enumerate(graficas):
+        ax = fig.add_subfigure(rejilla[3 * i + 1, 1]).add_subplot()
+        _dibujar_circular(ax, datos_dict, titulo)
+        ejes.append(ax)
+
+    canvas.draw()
+    renderer = canvas.get_renderer()
+    lienzo = np.asarray(canvas.buffer_rgba())
+    alto_lienzo = lienzo.shape[0]
+    margen = _MARGEN_RECORTE_PULGADAS * dpi
+
+    buffers = []
+    for i, ax in enumerate(ejes):
+        caja = ax.get_tightbbox(renderer)
+        # Mismo tamaño que savefig: el lienzo trunca el ancho y el alto de la
+        # caja y se ancla en su esquina inferior izquierda. Coordenadas de
+        # pantalla con origen abajo; las filas del lienzo, arriba
+        x0 = int(round(caja.x0 - margen))
+        x1 = x0 + int(caja.width + 2 * margen)
+        y1 = alto_lienzo - int(round(caja.y0 - margen))
+        y0 = y1 - int(caja.height + 2 * margen)
+
+        if x0 < 0 or x1 > ancho_lamina or y0 < i * paso or y1 > (i + 1) * paso:
+            # Se sale de su celda: recortarla incluiría a la vecina o quedaría cortada
+            buffers.append(_crear_grafica_matplotlib(*graficas[i], dpi=dpi))
+            continue
+
+        img_buffer = BytesIO()
+        # Fondo blanco opaco: sin canal alfa. Compresión rápida: compactar_png
+        # vuelve a comprimir la imagen
+        tesela = np.ascontiguousarray(lienzo[y0:y1, x0:x1, :3])
+        Image.fromarray(tesela).save(img_buffer, format='PNG', dpi=(dpi, dpi), compress_level=1)
+        img_buffer.seek(0)
+        buffers.append(img_buffer)
+
+    return buffers
+
+
+def crear_grafica_tendencia(puntos, titulo, dpi=DPI):
+    """
+    Crea una gráfica de línea con el porcentaje favorable por periodo
+
+    Solo tiene render con matplotlib (es una gráfica por informe).
+
+    Args:
+        puntos: Lista de (etiqueta del periodo, porcentaje)
+        titulo: Título de la gráfica
+        dpi: Resolución de la imagen (300 por defecto)
+
+    Returns:
+        BytesIO: Buffer con la imagen de la gráfica en formato PNG
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    etiquetas = [etiqueta for etiqueta, _ in puntos]
+    valores = [valor for _, valor in puntos]
+
+    fig = Figure(figsize=(ANCHO_PULGADAS * 1.6, ALTO_PULGADAS))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+
+    ax.set_title(titulo, fontsize=10, fontweight='bold', pad=8, wrap=True)
+    ax.plot(range(len(valores)), valores, color=COLORES[0], marker='o', linewidth=2, markersize=4)
+    for x, valor in enumerate(valores):
+        ax.annotate(f'{valor:.1f}%', (x, valor), textcoords='offset points', xytext=(0, 6),
+                    ha='center', fontsize=7)
+
+    ax.set_ylim(0, 105)
+    ax.set_ylabel('% favorable', fontsize=8)
+    ax.set_xticks(range(len(etiquetas)))
+    ax.set_xticklabels(etiquetas, fontsize=7, rotation=45 if len(etiquetas) > 6 else 0,
+                       ha='right' if len(etiquetas) > 6 else 'center')
+    ax.tick_params(axis='y', labelsize=7)
+    ax.grid(axis='y', alpha=0.3)
+    for lado in ('top', 'right'):
+        ax.spines[lado].set_visible(False)
+
+    img_buffer = BytesIO()
+    fig.savefig(img_buffer, format='png', dpi=dpi, bbox_inches='tight')
+    img_buffer.seek(0)
+
+    return img_buffer
+
+
+# ----------------------------------------------------------------------
+# Motor Pillow
+# ----------------------------------------------------------------------
+
+# Factor de sobremuestreo para suavizar bordes (PIL no aplica antialiasing a pieslice)
+_SOBREMUESTREO = 2
+
+# Rutas habituales de DejaVu Sans (la fuente por defecto de matplotlib)
+_RUTAS_FUENTES = {
+    False: ['DejaVuSans.ttf', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+            '/usr/share/fonts/dejavu/DejaVuSans.ttf'],
+    True: ['DejaVuSans-Bold.ttf', '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',
+           '/usr/share/fonts/dejavu/DejaVuSans-Bold.ttf'],
+}
+
+_cache_fuentes = {}
+
+
+def _fuente(puntos, negrita=False, dpi=DPI):
+    """
+    Carga (y cachea) una fuente TrueType del tamaño indicado en puntos
+
+    Returns:
+        ImageFont: Fuente escalada al DPI y sobremuestreo del lienzo
+    """
+    from PIL import ImageFont
+
+    clave = (puntos, negrita, dpi)
+    if clave not in _cache_fuentes:
+        pixeles = int(round(puntos * dpi / 72 * _SOBREMUESTREO))
+        fuente = None
+        for ruta in _RUTAS_FUENTES[negrita]:
+            try:
+                fuente = ImageFont.truetype(ruta, pixeles)
+                break
+            except OSError:
+                continue
+        if fuente is None:
+            fuente = ImageFont.load_default(size=pixeles)
+        _cache_fuentes[clave] = fuente
+    return _cache_fuentes[clave]
+
+
+def _envolver_texto(draw, texto, fuente, ancho_max):
+    """Divide el texto en líneas que no superen ancho_max píxeles"""
+    lineas = []
+    actual = ''
+    for palabra in texto.split():
+        candidata = f"{actual} {palabra}".strip()
+        if actual and draw.textlength(candidata, font=fuente) > ancho_max:
+            lineas.append(actual)
+            actual = palabra
+        else:
+            actual = candidata
+    if actual:
+        lineas.append(actual)
+    return lineas or ['']
+
+
+def _crear_grafica_pillow(datos_dict, titulo, dpi=DPI):
+    """
+    Render directo con PIL.ImageDraw
+
+    Reproduce la disposición de matplotlib: título en negrita centrado,
+    sectores en sentido antihorario desde las 12 en punto, etiquetas a 1.1
+    radios y porcentajes blancos en negrita a 0.6 radios.
+    """
+    from PIL import Image, ImageDraw
+
+    ancho = int(round(ANCHO_PULGADAS * dpi)) * _SOBREMUESTREO
+    alto = int(round(ALTO_PULGADAS * dpi)) * _SOBREMUESTREO
+    puntos_a_px = dpi / 72 * _SOBREMUESTREO
+
+    img = Image.new('RGB', (ancho, alto), 'white')
+    draw = ImageDraw.Draw(img)
+
+    fuente_titulo = _fuente(10, negrita=True, dpi=dpi)
+    fuente_etiqueta = _fuente(8, dpi=dpi)
+    fuente_porcentaje = _fuente(10, negrita=True, dpi=dpi)
+
+    # Título
+    margen = int(4 * puntos_a_px)
+    lineas = _envolver_texto(draw, str(titulo), fuente_titulo, ancho - 2 * margen)
+    alto_linea = int(fuente_titulo.size * 1.2)
+    y = margen
+    cajas = []  # Cajas de todo lo dibujado, para el recorte final
+    for linea in lineas:
+        draw.text((ancho / 2, y), linea, font=fuente_titulo, fill='black', anchor='ma')
+        cajas.append(draw.textbbox((ancho / 2, y), linea, font=fuente_titulo, anchor='ma'))
+        y += alto_linea
+    y += int(8 * puntos_a_px)  # pad=8 del título original
+
+    # Área de la gráfica: el radio deja espacio a las etiquetas (1.1 radios + una línea)
+    alto_area = alto - y - margen
+    radio = max(1, int((alto_area / 2 - fuente_etiqueta.size) / 1.1))
+    cx = ancho / 2
+    cy = y + alto_area / 2
+    caja = [cx - radio, cy - radio, cx + radio, cy + radio]
+    cajas.append(caja)
+
+    labels = list(datos_dict.keys())
+    sizes = [float(v) for v in datos_dict.values()]
+    total = sum(sizes) or 1.0
+
+    angulo = 90.0
+    textos = []
+    for i, (label, size) in enumerate(zip(labels, sizes)):
+        fraccion = size / total
+        barrido = 360.0 * fraccion
+        inicio, fin = angulo, angulo + barrido
+        color = COLORES[i % len(COLORES)]
+
+        # PIL mide ángulos en sentido horario desde las 3 en punto
+        if barrido >= 360.0:
+            draw.ellipse(caja, fill=color)
+        elif barrido > 0:
+            draw.pieslice(caja, -fin, -inicio, fill=color)
+
+        medio = math.radians((inicio + fin) / 2)
+        textos.append((label, fraccion, medio))
+        angulo = fin
+
+    for label, fraccion, medio in textos:
+        cos_m, sin_m = math.cos(medio), -math.sin(medio)
+
+        # Etiqueta exterior alineada según el lado del círculo
+        ex, ey = cx + 1.1 * radio * cos_m, cy + 1.1 * radio * sin_m
+        anchor = 'lm' if cos_m >= 0 else 'rm'
+        draw.text((ex, ey), str(label), font=fuente_etiqueta, fill='black', anchor=anchor)
+        cajas.append(draw.textbbox((ex, ey), str(label), font=fuente_etiqueta, anchor=anchor))
+
+        # Porcentaje interior
+        px, py = cx + 0.6 * radio * cos_m, cy + 0.6 * radio * sin_m
+        draw.text((px, py), f"{fraccion * 100:.1f}%", font=fuente_porcentaje, fill='white', anchor='mm')
+
+    # En matplotlib el recorte incluye el ancho de los ejes (subplot por defecto
+    # de 0.125 a 0.9 del ancho de la figura) aunque la torta sea más angosta
+    cajas.append([0.125 * ancho, cy, 0.9 * ancho, cy])
+
+    # Recorte equivalente a bbox_inches='tight' (margen de 0.1 pulgadas)
+    pad = int(0.1 * dpi * _SOBREMUESTREO)
+    recorte = [
+        max(0, int(min(c[0] for c in cajas)) - pad),
+        max(0, int(min(c[1] for c in cajas)) - pad),
+        min(ancho, int(max(c[2] for c in cajas)) + pad),
+        min(alto, int(max(c[3] for c in cajas)) + pad),
+    ]
+    # Dimensiones múltiplo del sobremuestreo para que reduce() sea exacto
+    recorte[2] -= (recorte[2] - recorte[0]) % _SOBREMUESTREO
+    recorte[3] -= (recorte[3] - recorte[1]) % _SOBREMUESTREO
+    img = img.crop(recorte)
+
+    img = img.reduce(_SOBREMUESTREO)
+
+    img_buffer = BytesIO()
+    img.save(img_buffer, format='PNG', dpi=(dpi, dpi), compress_level=1)
+    img_buffer.seek(0)
+
+    return img_buffer
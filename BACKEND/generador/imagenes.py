@@ -0,0 +1,69 @@
+"""
+Post-proceso de imágenes antes de insertarlas en el documento
+Las gráficas usan pocos colores planos, así que se cuantizan a una paleta
+indexada, se eliminan los metadatos y se comprimen con el máximo esfuerzo
+"""
+
+import hashlib
+import os
+from io import BytesIO
+
+
+# Colores de la paleta indexada: los 10 de la gráfica más los intermedios del antialiasing
+COLORES_PALETA = int(os.environ.get('IMAGENES_COLORES_PALETA', 64))
+COMPACTAR_POR_DEFECTO = os.environ.get('IMAGENES_COMPACTAR', '1') == '1'
+
+
+def compactar_png(img_buffer, colores=COLORES_PALETA, cache=None):
+    """
+    Cuantiza un PNG a paleta indexada, sin metadatos y con compresión máxima
+
+    Los PNG resultantes son deterministas: dos gráficas con los mismos
+    píxeles producen los mismos bytes, y python-docx guarda una sola parte
+    de imagen por contenido (hash SHA-1), así que se deduplican en el .docx.
+
+    Args:
+        img_buffer: BytesIO (u objeto tipo archivo) con la imagen PNG
+        colores: Número máximo de colores de la paleta
+        cache: Diccionario opcional {hash: bytes} para no recomprimir
+            imágenes idénticas dentro del mismo informe
+
+    Returns:
+        BytesIO: Buffer con el PNG compactado
+    """
+    from PIL import Image
+
+    datos = img_buffer.getvalue() if hasattr(img_buffer, 'getvalue') else img_buffer.read()
+    clave = hashlib.sha1(datos).hexdigest()
+
+    if cache is not None and clave in cache:
+        return BytesIO(cache[clave])
+
+    img = Image.open(BytesIO(datos))
+    dpi = img.info.get('dpi')
+
+    # Las gráficas tienen fondo blanco opaco: el canal alfa no aporta nada
+    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+        fondo = Image.new('RGB', img.size, 'white')
+        fondo.paste(img, mask=img.convert('RGBA').split()[-1])
+        img = fondo
+    elif img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    img = img.quantize(colors=colores, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+
+    salida = BytesIO()
+    opciones = {'optimize': True}
+    if dpi:
+        # Solo se conserva pHYs (resolución); Software y demás metadatos se descartan
+        opciones['dpi'] = tuple(round(d) for d in dpi)
+    img.save(salida, format='PNG', **opciones)
+
+    compactado = salida.getvalue()
+    if len(compactado) >= len(datos):
+        compactado = datos
+
+    if cache is not None:
+        cache[clave] = compactado
+
+    return BytesIO(compactado)
@@ -0,0 +1,136 @@
+"""
+Lectura de hojas de cálculo con motores intercambiables
+
+Motores:
+    - 'calamine': Lector nativo (Rust) vía python-calamine, si está instalado; lee .xlsx y .xls
+    - 'openpyxl': Lector de pandas en modo solo lectura (streaming) para .xlsx
+    - 'xlrd': Lector de pandas para el formato binario .xls
+
+El motor se elige con el parámetro motor o la variable de entorno EXCEL_MOTOR
+('auto' por defecto). En modo automático se prueba la cadena de respaldo de
+la extensión del archivo hasta que un motor disponible lo lea.
+"""
+
+import datetime
+import importlib.util
+import os
+
+import pandas as pd
+
+
+MOTORES_LECTURA = ('calamine', 'openpyxl', 'xlrd')
+MOTOR_POR_DEFECTO = os.environ.get('EXCEL_MOTOR', 'auto')
+
+# Cadena de respaldo por extensión (del más rápido al más compatible)
+CADENAS_RESPALDO = {
+    '.xlsx': ('calamine', 'openpyxl'),
+    '.xlsm': ('calamine', 'openpyxl'),
+    '.xls': ('calamine', 'xlrd'),
+}
+
+_MODULOS = {
+    'calamine': 'python_calamine',
+    'openpyxl': 'openpyxl',
+    'xlrd': 'xlrd',
+}
+
+
+def motor_disponible(motor):
+    """Indica si el paquete del motor está instalado"""
+    return importlib.util.find_spec(_MODULOS[motor]) is not None
+
+
+def motores_disponibles():
+    """
+    Returns:
+        list: Motores de lectura instalados en este entorno
+    """
+    return [m for m in MOTORES_LECTURA if motor_disponible(m)]
+
+
+def _leer_calamine(archivo, filas=None):
+    """
+    Lee la primera hoja con python-calamine
+
+    Las filas pasan por el TextParser de pandas (el mismo que usa
+    pd.read_excel) para que los tipos inferidos coincidan con openpyxl.
+    """
+    from python_calamine import CalamineWorkbook
+    from pandas.io.parsers import TextParser
+
+    def convertir(valor):
+        if valor == '':
+            return None
+        if isinstance(valor, float) and valor.is_integer():
+            return int(valor)
+        if isinstance(valor, datetime.date) and not isinstance(valor, datetime.datetime):
+            return datetime.datetime.combine(valor, datetime.time())
+        return valor
+
+    libro = CalamineWorkbook.from_path(archivo)
+    # nrows cuenta también la fila del encabezado
+    hoja = libro.get_sheet_by_index(0).to_python(skip_empty_area=True,
+                                                 nrows=None if filas is None else filas + 1)
+    hoja = [[convertir(v) for v in fila] for fila in hoja]
+    if not hoja:
+        return pd.DataFrame()
+    return TextParser(hoja, header=0).read()
+
+
+def _leer_pandas(archivo, motor, filas=None):
+    return pd.read_excel(archivo, engine=motor, nrows=filas)
+
+
+def leer_excel(archivo, motor=None, filas=None):
+    """
+    Lee la primera hoja de un libro de Excel a un DataFrame
+
+    Args:
+        archivo: Ruta del archivo .xlsx o .xls
+        motor: 'auto', 'calamine', 'openpyxl' o 'xlrd' (por defecto EXCEL_MOTOR)
+        filas: Número máximo de filas de datos a leer (por defecto todas)
+
+    Returns:
+        DataFrame: Datos de la hoja
+
+    Raises:
+        ValueError: Si el motor no existe o no hay ningún motor disponible para el formato
+    """
+    motor = motor or MOTOR_POR_DEFECTO
+    extension = os.path.splitext(str(archivo))[1].lower()
+
+    if motor == 'auto':
+        candidatos = [m for m in CADENAS_RESPALDO.get(extension, ('calamine', 'openpyxl'))
+                      if motor_disponible(m)]
+        if not candidatos:
+            raise ValueError(f"No hay ningún motor instalado para leer archivos {extension}")
+    elif motor in MOTORES_LECTURA:
+        candidatos = [motor]
+    else:
+        raise ValueError(f"Motor de lectura no soportado: {motor}. Use 'auto' o uno de {MOTORES_LECTURA}")
+
+    ultimo_error = None
+    for candidato in candidatos:
+        try:
+            if candidato == 'calamine':
+                return _leer_calamine(archivo, filas)
+            return _leer_pandas(archivo, candidato, filas)
+        except Exception as e:
+            ultimo_error = e
+            if candidato != candidatos[-1]:
+                print(f"  ⚠️  Motor {candidato} falló ({e}), probando el siguiente")
+
+    raise ultimo_error
+
+
+def leer_encabezado(archivo, motor=None):
+    """
+    Nombres de columna de la primera hoja, sin leer las respuestas
+
+    Los nombres pasan por el mismo parser que leer_excel, así que coinciden
+    con las columnas del DataFrame completo (incluidos los duplicados '.1').
+
+    Returns:
+        list: Columnas en el orden del libro
+    """
+    return list(leer_excel(archivo, motor=motor, filas=0).columns)
@@ -0,0 +1,240 @@
+"""
+Perfiles de marca: identidad de cada asociación que usa el generador
+Cada perfil define los textos del encabezado y pie, las imágenes, el nombre
+de la asociación, el correo de la encuesta y, opcionalmente, los textos de
+introducción y metodología. Se guardan como configuración en
+
+    perfiles_marca/<id>/perfil.json
+    perfiles_marca/<id>/encabezado.png|jpg   (opcional)
+    perfiles_marca/<id>/pie.png|jpg          (opcional)
+
+El perfil 'predeterminado' es la identidad de siempre (utils.py e imagenes/).
+Las imágenes normalizadas a PNG y la plantilla base de cada perfil se cargan
+una vez por proceso y se conservan en memoria.
+"""
+
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+from io import BytesIO
+
+from .artefactos import DIRECTORIO_BASE, EXTENSIONES_IMAGEN, imagen_estatica, plantilla_base
+from .utils import (
+    ASOCIACION,
+    CORREO_ENCUESTA,
+    ENCABEZADO,
+    PIE_PAGINA,
+    TEXTO_INTRODUCCION,
+    TEXTO_METODOLOGIA
+)
+
+
+DIRECTORIO_PERFILES = os.environ.get('PERFILES_MARCA_DIR', os.path.join(DIRECTORIO_BASE, 'perfiles_marca'))
+PERFIL_PREDETERMINADO = 'predeterminado'
+PERFIL_POR_DEFECTO = os.environ.get('PERFIL_MARCA', PERFIL_PREDETERMINADO)
+
+PATRON_PERFIL = re.compile(r'^[a-z0-9_-]{1,64}$')
+LINEAS = ('linea1', 'linea2', 'linea3')
+
+
+def perfiles_disponibles():
+    """
+    Returns:
+        list: Identificadores de perfil ('predeterminado' primero)
+    """
+    perfiles = [PERFIL_PREDETERMINADO]
+    if os.path.isdir(DIRECTORIO_PERFILES):
+        for nombre in sorted(os.listdir(DIRECTORIO_PERFILES)):
+            if (nombre != PERFIL_PREDETERMINADO and PATRON_PERFIL.match(nombre)
+                    and os.path.exists(os.path.join(DIRECTORIO_PERFILES, nombre, 'perfil.json'))):
+                perfiles.append(nombre)
+    return perfiles
+
+
+def _normalizar_imagen(archivo):
+    """Bytes PNG de la imagen (los PNG se conservan tal cual, igual que convertir_a_png)"""
+    from PIL import Image
+
+    with open(archivo, 'rb') as f:
+        datos = f.read()
+    with Image.open(BytesIO(datos)) as img:
+        if img.format == 'PNG':
+            return datos
+        salida = BytesIO()
+        img.convert('RGB').save(salida, 'PNG')
+        return salida.getvalue()
+
+
+def _lineas(valor, campo, perfil_id):
+    if not isinstance(valor, dict) or any(not isinstance(valor.get(l), str) or not valor.get(l) for l in LINEAS):
+        raise ValueError(f"Perfil de marca '{perfil_id}': '{campo}' debe tener {', '.join(LINEAS)}")
+    return {l: valor[l] for l in LINEAS}
+
+
+def _perfil_predeterminado():
+    return {
+        'id': PERFIL_PREDETERMINADO,
+        'nombre': ENCABEZADO['linea1'].title(),
+        'asociacion': ASOCIACION,
+        'correo': CORREO_ENCUESTA,
+        'encabezado': ENCABEZADO,
+        'pie_pagina': PIE_PAGINA,
+        'texto_introduccion': TEXTO_INTRODUCCION,
+        'texto_metodologia': TEXTO_METODOLOGIA,
+        # Rutas: se insertan igual que antes de existir los perfiles
+        'imagenes': {nombre: imagen_estatica(nombre) for nombre in ('encabezado', 'pie')}
+    }
+
+
+def _leer_perfil(perfil_id):
+    directorio = os.path.join(DIRECTORIO_PERFILES, perfil_id)
+    try:
+        with open(os.path.join(directorio, 'perfil.json'), 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Perfil de marca '{perfil_id}' ilegible: {e}")
+
+    if not isinstance(config.get('asociacion'), str) or not config['asociacion']:
+        raise ValueError(f"Perfil de marca '{perfil_id}': falta 'asociacion'")
+
+    imagenes = {}
+    for nombre in ('encabezado', 'pie'):
+        imagenes[nombre] = None
+        for ext in EXTENSIONES_IMAGEN:
+            archivo = os.path.join(directorio, f'{nombre}{ext}')
+            if os.path.exists(archivo):
+                imagenes[nombre] = _normalizar_imagen(archivo)
+                break
+
+    perfil = {
+        'id': perfil_id,
+        'nombre': config.get('nombre') or config['asociacion'].title(),
+        'asociacion': config['asociacion'],
+        'correo': config.get('correo', ''),
+        'encabezado': _lineas(config.get('encabezado'), 'encabezado', perfil_id),
+        'pie_pagina': _lineas(config.get('pie_pagina'), 'pie_pagina', perfil_id),
+        'texto_introduccion': config.get('texto_introduccion') or TEXTO_INTRODUCCION,
+        'texto_metodologia': config.get('texto_metodologia') or TEXTO_METODOLOGIA,
+        # Bytes PNG ya normalizados
+        'imagenes': imagenes
+    }
+
+    # Detectar campos mal escritos en los textos antes de la primera petición
+    for campo in ('texto_introduccion', 'texto_metodologia'):
+        try:
+            textos_perfil(perfil, campo, nombre_uds='', total_respuestas=0)
+        except (KeyError, IndexError, ValueError) as e:
+            raise ValueError(f"Perfil de marca '{perfil_id}': campo desconocido en {campo}: {e}")
+    return perfil
+
+
+def cargar_perfil(perfil_id=None):
+    """
+    Perfil de marca con sus imágenes ya normalizadas (se carga una vez por proceso)
+
+    Args:
+        perfil_id: Identificador del perfil; por defecto PERFIL_MARCA o 'predeterminado'
+
+    Returns:
+        dict: id, nombre, asociacion, correo, encabezado, pie_pagina,
+            texto_introduccion, texto_metodologia e imagenes {'encabezado', 'pie'}
+
+    Raises:
+        ValueError: Si el perfil no existe o su configuración no es válida
+    """
+    return _cargar_perfil(perfil_id or PERFIL_POR_DEFECTO)
+
+
+@lru_cache(maxsize=None)
+def _cargar_perfil(perfil_id):
+    if perfil_id not in perfiles_disponibles():
+        raise ValueError(f"Perfil de marca no encontrado: {perfil_id}. Disponibles: {', '.join(perfiles_disponibles())}")
+    if perfil_id == PERFIL_PREDETERMINADO:
+        return _perfil_predeterminado()
+    return _leer_perfil(perfil_id)
+
+
+def fuente_imagen(perfil, nombre):
+    """Imagen 'encabezado' o 'pie' del perfil para add_picture (ruta o BytesIO), o None"""
+    imagen = perfil['imagenes'].get(nombre)
+    if isinstance(imagen, bytes):
+        return BytesIO(imagen)
+    return imagen
+
+
+def textos_perfil(perfil, campo, nombre_uds, total_respuestas):
+    """Texto de introducción o metodología del perfil con los datos del informe"""
+    return perfil[campo].format(
+        asociacion=perfil['asociacion'],
+        correo=perfil['correo'],
+        nombre_uds=nombre_uds,
+        nombre_uds_mayusculas=nombre_uds.upper(),
+        nombre_uds_titulo=nombre_uds.title(),
+        total_respuestas=total_respuestas
+    )
+
+
+def plantilla_perfil(perfil_id=None):
+    """
+    Plantilla base del perfil (márgenes, encabezado y pie) como bytes .docx
+
+    El perfil predeterminado reutiliza la plantilla de artefactos/ si es
+    válida; los demás se construyen en memoria la primera vez.
+    """
+    return _plantilla_perfil(perfil_id or PERFIL_POR_DEFECTO)
+
+
+@lru_cache(maxsize=None)
+def _plantilla_perfil(perfil_id):
+    perfil = cargar_perfil(perfil_id)
+    if perfil['id'] == PERFIL_PREDETERMINADO:
+        archivo = plantilla_base()
+        if archivo:
+            with open(archivo, 'rb') as f:
+                return f.read()
+
+    import tempfile
+    from docx import Document
+    from .documento import _agregar_encabezado_pie
+
+    doc = Document()
+    with tempfile.TemporaryDirectory() as vacio:
+        # Directorio de trabajo vacío: solo imágenes del perfil
+        _agregar_encabezado_pie(doc, vacio, perfil)
+    salida = BytesIO()
+    doc.save(salida)
+    return salida.getvalue()
+
+
+def huella_perfil(perfil_id=None):
+    """Hash de la configuración e imágenes del perfil (para detectar informes obsoletos)"""
+    perfil = cargar_perfil(perfil_id)
+    hasher = hashlib.sha256()
+    datos = {k: v for k, v in perfil.items() if k != 'imagenes'}
+    hasher.update(json.dumps(datos, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    for nombre in ('encabezado', 'pie'):
+        imagen = perfil['imagenes'].get(nombre)
+        if isinstance(imagen, str):
+            with open(imagen, 'rb') as f:
+                imagen = f.read()
+        hasher.update(nombre.encode('utf-8') + b'\0' + (imagen or b''))
+    return hasher.hexdigest()
+
+
+def precargar_perfiles():
+    """
+    Carga todos los perfiles y sus plantillas (por ejemplo, en el proceso maestro antes del fork)
+
+    Returns:
+        list: Perfiles cargados; los inválidos se informan y se omiten
+    """
+    cargados = []
+    for perfil_id in perfiles_disponibles():
+        try:
+            plantilla_perfil(perfil_id)
+            cargados.append(perfil_id)
+        except ValueError as e:
+            print(f"⚠️  {e}")
+    return cargados
@@ -0,0 +1,196 @@
+"""
+Instrumentación de memoria del pipeline de generación
+Registra por etapa el pico de asignaciones trazadas (tracemalloc) y el RSS
+antes y después, y permite fijar un presupuesto de memoria del proceso
+
+tracemalloc es global del proceso: sus picos incluyen lo que asignen otros
+hilos, y reset_peak()/stop() de una petición afectarían a otra. Por eso solo
+una generación a la vez por proceso puede tener el perfil activo.
+"""
+
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+# Un perfil activo a la vez por proceso
+_bloqueo_perfil = threading.Lock()
+
+
+class ErrorPerfilMemoria(Exception):
+    """Ya hay una generación con perfil de memoria en curso en el proceso"""
+
+    def __init__(self, mensaje, codigo=409):
+        super().__init__(mensaje)
+        self.codigo = codigo
+
+
+def _rss_proc():
+    """RSS actual según /proc (solo Linux), o None"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def rss_actual():
+    """
+    RSS actual del proceso en bytes
+
+    Sin /proc se usa ru_maxrss, que es el pico del proceso y nunca baja:
+    sirve para el reporte, no para el presupuesto.
+
+    Returns:
+        int: Bytes residentes, o None si no se puede determinar
+    """
+    rss = _rss_proc()
+    if rss is not None:
+        return rss
+    try:
+        import resource
+        import sys
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # En macOS ru_maxrss está en bytes, en Linux en KiB
+        return maxrss if sys.platform == 'darwin' else maxrss * 1024
+    except (ImportError, OSError):
+        return None
+
+
+class PerfilMemoria:
+    """
+    Perfil de memoria por etapas
+
+    Con activo=False las etapas no hacen nada (coste nulo); con activo=True
+    se arranca tracemalloc y cada etapa guarda su pico y el RSS.
+    El presupuesto funciona en ambos modos porque solo consulta el RSS.
+
+    El presupuesto es del proceso, no de la petición: mide cuánto creció el
+    RSS del worker desde que empezó esta generación, incluidas las
+    asignaciones de otras peticiones que corran a la vez en sus hilos. Con
+    varias generaciones concurrentes todas se degradan juntas, que es lo
+    que se busca para que el worker no agote la memoria.
+
+    Un perfil activo reserva tracemalloc para su generación hasta cerrar()
+    (reporte() también lo cierra). Los picos son del proceso entero: incluyen
+    las asignaciones de otras peticiones sin perfil que corran a la vez.
+    """
+
+    def __init__(self, activo=False, presupuesto_mb=None, top_sitios=10):
+        """
+        Args:
+            activo: Si True, registra asignaciones con tracemalloc
+            presupuesto_mb: Crecimiento máximo del RSS del proceso en MB durante la generación (opcional)
+            top_sitios: Número de sitios de asignación a reportar
+
+        Raises:
+            ErrorPerfilMemoria: Si activo y otra generación del proceso ya tiene el perfil (409)
+        """
+        self.activo = activo
+        self.presupuesto = presupuesto_mb * 1024 * 1024 if presupuesto_mb else None
+        self.top_sitios = top_sitios
+        self.etapas = []
+        self.degradaciones = []
+        self._rss_inicial = rss_actual()
+        # El presupuesto necesita el RSS actual: sin /proc queda desactivado
+        self._rss_presupuesto = _rss_proc() if self.presupuesto else None
+        self._iniciado_aqui = False
+        self._reservado = False
+
+        if self.activo:
+            if not _bloqueo_perfil.acquire(blocking=False):
+                raise ErrorPerfilMemoria(
+                    'Ya hay una generación con perfil de memoria en curso en este proceso, reintente más tarde')
+            self._reservado = True
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._iniciado_aqui = True
+
+    def cerrar(self):
+        """Detiene tracemalloc (si lo arrancó este perfil) y libera la reserva; es idempotente"""
+        if self._iniciado_aqui:
+            tracemalloc.stop()
+            self._iniciado_aqui = False
+        if self._reservado:
+            self._reservado = False
+            _bloqueo_perfil.release()
+
+    @contextmanager
+    def etapa(self, nombre):
+        """Mide una etapa del pipeline"""
+        if not self.activo:
+            yield
+            return
+
+        tracemalloc.reset_peak()
+        rss_antes = rss_actual()
+        actual_antes, _ = tracemalloc.get_traced_memory()
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            actual_despues, pico = tracemalloc.get_traced_memory()
+            self.etapas.append({
+                'etapa': nombre,
+                'segundos': round(time.perf_counter() - inicio, 4),
+                'pico_trazado_bytes': pico,
+                'delta_trazado_bytes': actual_despues - actual_antes,
+                'rss_antes_bytes': rss_antes,
+                'rss_despues_bytes': rss_actual()
+            })
+
+    def proceso_excede_presupuesto(self, fraccion=1.0):
+        """
+        Indica si el RSS del proceso creció más que el presupuesto desde el inicio
+
+        Es una medida del worker entero (ver la clase); devuelve False si el
+        sistema no expone el RSS actual.
+
+        Args:
+            fraccion: Fracción del presupuesto a comparar (ej: 0.8 para avisar antes)
+        """
+        if not self.presupuesto or self._rss_presupuesto is None:
+            return False
+        rss = _rss_proc()
+        return rss is not None and (rss - self._rss_presupuesto) > self.presupuesto * fraccion
+
+    def registrar_degradacion(self, descripcion):
+        """Anota una medida tomada para mantenerse dentro del presupuesto"""
+        print(f"  ⚠️  Presupuesto de memoria: {descripcion}")
+        self.degradaciones.append(descripcion)
+
+    def reporte(self):
+        """
+        Cierra el perfil y devuelve el reporte
+
+        Returns:
+            dict: Etapas, sitios con más memoria asignada y degradaciones aplicadas
+        """
+        sitios = []
+        if self._reservado and tracemalloc.is_tracing():
+            instantanea = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+            ))
+            for estadistica in instantanea.statistics('lineno')[:self.top_sitios]:
+                marco = estadistica.traceback[0]
+                sitios.append({
+                    'sitio': f"{marco.filename}:{marco.lineno}",
+                    'bytes': estadistica.size,
+                    'bloques': estadistica.count
+                })
+        self.cerrar()
+
+        return {
+            'activo': self.activo,
+            'presupuesto_bytes': self.presupuesto,
+            'rss_inicial_bytes': self._rss_inicial,
+            'rss_final_bytes': rss_actual(),
+            'pico_trazado_bytes': max((e['pico_trazado_bytes'] for e in self.etapas), default=None),
+            'etapas': self.etapas,
+            'top_sitios': sitios,
+            'degradaciones': self.degradaciones
+        }
@@ -0,0 +1,206 @@
+"""
+Análisis segmentado: porcentaje de respuestas favorables por segmento
+(una columna demográfica elegida) y por semana o mes de la marca temporal
+
+Todas las preguntas se convierten a una matriz de 1/0 (favorable o no) y se
+agregan con un único groupby por (segmento, periodo). La suma y el conteo
+son aditivos, así que la tabla cruzada y la tendencia se obtienen sumando
+ese agregado, sin volver a recorrer los datos por cada segmento.
+"""
+
+import pandas as pd
+
+from .analizador import perfilar_columna, TIPOS_GRAFICABLES
+from .utils import (
+    COLUMNAS_EXCLUIR,
+    COLUMNAS_FECHA,
+    ETIQUETA_OTROS,
+    ETIQUETA_SIN_DATO,
+    MAX_SEGMENTOS,
+    PERIODOS_TENDENCIA,
+    RESPUESTAS_FAVORABLES
+)
+
+
+class ErrorSegmento(ValueError):
+    """Parámetros de segmentación no válidos (error del cliente, HTTP 400)"""
+
+    def __init__(self, mensaje, codigo=400):
+        super().__init__(mensaje)
+        self.codigo = codigo
+
+
+def _excluida(columna):
+    columna_lower = columna.lower().strip()
+    return any(excluir in columna_lower for excluir in COLUMNAS_EXCLUIR)
+
+
+def _favorables(serie):
+    """
+    Convierte una columna a 1.0 (favorable), 0.0 (no favorable) o NaN (sin respuesta)
+
+    Returns:
+        Series o None si ninguna respuesta de la columna es favorable
+    """
+    if pd.api.types.is_numeric_dtype(serie):
+        textos = serie.map(lambda v: str(int(v)) if pd.notna(v) and float(v).is_integer() else v)
+    else:
+        textos = serie
+    textos = textos.astype('string').str.strip().str.lower()
+    favorable = textos.isin(RESPUESTAS_FAVORABLES)
+    if not favorable.any():
+        return None
+    return favorable.astype('float64').where(textos.notna())
+
+
+def detectar_columna_fecha(df):
+    """
+    Busca la marca temporal del formulario
+
+    Returns:
+        Series de fechas o None si no hay ninguna columna de fecha
+    """
+    for columna in df.columns:
+        serie = df[columna]
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            return serie
+        if any(nombre in columna.lower() for nombre in COLUMNAS_FECHA):
+            fechas = pd.to_datetime(serie, errors='coerce')
+            if fechas.notna().mean() >= 0.5:
+                return fechas
+    return None
+
+
+def periodo_respuestas(df):
+    """
+    Mes de la encuesta según la marca temporal ('AAAA-MM' de la fecha mediana)
+
+    Returns:
+        str o None si el libro no tiene fechas
+    """
+    fechas = detectar_columna_fecha(df)
+    if fechas is None or fechas.notna().sum() == 0:
+        return None
+    return fechas.dropna().median().strftime('%Y-%m')
+
+
+def _agrupar_segmentos(serie):
+    """Etiqueta cada fila con su segmento; los menos frecuentes van a 'Otros'"""
+    etiquetas = serie.astype('string').str.strip().fillna(ETIQUETA_SIN_DATO)
+    etiquetas = etiquetas.where(etiquetas != '', ETIQUETA_SIN_DATO)
+    frecuentes = etiquetas.value_counts()
+    if len(frecuentes) > MAX_SEGMENTOS:
+        conservar = frecuentes.index[:MAX_SEGMENTOS]
+        etiquetas = etiquetas.where(etiquetas.isin(conservar), ETIQUETA_OTROS)
+    return etiquetas
+
+
+def _etiquetar_periodos(fechas, periodo):
+    """Semana (fecha del lunes) o mes (AAAA-MM) de cada marca temporal"""
+    periodos = fechas.dt.to_period(PERIODOS_TENDENCIA[periodo])
+    if periodo == 'semana':
+        return periodos.dt.start_time.dt.strftime('%Y-%m-%d')
+    return periodos.dt.strftime('%Y-%m')
+
+
+def _porcentaje(suma, conteo):
+    return round(float(suma) / float(conteo) * 100, 1) if conteo else None
+
+
+def analizar_segmentos(df, columna_segmento=None, periodo=None):
+    """
+    Calcula la tabla cruzada por segmento y la tendencia por periodo
+
+    Args:
+        df: DataFrame con las respuestas
+        columna_segmento: Columna demográfica para segmentar (opcional)
+        periodo: 'semana' o 'mes' para la tendencia (opcional)
+
+    Returns:
+        dict con:
+            - columna_segmento, segmentos (ordenados por respuestas) y respuestas_segmento
+            - tabla: [{'pregunta', 'por_segmento': {segmento: %}, 'total': %}]
+            - periodo y tendencia: [{'periodo', 'porcentaje', 'respuestas'}]
+        o None si no hay preguntas con respuestas favorables o nada que segmentar
+
+    Raises:
+        ErrorSegmento: Si la columna de segmento no existe o el periodo no es válido
+    """
+    if columna_segmento and columna_segmento not in df.columns:
+        raise ErrorSegmento(f"La columna de segmento no existe: {columna_segmento}")
+    if periodo and periodo not in PERIODOS_TENDENCIA:
+        raise ErrorSegmento(f"Periodo no válido: {periodo}. Use uno de {tuple(PERIODOS_TENDENCIA)}")
+
+    claves = {}
+    if columna_segmento:
+        claves['segmento'] = _agrupar_segmentos(df[columna_segmento])
+    if periodo:
+        fechas = detectar_columna_fecha(df)
+        if fechas is None:
+            print("  ⚠️  No se encontró una marca temporal, se omite la tendencia")
+            periodo = None
+        else:
+            claves['periodo'] = _etiquetar_periodos(fechas, periodo)
+    if not claves:
+        return None
+
+    # Matriz de favorables con las preguntas que se grafican
+    columnas = {}
+    for columna in df.columns:
+        if columna == columna_segmento or _excluida(columna):
+            continue
+        if perfilar_columna(df[columna])['tipo'] not in TIPOS_GRAFICABLES:
+            continue
+        favorable = _favorables(df[columna])
+        if favorable is not None:
+            columnas[columna] = favorable
+    if not columnas:
+        return None
+    matriz = pd.DataFrame(columnas)
+
+    # Única pasada sobre los datos
+    agregado = matriz.groupby(list(claves.values()), dropna=False).agg(['sum', 'count'])
+    agregado.index.names = list(claves)
+    sumas = agregado.xs('sum', axis=1, level=1)
+    conteos = agregado.xs('count', axis=1, level=1)
+
+    resultado = {
+        'columna_segmento': columna_segmento,
+        'segmentos': [],
+        'respuestas_segmento': {},
+        'tabla': [],
+        'periodo': periodo,
+        'tendencia': []
+    }
+
+    if columna_segmento:
+        sumas_segmento = sumas.groupby(level='segmento').sum()
+        conteos_segmento = conteos.groupby(level='segmento').sum()
+        respuestas = claves['segmento'].value_counts()
+        segmentos = [s for s in respuestas.index if s in sumas_segmento.index]
+        # 'Otros' y 'Sin dato' siempre al final
+        segmentos.sort(key=lambda s: s in (ETIQUETA_OTROS, ETIQUETA_SIN_DATO))
+        resultado['segmentos'] = segmentos
+        resultado['respuestas_segmento'] = {s: int(respuestas[s]) for s in segmentos}
+        for pregunta in matriz.columns:
+            resultado['tabla'].append({
+                'pregunta': pregunta,
+                'por_segmento': {
+                    s: _porcentaje(sumas_segmento.at[s, pregunta], conteos_segmento.at[s, pregunta])
+                    for s in segmentos
+                },
+                'total': _porcentaje(sumas[pregunta].sum(), conteos[pregunta].sum())
+            })
+
+    if periodo:
+        sumas_periodo = sumas.groupby(level='periodo').sum().sum(axis=1)
+        conteos_periodo = conteos.groupby(level='periodo').sum().sum(axis=1)
+        respuestas = claves['periodo'].value_counts()
+        for etiqueta in sorted(p for p in sumas_periodo.index if pd.notna(p)):
+            resultado['tendencia'].append({
+                'periodo': etiqueta,
+                'porcentaje': _porcentaje(sumas_periodo[etiqueta], conteos_periodo[etiqueta]),
+                'respuestas': int(respuestas.get(etiqueta, 0))
+            })
+
+    return resultado
@@ -63,9 +63,13 @@ def generar_nombre_salida(archivo_excel):
     return f"informe {nombre_uds}.docx"
 
 
+# Identidad de la asociación (perfil de marca 'predeterminado'; ver marca.py)
+ASOCIACION = 'ASOCIACION DE PADRES DE FAMILIA DEL HOGAR INFANTIL GUATAPURI'
+CORREO_ENCUESTA = 'gerenciamasisosas@gmail.com'
+
 # Configuración del encabezado y pie de página
 ENCABEZADO = {
-    'linea1': 'ASOCIACION DE PADRES DE FAMILIA DEL HOGAR INFANTIL GUATAPURI',
+    'linea1': ASOCIACION,
     'linea2': 'NIT: 892301280-4',
     'linea3': 'Resolución personería jurídica N°10597 del 20 de septiembre de 1983'
 }
@@ -76,6 +80,32 @@ PIE_PAGINA = {
     'linea3': 'Correo: higuatapuri@gmail.com'
 }
 
+# Textos fijos del informe. Campos disponibles: {asociacion}, {correo},
+# {nombre_uds}, {nombre_uds_mayusculas}, {nombre_uds_titulo}, {total_respuestas}
+TEXTO_INTRODUCCION = (
+    "Dentro del marco de las obligaciones contractuales SIGE establecidas entre "
+    "EL INSTITUTO COLOMBIANO DE BIENESTAR FAMILIAR ICBF y la {asociacion} "
+    "(UDS) {nombre_uds_mayusculas} se establecer el de realizar "
+    "una encuesta que permita saber el nivel de satisfacción de los usuarios respecto "
+    "al servicio prestado el siguiente documento muestra la metodología, los resultados, "
+    "el análisis de los mismos y unas posibles oportunidades de mejora."
+)
+
+TEXTO_METODOLOGIA = (
+    "El primer paso de la metodología consistió en la elaboración de una encuesta "
+    "(lista de preguntas con calificación) que permitiría saber el nivel de satisfacción "
+    "de los usuarios de cada uds (para este caso fue la uds {nombre_uds_titulo}) respectos a los "
+    "distintos ítems de calificación del servicio estas preguntas se establecieron en un "
+    "orden de 1 a 5 donde uno es muy malo y 5 muy bueno, y algunas de si o no una vez "
+    "establecidas estas preguntas se estableció un formulario tipo GOOGLE y se vinculó al "
+    "correo {correo}, antes del inicio del encuentro se le explico a los "
+    "50 usuarios de la uds la importancia del diligenciamiento de la encuesta, por medios "
+    "electrónicos se le envió a los usuarios la encuesta a diligenciar por lineamientos del "
+    "ICBF se establece un mínimo del 20% de la población como muestra, para este caso se "
+    "lograron diligenciar {total_respuestas} encuestas, una vez diligenciadas se procederá "
+    "a realizar las fase de RESULTADOS, ANALISIS DE RESULTADOS Y POSIBLES OPORTUNIDADES DE MEJORA."
+)
+
 # Columnas a excluir del análisis
 COLUMNAS_EXCLUIR = [
     'marca temporal',
@@ -86,4 +116,27 @@ COLUMNAS_EXCLUIR = [
     'timestamp',
     'email',
     'correo'
-]
\ No newline at end of file
+]
+# Perfilado de columnas: límites de cardinalidad
+MAX_RESPUESTAS_GRAFICA = 7          # Respuestas mostradas en una gráfica; el resto se agrupa en "Otros"
+ETIQUETA_OTROS = 'Otros'
+MIN_DISTINTOS_TEXTO_LIBRE = 20      # Por debajo de esto una columna nunca se trata como texto libre
+RATIO_DISTINTOS_TEXTO_LIBRE = 0.5   # Fracción de respuestas distintas a partir de la cual es texto libre
+MAX_FILAS_TABLA_TEXTO = 10          # Respuestas abiertas listadas en la tabla resumen
+MAX_PALABRAS_FRECUENTES = 10
+
+# Segmentación y tendencias
+MAX_SEGMENTOS = 8                   # Segmentos mostrados en la tabla cruzada; el resto se agrupa en "Otros"
+ETIQUETA_SIN_DATO = 'Sin dato'
+PERIODOS_TENDENCIA = {'semana': 'W', 'mes': 'M'}
+COLUMNAS_FECHA = ['marca temporal', 'timestamp', 'fecha']
+
+# Respuestas que cuentan como favorables (en minúsculas); las preguntas
+# categóricas sin ninguna de estas respuestas no entran en el porcentaje favorable
+RESPUESTAS_FAVORABLES = {
+    '4', '5', 'si', 'sí',
+    'excelente', 'muy bueno', 'bueno',
+    'muy satisfecho', 'satisfecho',
+    'siempre', 'casi siempre',
+    'totalmente de acuerdo', 'de acuerdo'
+}
@@ -0,0 +1,245 @@
+"""
+Generación de informes por lotes desde la línea de comandos
+Procesa un directorio (o patrones glob) de libros de Excel en paralelo,
+sin pasar por la API HTTP
+
+Uso:
+    python lote.py datos/ --salida informes/ --encabezado encabezado.png --pie pie.png
+    python lote.py "datos/*.xlsx" --procesos 8 --motor-graficas pillow --dpi 200
+    python lote.py datos/ --salida informes/ --dry-run      # solo listar lo que se regeneraría
+    python lote.py datos/ --perfil norte                    # perfil de marca de perfiles_marca/norte
+
+Solo se regeneran los informes cuyas entradas cambiaron desde la última
+ejecución (según el manifiesto guardado en el directorio de salida); usar
+--force para regenerarlos todos.
+
+Códigos de salida:
+    0: Todos los informes se generaron (o ya estaban actualizados)
+    1: Algunos informes fallaron
+    2: Ningún informe se generó (no se encontraron archivos o dos libros
+       producirían el mismo informe)
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generador import generar_informe_word
+from generador.graficas import MOTORES_GRAFICAS, DPI
+from generador.escritor_docx import MOTORES_DOCUMENTO
+from generador.utils import PERIODOS_TENDENCIA
+from generador.marca import cargar_perfil
+from generador.utils import convertir_a_png, extraer_nombre_uds, generar_nombre_salida
+from manifiesto import Manifiesto, huella_comun
+
+
+EXTENSIONES_EXCEL = ('.xlsx', '.xls')
+
+
+def buscar_libros(entradas):
+    """
+    Expande directorios y patrones glob a la lista de libros de Excel
+
+    Args:
+        entradas: Lista de rutas de archivo, directorios o patrones glob
+
+    Returns:
+        list: Rutas de libros ordenadas y sin duplicados
+    """
+    libros = set()
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            candidatos = [os.path.join(entrada, nombre) for nombre in os.listdir(entrada)]
+        else:
+            candidatos = glob.glob(entrada)
+        for ruta in candidatos:
+            nombre = os.path.basename(ruta)
+            # Omitir archivos de bloqueo de Excel (~$libro.xlsx)
+            if os.path.isfile(ruta) and ruta.lower().endswith(EXTENSIONES_EXCEL) and not nombre.startswith('~$'):
+                libros.add(os.path.abspath(ruta))
+    return sorted(libros)
+
+
+def salidas_duplicadas(libros):
+    """
+    Agrupa los libros que producirían el mismo informe en el directorio de salida
+
+    Por ejemplo datos/norte/uds.xlsx y datos/sur/uds.xlsx, o uds_norte.xlsx y
+    UDS Norte.xls: todos se guardarían en el mismo .docx y la misma entrada
+    del manifiesto.
+
+    Returns:
+        dict: {nombre del informe: [libros]} solo para los nombres repetidos
+    """
+    por_salida = {}
+    for libro in libros:
+        por_salida.setdefault(generar_nombre_salida(libro), []).append(libro)
+    return {nombre: grupo for nombre, grupo in por_salida.items() if len(grupo) > 1}
+
+
+def preparar_imagenes(directorio, encabezado=None, pie=None):
+    """
+    Copia las imágenes de marca al directorio de trabajo compartido
+
+    Se convierten a PNG una sola vez aquí para que los procesos no las
+    conviertan cada uno por su cuenta.
+    """
+    for nombre, ruta in (('encabezado', encabezado), ('pie', pie)):
+        if ruta:
+            destino = os.path.join(directorio, f'{nombre}{os.path.splitext(ruta)[1].lower()}')
+            shutil.copyfile(ruta, destino)
+            convertido = convertir_a_png(destino)
+            if convertido != destino:
+                os.replace(convertido, os.path.join(directorio, f'{nombre}.png'))
+                os.remove(destino)
+
+
+def _generar_uno(archivo_excel, directorio_salida, directorio_trabajo, opciones, detallado):
+    """Genera un informe en un proceso worker; devuelve (archivo, salida, segundos, error)"""
+    inicio = time.perf_counter()
+    archivo_salida = os.path.join(directorio_salida, generar_nombre_salida(archivo_excel))
+    salida_consola = contextlib.nullcontext() if detallado else contextlib.redirect_stdout(io.StringIO())
+    try:
+        with salida_consola:
+            generar_informe_word(
+                archivo_excel=archivo_excel,
+                archivo_salida=archivo_salida,
+                nombre_uds=extraer_nombre_uds(archivo_excel),
+                directorio_trabajo=directorio_trabajo,
+                **opciones
+            )
+        return archivo_excel, archivo_salida, time.perf_counter() - inicio, None
+    except Exception as e:
+        return archivo_excel, archivo_salida, time.perf_counter() - inicio, f"{type(e).__name__}: {e}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Genera informes para un directorio o patrón de libros de Excel',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('entradas', nargs='+', help='Directorios, archivos o patrones glob de libros de Excel')
+    parser.add_argument('--salida', '-o', default='informes', help='Directorio de salida (por defecto: informes)')
+    parser.add_argument('--encabezado', help='Imagen del encabezado')
+    parser.add_argument('--pie', help='Imagen del pie de página')
+    parser.add_argument('--procesos', '-j', type=int, default=os.cpu_count() or 1,
+                        help='Procesos en paralelo (por defecto: núcleos de la máquina)')
+    parser.add_argument('--motor-graficas', choices=MOTORES_GRAFICAS, help='Motor de gráficas')
+    parser.add_argument('--motor-documento', choices=MOTORES_DOCUMENTO,
+                        help='Motor de documento (incremental para informes con muchas preguntas)')
+    parser.add_argument('--segmentar-por', metavar='COLUMNA',
+                        help='Columna demográfica para la tabla cruzada por segmento')
+    parser.add_argument('--tendencia', choices=list(PERIODOS_TENDENCIA),
+                        help='Tendencia de respuestas favorables por semana o mes')
+    parser.add_argument('--perfil', help='Perfil de marca (por defecto: PERFIL_MARCA o predeterminado)')
+    parser.add_argument('--dpi', type=int, default=DPI, help=f'Resolución de las gráficas (por defecto: {DPI})')
+    parser.add_argument('--detallado', '-v', action='store_true', help='Mostrar la salida completa de cada informe')
+    parser.add_argument('--force', action='store_true', help='Regenerar todos los informes aunque no hayan cambiado')
+    parser.add_argument('--dry-run', action='store_true', help='Listar los informes que se regenerarían sin generarlos')
+    args = parser.parse_args(argv)
+
+    libros = buscar_libros(args.entradas)
+    if not libros:
+        print("❌ No se encontraron libros de Excel")
+        return 2
+
+    duplicadas = salidas_duplicadas(libros)
+    if duplicadas:
+        print("❌ Varios libros generarían el mismo informe; renombre o procese por separado:")
+        for nombre, grupo in duplicadas.items():
+            print(f"  • {nombre}  ←  {', '.join(grupo)}")
+        return 2
+
+    for imagen in (args.encabezado, args.pie):
+        if imagen and not os.path.isfile(imagen):
+            print(f"❌ No existe la imagen: {imagen}")
+            return 2
+
+    if args.perfil:
+        try:
+            cargar_perfil(args.perfil)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 2
+
+    opciones = {'motor_graficas': args.motor_graficas, 'dpi_graficas': args.dpi}
+    if args.motor_documento:
+        opciones['motor_documento'] = args.motor_documento
+    if args.segmentar_por:
+        opciones['columna_segmento'] = args.segmentar_por
+    if args.tendencia:
+        opciones['periodo_tendencia'] = args.tendencia
+    if args.perfil:
+        opciones['perfil_marca'] = args.perfil
+
+    # Decidir qué informes están desactualizados
+    manifiesto = Manifiesto(args.salida)
+    comun = huella_comun(args.encabezado, args.pie, opciones)
+    huellas = {}
+    pendientes = []
+    for libro in libros:
+        archivo_salida = os.path.join(os.path.abspath(args.salida), generar_nombre_salida(libro))
+        huellas[libro] = Manifiesto.huella(libro, comun)
+        if args.force or not manifiesto.esta_actualizado(archivo_salida, huellas[libro]):
+            pendientes.append(libro)
+
+    actualizados = len(libros) - len(pendientes)
+    if args.dry_run:
+        print(f"📋 {len(pendientes)} de {len(libros)} informe(s) se regenerarían:")
+        for libro in pendientes:
+            print(f"  • {generar_nombre_salida(libro)}  ←  {libro}")
+        return 0
+
+    if not pendientes:
+        print(f"✅ Los {len(libros)} informe(s) están actualizados, nada que generar")
+        return 0
+
+    os.makedirs(args.salida, exist_ok=True)
+    procesos = max(1, min(args.procesos, len(pendientes)))
+
+    print(f"📚 {len(pendientes)} libro(s) a generar ({actualizados} actualizado(s)), {procesos} proceso(s)")
+    inicio = time.perf_counter()
+    fallidos = []
+
+    with tempfile.TemporaryDirectory() as directorio_trabajo:
+        preparar_imagenes(directorio_trabajo, args.encabezado, args.pie)
+
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            futuros = [
+                pool.submit(_generar_uno, libro, os.path.abspath(args.salida), directorio_trabajo,
+                            opciones, args.detallado)
+                for libro in pendientes
+            ]
+            for completados, futuro in enumerate(as_completed(futuros), start=1):
+                archivo_excel, archivo_salida, segundos, error = futuro.result()
+                progreso = f"[{completados}/{len(pendientes)}]"
+                if error:
+                    fallidos.append(archivo_excel)
+                    print(f"{progreso} ✕ {os.path.basename(archivo_excel)} ({segundos:.2f}s): {error}")
+                else:
+                    manifiesto.registrar(archivo_salida, archivo_excel, huellas[archivo_excel])
+                    print(f"{progreso} ✓ {os.path.basename(archivo_salida)} ({segundos:.2f}s)")
+
+    manifiesto.guardar()
+
+    total = time.perf_counter() - inicio
+    generados = len(pendientes) - len(fallidos)
+    print(f"\n✅ {generados} de {len(pendientes)} informe(s) generados en {total:.2f}s → {args.salida}")
+
+    if not fallidos:
+        return 0
+    return 1 if generados else 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
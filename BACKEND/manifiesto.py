@@ -0,0 +1,131 @@
+"""
+Manifiesto de construcción para la generación por lotes
+Registra, por cada informe generado, los hashes de sus entradas (libro,
+imágenes, configuración de marca, opciones y código del generador) para
+regenerar solo los informes cuyas entradas cambiaron
+"""
+
+import glob
+import hashlib
+import json
+import os
+
+import generador
+from generador import __version__
+from generador.artefactos import imagen_estatica_original
+from generador.cache_datos import hash_archivo
+from generador.marca import huella_perfil
+from generador.utils import (
+    ASOCIACION, CORREO_ENCUESTA, ENCABEZADO, PIE_PAGINA, COLUMNAS_EXCLUIR,
+    TEXTO_INTRODUCCION, TEXTO_METODOLOGIA
+)
+
+
+NOMBRE_MANIFIESTO = '.manifiesto.json'
+
+
+def imagen_efectiva(nombre, ruta=None):
+    """
+    Devuelve la imagen que usará el generador: la indicada o la estática de imagenes/
+
+    La estática se resuelve con el mismo helper que el generador y los
+    artefactos (la versión normalizada de artefactos/ deriva de ella).
+
+    Args:
+        nombre: 'encabezado' o 'pie'
+        ruta: Imagen indicada por el usuario (opcional)
+    """
+    if ruta:
+        return ruta
+    return imagen_estatica_original(nombre)
+
+
+def huella_codigo():
+    """
+    Hash de los fuentes del paquete generador
+
+    __version__ no se actualiza con cada cambio del informe; el código sí
+    refleja cualquier cambio en textos, análisis, gráficas o documento.
+
+    Returns:
+        str: SHA-256 de todos los generador/*.py (nombre y contenido)
+    """
+    hasher = hashlib.sha256()
+    for ruta in sorted(glob.glob(os.path.join(os.path.dirname(generador.__file__), '*.py'))):
+        hasher.update(os.path.basename(ruta).encode('utf-8') + b'\0')
+        with open(ruta, 'rb') as f:
+            hasher.update(hashlib.sha256(f.read()).digest())
+    return hasher.hexdigest()
+
+
+def huella_comun(encabezado=None, pie=None, opciones=None):
+    """
+    Hash de las entradas compartidas por todos los informes de un lote
+
+    Returns:
+        dict: Hashes de imágenes, configuración de marca, opciones y código
+    """
+    marca = json.dumps({
+        'asociacion': ASOCIACION,
+        'correo': CORREO_ENCUESTA,
+        'encabezado': ENCABEZADO,
+        'pie_pagina': PIE_PAGINA,
+        'texto_introduccion': TEXTO_INTRODUCCION,
+        'texto_metodologia': TEXTO_METODOLOGIA,
+        'columnas_excluir': COLUMNAS_EXCLUIR
+    }, sort_keys=True, ensure_ascii=False)
+
+    huella = {
+        'version_generador': __version__,
+        'codigo_generador': huella_codigo(),
+        'marca': hashlib.sha256(marca.encode('utf-8')).hexdigest(),
+        'opciones': hashlib.sha256(json.dumps(opciones or {}, sort_keys=True).encode('utf-8')).hexdigest()
+    }
+    # Sin --perfil el informe usa PERFIL_MARCA o el predeterminado: también cuenta
+    huella['perfil_marca'] = huella_perfil((opciones or {}).get('perfil_marca'))
+    for nombre, ruta in (('encabezado', encabezado), ('pie', pie)):
+        archivo = imagen_efectiva(nombre, ruta)
+        huella[f'imagen_{nombre}'] = hash_archivo(archivo) if archivo else None
+    return huella
+
+
+class Manifiesto:
+    """Manifiesto JSON guardado dentro del directorio de salida"""
+
+    def __init__(self, directorio_salida):
+        self.ruta = os.path.join(directorio_salida, NOMBRE_MANIFIESTO)
+        self.entradas = {}
+        if os.path.exists(self.ruta):
+            try:
+                with open(self.ruta, 'r', encoding='utf-8') as f:
+                    self.entradas = json.load(f).get('informes', {})
+            except (OSError, ValueError):
+                print(f"⚠️  Manifiesto ilegible, se regenerará todo: {self.ruta}")
+
+    @staticmethod
+    def huella(archivo_excel, comun):
+        """Huella completa de las entradas de un informe"""
+        return {'libro': hash_archivo(archivo_excel), **comun}
+
+    def esta_actualizado(self, archivo_salida, huella):
+        """
+        Indica si el informe existe y se generó con exactamente las mismas entradas
+        """
+        entrada = self.entradas.get(os.path.basename(archivo_salida))
+        return (entrada is not None
+                and entrada.get('huella') == huella
+                and os.path.exists(archivo_salida))
+
+    def registrar(self, archivo_salida, archivo_excel, huella):
+        """Anota un informe recién generado"""
+        self.entradas[os.path.basename(archivo_salida)] = {
+            'libro': os.path.abspath(archivo_excel),
+            'huella': huella
+        }
+
+    def guardar(self):
+        """Escribe el manifiesto de forma atómica"""
+        temporal = self.ruta + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'informes': self.entradas}, f, indent=2, ensure_ascii=False, sort_keys=True)
+        os.replace(temporal, self.ruta)
@@ -0,0 +1,158 @@
+"""
+Perfilado bajo demanda de peticiones de generación
+Ejecuta una generación bajo cProfile y guarda el resultado (resumen JSON
+con las funciones más costosas y el archivo .pstats descargable, que
+abren snakeviz, gprof2dot o flameprof) para diagnosticar libros lentos
+"""
+
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+
+class ErrorPerfilado(Exception):
+    """Error al solicitar o consultar un perfil"""
+
+    def __init__(self, mensaje, codigo=400):
+        super().__init__(mensaje)
+        self.codigo = codigo
+
+
+def token_valido(token_recibido, token_configurado):
+    """Compara el token de administración en tiempo constante"""
+    if not token_configurado or not token_recibido:
+        return False
+    return hmac.compare_digest(token_recibido.encode('utf-8'), token_configurado.encode('utf-8'))
+
+
+def resumir_perfil(estadisticas, top=30):
+    """
+    Extrae las funciones con más tiempo acumulado
+
+    Args:
+        estadisticas: pstats.Stats del perfil
+        top: Número de funciones a devolver
+
+    Returns:
+        list: Diccionarios con función, archivo, línea, llamadas y tiempos en segundos
+    """
+    filas = []
+    for (archivo, linea, funcion), (_, llamadas, propio, acumulado, _) in estadisticas.stats.items():
+        filas.append({
+            'funcion': funcion,
+            'archivo': archivo,
+            'linea': linea,
+            'llamadas': llamadas,
+            'tiempo_propio': round(propio, 6),
+            'tiempo_acumulado': round(acumulado, 6)
+        })
+    filas.sort(key=lambda f: f['tiempo_acumulado'], reverse=True)
+    return filas[:top]
+
+
+class AlmacenPerfiles:
+    """
+    Perfiles guardados en disco
+
+    Estructura en disco:
+        <directorio>/<perfil_id>.pstats
+        <directorio>/<perfil_id>.json   (resumen)
+    """
+
+    def __init__(self, directorio, max_perfiles=50, top=30):
+        """
+        Args:
+            directorio: Directorio donde se guardan los perfiles
+            max_perfiles: Perfiles conservados; los más antiguos se eliminan
+            top: Funciones incluidas en el resumen
+        """
+        self.directorio = directorio
+        self.max_perfiles = max_perfiles
+        self.top = top
+        # cProfile no admite dos perfiladores activos a la vez en el mismo proceso
+        self._bloqueo = threading.Lock()
+        os.makedirs(self.directorio, exist_ok=True)
+
+    def _ruta(self, perfil_id, extension):
+        # Los identificadores son uuid4 en hexadecimal; cualquier otra cosa se rechaza
+        if not perfil_id or len(perfil_id) != 32 or not all(c in '0123456789abcdef' for c in perfil_id):
+            raise ErrorPerfilado('Identificador de perfil no válido', 404)
+        return os.path.join(self.directorio, f'{perfil_id}.{extension}')
+
+    @contextmanager
+    def perfilar(self, etiqueta=''):
+        """
+        Perfila el bloque y guarda el resultado al salir
+
+        Uso:
+            with almacen.perfilar('uds_prueba.xlsx') as perfil:
+                ...
+            perfil['id'], perfil['top']
+
+        Raises:
+            ErrorPerfilado: Si ya hay otro perfilado en curso en el proceso (409)
+        """
+        if not self._bloqueo.acquire(blocking=False):
+            raise ErrorPerfilado('Ya hay un perfilado en curso en este proceso, reintente más tarde', 409)
+
+        perfil = {'id': uuid.uuid4().hex, 'etiqueta': etiqueta}
+        perfilador = cProfile.Profile()
+        inicio = time.perf_counter()
+        try:
+            perfilador.enable()
+            try:
+                yield perfil
+            finally:
+                perfilador.disable()
+        finally:
+            self._bloqueo.release()
+
+        perfil['segundos'] = round(time.perf_counter() - inicio, 3)
+        perfil['fecha'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+        estadisticas = pstats.Stats(perfilador, stream=io.StringIO())
+        perfil['top'] = resumir_perfil(estadisticas, self.top)
+
+        estadisticas.dump_stats(self._ruta(perfil['id'], 'pstats'))
+        with open(self._ruta(perfil['id'], 'json'), 'w', encoding='utf-8') as f:
+            json.dump(perfil, f, ensure_ascii=False)
+        self.limpiar()
+
+    def resumen(self, perfil_id):
+        """Devuelve el resumen JSON de un perfil guardado"""
+        try:
+            with open(self._ruta(perfil_id, 'json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise ErrorPerfilado('Perfil no encontrado', 404)
+
+    def ruta_pstats(self, perfil_id):
+        """Ruta del archivo .pstats de un perfil guardado"""
+        ruta = self._ruta(perfil_id, 'pstats')
+        if not os.path.exists(ruta):
+            raise ErrorPerfilado('Perfil no encontrado', 404)
+        return ruta
+
+    def limpiar(self):
+        """Conserva solo los max_perfiles perfiles más recientes"""
+        perfiles = []
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith('.json'):
+                ruta = os.path.join(self.directorio, nombre)
+                try:
+                    perfiles.append((os.path.getmtime(ruta), nombre[:-len('.json')]))
+                except OSError:
+                    continue
+        perfiles.sort(reverse=True)
+        for _, perfil_id in perfiles[self.max_perfiles:]:
+            for extension in ('json', 'pstats'):
+                try:
+                    os.remove(os.path.join(self.directorio, f'{perfil_id}.{extension}'))
+                except OSError:
+                    pass
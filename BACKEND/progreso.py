@@ -0,0 +1,152 @@
+"""
+Eventos de progreso de las generaciones para Server-Sent Events
+Cada generación con progreso_id escribe sus eventos como líneas JSON en
+<directorio>/<progreso_id>.jsonl; el endpoint SSE lee ese archivo a medida
+que crece. Al ir por disco, el stream funciona aunque la petición de
+generación y la de progreso las atienda un worker distinto.
+"""
+
+import json
+import os
+import re
+import time
+
+
+PATRON_ID = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+
+# Etapas con las que termina el stream
+ETAPAS_FINALES = ('fin', 'error')
+
+
+class ErrorProgreso(Exception):
+    """Error de progreso con su código HTTP"""
+
+    def __init__(self, mensaje, codigo=400):
+        super().__init__(mensaje)
+        self.codigo = codigo
+
+
+class CanalesProgreso:
+    """
+    Canales de progreso por generación
+
+    Uso:
+        emitir = canales.emisor(progreso_id)
+        generar_informe_word(..., progreso=emitir)
+        canales.finalizar(progreso_id)
+    """
+
+    def __init__(self, directorio, espera_inicio=120, espera_max=600, latido=15, expiracion_segundos=3600):
+        """
+        Args:
+            directorio: Directorio de los archivos de eventos
+            espera_inicio: Segundos que el stream espera a que llegue la petición de
+                generación (incluye lo que tarde en subirse el libro)
+            espera_max: Duración máxima de un stream
+            latido: Segundos entre comentarios SSE para mantener viva la conexión
+            expiracion_segundos: Antigüedad a partir de la cual se borran los canales
+        """
+        self.directorio = directorio
+        self.espera_inicio = espera_inicio
+        self.espera_max = espera_max
+        self.latido = latido
+        self.expiracion_segundos = expiracion_segundos
+        os.makedirs(self.directorio, exist_ok=True)
+
+    def _ruta(self, progreso_id):
+        if not PATRON_ID.match(progreso_id or ''):
+            raise ErrorProgreso('Identificador de progreso no válido', 400)
+        return os.path.join(self.directorio, f'{progreso_id}.jsonl')
+
+    def validar(self, progreso_id):
+        """Comprueba el identificador sin crear el canal"""
+        self._ruta(progreso_id)
+
+    def publicar(self, progreso_id, evento):
+        """Agrega un evento (dict con 'etapa') al canal"""
+        evento = dict(evento, t=round(time.time(), 3))
+        with open(self._ruta(progreso_id), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(evento, ensure_ascii=False, default=str) + '\n')
+
+    def emisor(self, progreso_id):
+        """
+        Crea el canal publicando el evento 'recibido'
+
+        Así el stream ya no depende de espera_inicio mientras la petición
+        espera turno en el control de admisión.
+
+        Returns:
+            callable: Función progreso(evento) para generar_informe_word
+        """
+        self._ruta(progreso_id)
+        self.limpiar()
+        self.publicar(progreso_id, {'etapa': 'recibido'})
+        return lambda evento: self.publicar(progreso_id, evento)
+
+    def finalizar(self, progreso_id, error=None, **datos):
+        """Publica el evento final ('fin' o 'error') que cierra el stream"""
+        if error is not None:
+            self.publicar(progreso_id, {'etapa': 'error', 'mensaje': str(error), **datos})
+        else:
+            self.publicar(progreso_id, {'etapa': 'fin', **datos})
+
+    def stream(self, progreso_id, intervalo=0.25):
+        """
+        Genera los eventos del canal en formato SSE hasta el evento final
+
+        Los eventos ya publicados se reenvían desde el principio, así que el
+        cliente puede conectarse antes o después de iniciar la generación.
+        """
+        # Validar el id antes de empezar a transmitir
+        return self._leer(self._ruta(progreso_id), intervalo)
+
+    def _leer(self, ruta, intervalo):
+        inicio = time.monotonic()
+        ultimo_envio = inicio
+
+        # La generación puede no haber empezado todavía
+        while not os.path.exists(ruta):
+            if time.monotonic() - inicio >= self.espera_inicio:
+                yield self._formatear({'etapa': 'error', 'mensaje': 'La generación no comenzó'})
+                return
+            if time.monotonic() - ultimo_envio >= self.latido:
+                ultimo_envio = time.monotonic()
+                yield ': esperando\n\n'
+            time.sleep(intervalo)
+
+        with open(ruta, 'r', encoding='utf-8') as f:
+            pendiente = ''
+            while time.monotonic() - inicio < self.espera_max:
+                linea = f.readline()
+                if linea:
+                    pendiente += linea
+                    if not pendiente.endswith('\n'):
+                        continue  # Línea a medio escribir
+                    evento = json.loads(pendiente)
+                    pendiente = ''
+                    ultimo_envio = time.monotonic()
+                    yield self._formatear(evento)
+                    if evento.get('etapa') in ETAPAS_FINALES:
+                        return
+                    continue
+                if time.monotonic() - ultimo_envio >= self.latido:
+                    ultimo_envio = time.monotonic()
+                    yield ': latido\n\n'
+                time.sleep(intervalo)
+
+        yield self._formatear({'etapa': 'error', 'mensaje': 'Tiempo de espera agotado'})
+
+    @staticmethod
+    def _formatear(evento):
+        return f"event: {evento['etapa']}\ndata: {json.dumps(evento, ensure_ascii=False)}\n\n"
+
+    def limpiar(self):
+        """Elimina los canales más antiguos que expiracion_segundos"""
+        limite = time.time() - self.expiracion_segundos
+        for nombre in os.listdir(self.directorio):
+            ruta = os.path.join(self.directorio, nombre)
+            try:
+                if os.path.getmtime(ruta) < limite:
+                    os.remove(ruta)
+            except OSError:
+                continue
@@ -0,0 +1,146 @@
+"""
+Punto de entrada de producción (autoalojado)
+Servidor preforked con gunicorn: el proceso maestro importa y calienta las
+dependencias pesadas antes de crear los workers, que comparten esas páginas
+de memoria por copy-on-write
+
+Los workers son gthread: un stream SSE de /api/progress ocupa un hilo
+mientras dura la generación, y con workers sync ocuparía el proceso entero
+(el POST de esa misma generación se quedaría esperando un worker libre)
+
+Uso:
+    python servidor.py --bind 0.0.0.0:8000 --workers 4 --max-requests 500
+
+Variables de entorno equivalentes:
+    SERVIDOR_BIND, SERVIDOR_WORKERS, SERVIDOR_WORKER_CLASS, SERVIDOR_THREADS,
+    SERVIDOR_MAX_REQUESTS, SERVIDOR_MAX_REQUESTS_JITTER, SERVIDOR_TIMEOUT
+"""
+
+import argparse
+import gc
+import os
+import time
+from io import BytesIO
+
+from gunicorn.app.base import BaseApplication
+
+
+def calentar():
+    """
+    Importa y ejecuta una vez cada etapa pesada del pipeline
+
+    - pandas + openpyxl: escribe y lee un Excel mínimo en memoria
+    - matplotlib: renderiza una gráfica descartable (caché de fuentes y Agg)
+    - python-docx: construye y guarda un documento descartable con imagen
+
+    Returns:
+        float: Segundos empleados en el calentamiento
+    """
+    inicio = time.perf_counter()
+
+    import pandas as pd
+    from docx import Document
+    from docx.shared import Inches
+
+    from generador.graficas import crear_grafica_circular, MOTOR_POR_DEFECTO
+
+    buffer_excel = BytesIO()
+    pd.DataFrame({'Pregunta': ['Si', 'No', 'Si']}).to_excel(buffer_excel, index=False)
+    buffer_excel.seek(0)
+    df = pd.read_excel(buffer_excel)
+
+    datos = {str(k): float(v) for k, v in df['Pregunta'].value_counts(normalize=True).mul(100).items()}
+
+    # El motor matplotlib siempre se calienta; el configurado también si es distinto
+    img_buffer = crear_grafica_circular(datos, 'Calentamiento', motor='matplotlib')
+    if MOTOR_POR_DEFECTO != 'matplotlib':
+        crear_grafica_circular(datos, 'Calentamiento', motor=MOTOR_POR_DEFECTO)
+
+    doc = Document()
+    doc.add_paragraph('Calentamiento')
+    doc.add_paragraph().add_run().add_picture(img_buffer, width=Inches(3.65))
+    doc.save(BytesIO())
+
+    return time.perf_counter() - inicio
+
+
+class ServidorInformes(BaseApplication):
+    """Aplicación gunicorn que carga app.py en el maestro (preload)"""
+
+    def __init__(self, opciones):
+        self.opciones = opciones
+        super().__init__()
+
+    def load_config(self):
+        for clave, valor in self.opciones.items():
+            if clave in self.cfg.settings and valor is not None:
+                self.cfg.set(clave, valor)
+
+    def load(self):
+        from app import app
+        return app
+
+
+def _al_iniciar(server):
+    """Hook on_starting de gunicorn: corre en el maestro antes del fork"""
+    segundos = calentar()
+    # Congelar los objetos actuales evita que el GC de cada worker toque
+    # (y por tanto copie) las páginas heredadas del maestro
+    gc.freeze()
+    server.log.info(f"Calentamiento completado en {segundos:.2f}s")
+
+
+def _post_fork(server, worker):
+    server.log.info(f"Worker {worker.pid} listo")
+
+
+def opciones_desde_entorno():
+    """
+    Construye las opciones de gunicorn a partir de variables de entorno
+
+    Returns:
+        dict: Opciones de configuración
+    """
+    return {
+        'bind': os.environ.get('SERVIDOR_BIND', '0.0.0.0:8000'),
+        'workers': int(os.environ.get('SERVIDOR_WORKERS', os.cpu_count() or 1)),
+        'worker_class': os.environ.get('SERVIDOR_WORKER_CLASS', 'gthread'),
+        'threads': int(os.environ.get('SERVIDOR_THREADS', 4)),
+        'max_requests': int(os.environ.get('SERVIDOR_MAX_REQUESTS', 500)),
+        'max_requests_jitter': int(os.environ.get('SERVIDOR_MAX_REQUESTS_JITTER', 50)),
+        'timeout': int(os.environ.get('SERVIDOR_TIMEOUT', 120)),
+    }
+
+
+def main(argv=None):
+    opciones = opciones_desde_entorno()
+
+    parser = argparse.ArgumentParser(description='Servidor de producción del generador de informes')
+    parser.add_argument('--bind', default=opciones['bind'], help='Dirección de escucha (host:puerto)')
+    parser.add_argument('--workers', type=int, default=opciones['workers'], help='Número de procesos worker')
+    parser.add_argument('--worker-class', default=opciones['worker_class'],
+                        help='Clase de worker de gunicorn (gthread admite streams SSE sin bloquear el proceso)')
+    parser.add_argument('--threads', type=int, default=opciones['threads'], help='Hilos por worker (gthread)')
+    parser.add_argument('--max-requests', type=int, default=opciones['max_requests'],
+                        help='Peticiones tras las cuales se recicla un worker (0 = nunca)')
+    parser.add_argument('--max-requests-jitter', type=int, default=opciones['max_requests_jitter'],
+                        help='Variación aleatoria de max-requests para no reciclar todos a la vez')
+    parser.add_argument('--timeout', type=int, default=opciones['timeout'], help='Timeout por petición en segundos')
+    args = parser.parse_args(argv)
+
+    ServidorInformes({
+        'bind': args.bind,
+        'workers': args.workers,
+        'worker_class': args.worker_class,
+        'threads': args.threads,
+        'max_requests': args.max_requests,
+        'max_requests_jitter': args.max_requests_jitter,
+        'timeout': args.timeout,
+        'preload_app': True,
+        'on_starting': _al_iniciar,
+        'post_fork': _post_fork,
+    }).run()
+
+
+if __name__ == '__main__':
+    main()
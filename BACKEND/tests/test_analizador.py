@@ -0,0 +1,22 @@
+"""
+Agrupación de las opciones menos frecuentes en "Otros"
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generador.analizador import analizar_conteos
+from generador.utils import ETIQUETA_OTROS, MAX_RESPUESTAS_GRAFICA
+
+
+def test_respuesta_otros_en_el_top_suma_el_resto():
+    conteos = {ETIQUETA_OTROS: 30, **{f'Opción {i}': 20 - i for i in range(MAX_RESPUESTAS_GRAFICA + 3)}}
+    resultado = analizar_conteos('¿Qué prefiere?', conteos)
+
+    assert len(resultado['frecuencias']) == MAX_RESPUESTAS_GRAFICA
+    assert sum(resultado['frecuencias'].values()) == sum(conteos.values())
+    # 30 propias + las opciones 6 a 9 que quedan fuera del top (14 + 13 + 12 + 11)
+    assert resultado['frecuencias'][ETIQUETA_OTROS] == 80
+    assert abs(sum(resultado['porcentajes_exactos'].values()) - 100) < 1e-9
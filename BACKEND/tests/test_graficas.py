@@ -0,0 +1,52 @@
+"""
+Equivalencia visual del motor 'pillow' frente a 'matplotlib'
+
+Usa las mismas métricas y umbrales que benchmarks/graficas_pillow.py.
+"""
+
+import os
+import sys
+
+import pytest
+
+DIRECTORIO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRECTORIO)
+sys.path.insert(0, os.path.join(DIRECTORIO, 'benchmarks'))
+
+from graficas_pillow import (
+    CASOS_LIMITE,
+    DIFERENCIA_TAMANO_MAX,
+    FRACCION_DISTINTA_MAX,
+    SECTORES_DISTINTOS_MAX,
+    comparar,
+    graficas_informe
+)
+from generador.graficas import crear_grafica_circular
+
+
+GRAFICAS = CASOS_LIMITE + graficas_informe(preguntas=5, filas=200)
+
+
+@pytest.mark.parametrize('datos, titulo', GRAFICAS, ids=[t[:30] for _, t in GRAFICAS])
+def test_pillow_equivale_a_matplotlib(datos, titulo):
+    tamano, sectores, fraccion = comparar(
+        crear_grafica_circular(datos, titulo, motor='matplotlib'),
+        crear_grafica_circular(datos, titulo, motor='pillow')
+    )
+    assert tamano <= DIFERENCIA_TAMANO_MAX
+    assert sectores <= SECTORES_DISTINTOS_MAX
+    assert fraccion <= FRACCION_DISTINTA_MAX
+
+
+def test_sectores_reflejados_no_equivalen():
+    # Control de la métrica: la torta en sentido horario debe detectarse
+    from PIL import Image, ImageOps
+    from io import BytesIO
+
+    datos, titulo = CASOS_LIMITE[4]
+    reflejada = BytesIO()
+    ImageOps.mirror(Image.open(crear_grafica_circular(datos, titulo, motor='pillow'))).save(reflejada, format='PNG')
+    reflejada.seek(0)
+
+    _, sectores, _ = comparar(crear_grafica_circular(datos, titulo, motor='matplotlib'), reflejada)
+    assert sectores > SECTORES_DISTINTOS_MAX
@@ -0,0 +1,42 @@
+"""
+Stream de progreso de /api/generate cuando la petición se rechaza
+"""
+
+import json
+import os
+import sys
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, canales_progreso
+
+
+def _eventos(respuesta):
+    """Eventos SSE (dicts) de la respuesta, en orden"""
+    eventos = []
+    for bloque in respuesta.get_data(as_text=True).split('\n\n'):
+        for linea in bloque.splitlines():
+            if linea.startswith('data: '):
+                eventos.append(json.loads(linea[len('data: '):]))
+    return eventos
+
+
+def test_perfil_no_valido_cierra_el_stream(monkeypatch):
+    # Si el rechazo no cerrara el canal, el stream terminaría por tiempo
+    # (con otro mensaje) en lugar de colgarse los 600 s por defecto
+    monkeypatch.setattr(canales_progreso, 'espera_inicio', 2)
+    monkeypatch.setattr(canales_progreso, 'espera_max', 2)
+    progreso_id = uuid.uuid4().hex
+    cliente = app.test_client()
+
+    respuesta = cliente.post('/api/generate', data={
+        'progreso_id': progreso_id,
+        'perfil': 'perfil-que-no-existe'
+    })
+    assert respuesta.status_code == 400
+    mensaje = respuesta.get_json()['error']
+
+    eventos = _eventos(cliente.get(f'/api/progress/{progreso_id}'))
+    assert [e['etapa'] for e in eventos] == ['error']
+    assert eventos[-1]['mensaje'] == mensaje
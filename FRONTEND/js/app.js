@@ -200,10 +200,15 @@ async function handleFormSubmit(e) {
                 `;
             }
             
+            // Seguir el progreso de la generación (SSE)
+            const progresoId = crearProgresoId();
+            const progreso = seguirProgreso(progresoId, fileElement);
+
             try {
                 // Preparar FormData
                 const formData = new FormData();
                 formData.append('excel_file', file);
+                formData.append('progreso_id', progresoId);
 
                 // Enviar petición
                 const response = await fetch(`${API_URL}/generate`, {
@@ -218,6 +223,7 @@ async function handleFormSubmit(e) {
 
                 // Obtener el archivo generado
                 const blob = await response.blob();
+                progreso.close();
                 
                 // Extraer nombre del archivo del header Content-Disposition
                 const contentDisposition = response.headers.get('Content-Disposition');
@@ -265,6 +271,7 @@ async function handleFormSubmit(e) {
                 }
 
             } catch (fileError) {
+                progreso.close();
                 console.error(`Error procesando ${file.name}:`, fileError);
                 errorCount++;
                 
@@ -301,6 +308,56 @@ async function handleFormSubmit(e) {
     }
 }
 
+// ===================================
+// PROGRESO
+// ===================================
+
+/**
+ * Genera un identificador aleatorio para el progreso de una generación
+ */
+function crearProgresoId() {
+    if (window.crypto && crypto.randomUUID) {
+        return crypto.randomUUID();
+    }
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 12)}`;
+}
+
+/**
+ * Abre el stream de progreso (Server-Sent Events) y muestra cada etapa en el archivo
+ * Si el navegador no soporta EventSource se mantiene el estado "Procesando..."
+ */
+function seguirProgreso(progresoId, fileElement) {
+    if (!window.EventSource || !fileElement) {
+        return { close() {} };
+    }
+
+    const fuente = new EventSource(`${API_URL}/progress/${progresoId}`);
+    const meta = fileElement.querySelector('.file-item-col-meta');
+    const mostrar = (texto) => {
+        meta.innerHTML = `<span class="file-item-col-status processing">⏳ ${texto}</span>`;
+    };
+
+    fuente.addEventListener('recibido', () => mostrar('En cola...'));
+    fuente.addEventListener('leido', (e) => {
+        const datos = JSON.parse(e.data);
+        mostrar(`${datos.filas} respuestas leídas`);
+    });
+    fuente.addEventListener('columna', (e) => {
+        const datos = JSON.parse(e.data);
+        mostrar(`Pregunta ${datos.indice} de ${datos.total}`);
+    });
+    fuente.addEventListener('grafica', (e) => {
+        const datos = JSON.parse(e.data);
+        mostrar(`Gráfica ${datos.indice} lista`);
+    });
+    fuente.addEventListener('guardado', () => mostrar('Descargando...'));
+    fuente.addEventListener('fin', () => fuente.close());
+    // 'error' llega como evento del servidor o como fallo de la conexión
+    fuente.addEventListener('error', () => fuente.close());
+
+    return fuente;
+}
+
 // ===================================
 // DESCARGA
 // ===================================